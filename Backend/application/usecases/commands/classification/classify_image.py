@@ -1,8 +1,14 @@
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import hashlib
 import logging
 
 from domain.interfaces.unit_of_work import IUnitOfWork
+from application.usecases.errors import ModelNotReadyError
+from application.usecases.commands.classification.refresh_phrase_index import (
+    refresh_phrase_index,
+    require_phrase_index,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -11,10 +17,16 @@ logger = logging.getLogger("ClassifyImageUseCase")
 
 @dataclass
 class ClassifyImageCommand:
-    image_path: str
+    image: bytes  # encoded image file contents
     max_phrases: int = 12
     top_k: int = 5
 
+    def coalescing_key(self, catalog_version: Optional[str]) -> str:
+        """Identifies commands with the same result: same upload, parameters and phrase catalog"""
+        digest = hashlib.sha256(self.image)
+        digest.update(f":{self.max_phrases}:{self.top_k}:{catalog_version}".encode("utf-8"))
+        return digest.hexdigest()
+
 
 @dataclass
 class ClassificationResult:
@@ -28,21 +40,33 @@ def classify_image(command: ClassifyImageCommand, uow: IUnitOfWork) -> List[Clas
     Classify an image against all diseases in the database
     
     Args:
-        command: ClassifyImageCommand with image path and parameters
+        command: ClassifyImageCommand with image bytes and parameters
         uow: Unit of work for database access
         
     Returns:
         List of ClassificationResult objects
+        
+    Raises:
+        ModelNotReadyError: The model is still loading in the background, or
+            no disease has phrase embeddings of it yet
     """
-    logger.info(f"Processing classification request for image: {command.image_path}")
+    # Fail fast instead of blocking on the background load
+    if not uow.classification.is_ready:
+        raise ModelNotReadyError("The classification model is still loading")
+    
+    logger.info(f"Processing classification request for image ({len(command.image)} bytes)")
     
     with uow:
         # Fetch all diseases from the database
         diseases = uow.diseases.list_all()
+
+        # Pick up catalog changes committed since the index was loaded
+        refresh_phrase_index(uow)
+        require_phrase_index(diseases, uow)
         
         # Use classification repository to classify the image
         results_dicts = uow.classification.classify_image(
-            image_path=command.image_path,
+            image=command.image,
             diseases=diseases,
             max_phrases=command.max_phrases,
             top_k=command.top_k
@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Union
+import logging
+
+from domain.interfaces.unit_of_work import IUnitOfWork
+from application.usecases.errors import ModelNotReadyError
+from application.usecases.commands.classification.classify_image import ClassificationResult
+from application.usecases.commands.classification.refresh_phrase_index import (
+    refresh_phrase_index,
+    require_phrase_index,
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("ClassifyImageBatchUseCase")
+
+
+@dataclass
+class ClassifyImageBatchCommand:
+    images: List[bytes]  # encoded image file contents
+    max_phrases: int = 12
+    top_k: int = 5
+
+
+@dataclass
+class BatchClassificationResult:
+    index: int  # position of the image in the command
+    results: List[ClassificationResult]
+    error: Optional[str] = None  # set when the image could not be decoded
+
+
+def classify_image_batch(command: ClassifyImageBatchCommand, uow: IUnitOfWork) -> Iterator[BatchClassificationResult]:
+    """
+    Classify a series of images against all diseases in the database
+    
+    The catalog is read eagerly, so the returned iterator no longer needs
+    the database session and can be consumed while streaming a response.
+    
+    Args:
+        command: ClassifyImageBatchCommand with image bytes and parameters
+        uow: Unit of work for database access
+        
+    Returns:
+        Iterator of BatchClassificationResult, one per image in input order;
+        an image that cannot be decoded gets an error and no results
+        
+    Raises:
+        ModelNotReadyError: The model is still loading in the background, or
+            no disease has phrase embeddings of it yet
+    """
+    # Fail fast instead of blocking on the background load
+    if not uow.classification.is_ready:
+        raise ModelNotReadyError("The classification model is still loading")
+    
+    logger.info(f"Processing batch classification request for {len(command.images)} images")
+    
+    with uow:
+        # Fetch all diseases from the database
+        diseases = uow.diseases.list_all()
+
+        # Pick up catalog changes committed since the index was loaded
+        refresh_phrase_index(uow)
+        require_phrase_index(diseases, uow)
+    
+    results_per_image = uow.classification.classify_images(
+        images=command.images,
+        diseases=diseases,
+        max_phrases=command.max_phrases,
+        top_k=command.top_k
+    )
+    return _to_results(results_per_image)
+
+
+def _to_results(results_per_image: Iterator[Union[List[dict], Exception]]) -> Iterator[BatchClassificationResult]:
+    for i, results_dicts in enumerate(results_per_image):
+        if isinstance(results_dicts, Exception):
+            yield BatchClassificationResult(index=i, results=[], error=f"Could not read image: {results_dicts}")
+            continue
+        yield BatchClassificationResult(
+            index=i,
+            results=[
+                ClassificationResult(
+                    disease_name=r["disease_name"],
+                    score=r["score"],
+                    best_phrase=r["best_phrase"]
+                )
+                for r in results_dicts
+            ]
+        )
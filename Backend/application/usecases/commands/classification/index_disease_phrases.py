@@ -0,0 +1,41 @@
+# application/usecases/commands/classification/index_disease_phrases.py
+from typing import List
+
+from domain.interfaces.unit_of_work import IUnitOfWork
+from domain.entities.disease import Disease
+
+
+def split_description(description: str) -> List[str]:
+    """One phrase per non-empty description line."""
+    return [p.strip() for p in description.split("\n") if p.strip()]
+
+
+def encode_disease_phrases(disease: Disease, uow: IUnitOfWork) -> None:
+    """
+    Store the phrase embeddings of one disease encoded by the loaded model.
+
+    Rows other checkpoints / precisions stored for the disease are kept:
+    processes running them share the database.
+    """
+    phrases = split_description(disease.description)
+    embeddings = uow.classification.encode_phrases(phrases)
+    # Tagged with the encoder, so another checkpoint / precision never scores against them
+    uow.phrase_embeddings.replace_for_disease(disease.id, phrases, embeddings, uow.classification.model_version)
+
+
+def index_disease_phrases(disease: Disease, uow: IUnitOfWork) -> None:
+    """
+    Rebuild the stored phrase embeddings of a disease whose description
+    was just set.
+
+    Runs inside the caller's unit of work, so the index rows are committed
+    together with the disease change that made them necessary. The rows of
+    every model are stale now and dropped. They are only re-encoded inline
+    when the model is loaded and has a text tower: a CRUD write never waits
+    for (or fails with) the model load or an unreachable model server.
+    Otherwise the next rebuild_phrase_index run encodes the disease (after
+    the background load, an idle job worker, scripts.rebuild_phrase_index).
+    """
+    uow.phrase_embeddings.delete_for_disease(disease.id)
+    if uow.classification.is_ready and uow.classification.can_encode_text:
+        encode_disease_phrases(disease, uow)
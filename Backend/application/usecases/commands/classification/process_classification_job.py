@@ -0,0 +1,88 @@
+# application/usecases/commands/classification/process_classification_job.py
+from dataclasses import dataclass
+from typing import Optional
+import logging
+
+from domain.interfaces.unit_of_work import IUnitOfWork
+from domain.entities.classification_job import ClassificationJob
+from application.usecases.commands.classification.classify_image_batch import (
+    ClassifyImageBatchCommand,
+    classify_image_batch,
+)
+
+logger = logging.getLogger("ProcessClassificationJobUseCase")
+
+
+@dataclass(slots=True)
+class ProcessNextClassificationJobCommand:
+    worker_id: str  # recorded on the claimed job, e.g. "host:pid"
+
+
+@dataclass(slots=True)
+class RequeueStaleClassificationJobsCommand:
+    timeout_s: float    # a job running longer than this lost its worker
+    max_attempts: int   # after that many claims it is failed instead
+
+
+def process_next_classification_job(cmd: ProcessNextClassificationJobCommand, uow: IUnitOfWork) -> Optional[ClassificationJob]:
+    """
+    Claim the oldest queued job, classify its images and store the results
+    (or the error). Returns the settled job, or None when the queue is empty.
+    """
+    with uow:
+        job = uow.classification_jobs.claim_next(cmd.worker_id)
+        # Publish the claim before the long-running part
+        uow.commit()
+    if job is None:
+        return None
+
+    logger.info(f"Processing classification job {job.id} ({job.image_count} images, attempt {job.attempts})")
+    try:
+        with uow:
+            images = uow.classification_jobs.list_images(job.id)
+            batch = classify_image_batch(
+                ClassifyImageBatchCommand(
+                    images=[img.data for img in images],
+                    max_phrases=job.max_phrases,
+                    top_k=job.top_k,
+                ),
+                uow,
+            )
+            results = [
+                {
+                    "index": item.index,
+                    "filename": images[item.index].filename,
+                    "results": [
+                        {"disease_name": r.disease_name, "score": r.score, "best_phrase": r.best_phrase}
+                        for r in item.results
+                    ],
+                    "error": item.error,
+                }
+                for item in batch
+            ]
+            settled = uow.classification_jobs.complete(job.id, cmd.worker_id, results)
+            uow.commit()
+    except Exception as e:
+        logger.error(f"Classification job {job.id} failed: {e}", exc_info=True)
+        with uow:
+            settled = uow.classification_jobs.fail(job.id, cmd.worker_id, f"Error classifying images: {e}")
+            uow.commit()
+    if not settled:
+        logger.warning(f"Classification job {job.id} was requeued while {cmd.worker_id} ran it; "
+                       f"result discarded, the job belongs to its new claim")
+
+    with uow:
+        return uow.classification_jobs.get_by_id(job.id)
+
+
+def requeue_stale_classification_jobs(cmd: RequeueStaleClassificationJobsCommand, uow: IUnitOfWork) -> int:
+    """
+    Give the jobs of crashed workers back to the queue (or fail them after
+    max_attempts). Returns the number of jobs touched.
+    """
+    with uow:
+        count = uow.classification_jobs.requeue_stale(cmd.timeout_s, cmd.max_attempts)
+        uow.commit()
+    if count:
+        logger.warning(f"Recovered {count} classification jobs from lost workers")
+    return count
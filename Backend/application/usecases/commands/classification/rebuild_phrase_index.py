@@ -0,0 +1,38 @@
+# application/usecases/commands/classification/rebuild_phrase_index.py
+from dataclasses import dataclass
+import logging
+
+from domain.interfaces.unit_of_work import IUnitOfWork
+from application.usecases.commands.classification.index_disease_phrases import encode_disease_phrases
+
+logger = logging.getLogger("RebuildPhraseIndexUseCase")
+
+
+@dataclass(slots=True)
+class RebuildPhraseIndexCommand:
+    force: bool = False  # re-encode every disease, not only the missing ones
+
+
+def rebuild_phrase_index(cmd: RebuildPhraseIndexCommand, uow: IUnitOfWork) -> int:
+    """
+    Encode the phrases of every disease that has no stored embeddings of
+    the loaded model yet: new diseases, and all of them after a checkpoint
+    or precision change (or every disease when `force` is set). Returns the
+    number of diseases (re)indexed.
+    """
+    with uow:
+        indexed = set() if cmd.force else uow.phrase_embeddings.indexed_disease_ids(uow.classification.model_version)
+        pending = [d for d in uow.diseases.list_all() if d.id not in indexed]
+
+        if pending and not uow.classification.can_encode_text:
+            logger.warning(f"{len(pending)} diseases have no phrase embeddings of this model and this process "
+                           "cannot encode them; run scripts.rebuild_phrase_index")
+            return 0
+
+        for disease in pending:
+            encode_disease_phrases(disease, uow)
+
+        uow.commit()
+
+    logger.info(f"Phrase index rebuilt for {len(pending)} diseases")
+    return len(pending)
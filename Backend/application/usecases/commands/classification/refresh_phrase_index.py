@@ -0,0 +1,35 @@
+# application/usecases/commands/classification/refresh_phrase_index.py
+from typing import Sequence
+
+from domain.entities.disease import Disease
+from domain.interfaces.unit_of_work import IUnitOfWork
+from application.usecases.errors import ModelNotReadyError
+
+
+def refresh_phrase_index(uow: IUnitOfWork) -> bool:
+    """
+    Reload the classifier's in-memory phrase index if the stored one has
+    changed since it was loaded (e.g. a disease was added by another worker).
+    Returns True when a reload happened.
+    """
+    version = uow.phrase_embeddings.version()
+    if version == uow.classification.phrase_index_version:
+        return False
+
+    # A model-server client only forwards the reload: don't read every embedding for it.
+    # Rows other checkpoints / precisions stored are not read either
+    entries = (uow.phrase_embeddings.list_all(uow.classification.model_version)
+               if uow.classification.holds_phrase_index else [])
+    uow.classification.load_phrase_index(entries, version)
+    return True
+
+
+def require_phrase_index(diseases: Sequence[Disease], uow: IUnitOfWork) -> None:
+    """
+    Raise ModelNotReadyError when the catalog has diseases but the loaded
+    index holds no phrase of the loaded model (none encoded yet, or only by
+    another checkpoint / precision): every image would get no results.
+    """
+    if diseases and not uow.classification.model_status()["phrases"]:
+        raise ModelNotReadyError("No phrase embeddings of the loaded model yet; "
+                                 "the catalog is re-indexed by scripts.rebuild_phrase_index")
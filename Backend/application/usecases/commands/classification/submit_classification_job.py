@@ -0,0 +1,40 @@
+# application/usecases/commands/classification/submit_classification_job.py
+from dataclasses import dataclass
+from typing import List, Optional
+import uuid
+
+from domain.interfaces.unit_of_work import IUnitOfWork
+from domain.entities.classification_job import ClassificationJob, ClassificationJobImage
+
+
+@dataclass(slots=True)
+class SubmitClassificationJobCommand:
+    images: List[bytes]  # encoded image file contents
+    filenames: List[str]
+    created_by: Optional[int]
+    max_phrases: int = 12
+    top_k: int = 5
+
+
+def submit_classification_job(cmd: SubmitClassificationJobCommand, uow: IUnitOfWork) -> ClassificationJob:
+    """
+    Enqueue the images for a classification worker and return the queued
+    job right away; its results are read back with get_classification_job.
+    """
+    with uow:
+        job = uow.classification_jobs.add(
+            ClassificationJob(
+                id=uuid.uuid4().hex,
+                status="queued",
+                max_phrases=cmd.max_phrases,
+                top_k=cmd.top_k,
+                image_count=len(cmd.images),
+                created_by=cmd.created_by,
+            ),
+            [
+                ClassificationJobImage(position=i, filename=filename or "", data=data)
+                for i, (data, filename) in enumerate(zip(cmd.images, cmd.filenames))
+            ],
+        )
+        uow.commit()
+        return job
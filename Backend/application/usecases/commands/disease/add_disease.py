@@ -7,6 +7,7 @@ from domain.entities.disease import Disease
 from domain.value_objects.disease_create_vo import DiseaseCreateVO
 
 from application.usecases.errors import DiseaseAlreadyExistsError
+from application.usecases.commands.classification.index_disease_phrases import index_disease_phrases
 
 
 @dataclass(slots=True)
@@ -28,6 +29,7 @@ def add_disease(cmd: AddDiseaseCommand, uow: IUnitOfWork) -> Disease:
                 description=cmd.description
             )
         )
+        index_disease_phrases(disease, uow)
 
         uow.commit()
         return disease
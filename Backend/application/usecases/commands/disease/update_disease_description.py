@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from domain.interfaces.unit_of_work import IUnitOfWork
 from domain.entities.disease import Disease
 from application.usecases.errors import DiseaseNotFoundError
+from application.usecases.commands.classification.index_disease_phrases import index_disease_phrases
 
 
 @dataclass(slots=True)
@@ -21,6 +22,7 @@ def update_disease_description(cmd: UpdateDiseaseDescriptionCommand, uow: IUnitO
         updated = uow.diseases.update_description(cmd.disease_id, cmd.new_description)
         if updated is None:
             raise DiseaseNotFoundError()
+        index_disease_phrases(updated, uow)
 
         uow.commit()
         return updated
@@ -37,3 +37,9 @@ class ForbiddenDiseaseEditError(Exception):
     """Doctor tried to edit a disease he didn't create."""
     pass
 
+class ModelNotReadyError(Exception):
+    """Raised when classifying before the model and phrase index have finished loading."""
+
+class ClassificationJobNotFoundError(Exception):
+    """Raised when a classification job does not exist (or belongs to another user)."""
+
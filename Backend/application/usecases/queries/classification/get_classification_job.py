@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from domain.interfaces.unit_of_work import IUnitOfWork
+from domain.entities.classification_job import ClassificationJob
+from application.usecases.errors import ClassificationJobNotFoundError
+
+
+@dataclass(slots=True)
+class GetClassificationJobQuery:
+    job_id: str
+    requested_by: Optional[int]  # only the submitter may read a job
+
+
+def get_classification_job(q: GetClassificationJobQuery, *, uow: IUnitOfWork) -> ClassificationJob:
+    job = uow.classification_jobs.get_by_id(q.job_id)
+    # Someone else's job is reported as missing, not forbidden
+    if job is None or job.created_by != q.requested_by:
+        raise ClassificationJobNotFoundError
+    return job
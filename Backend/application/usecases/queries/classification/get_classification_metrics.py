@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from domain.interfaces.unit_of_work import IUnitOfWork
+
+
+@dataclass(slots=True)
+class GetClassificationMetricsQuery:
+    pass
+
+
+def get_classification_metrics(q: GetClassificationMetricsQuery, *, uow: IUnitOfWork) -> Dict[str, Any]:
+    return uow.classification.metrics()
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from domain.interfaces.unit_of_work import IUnitOfWork
+
+
+@dataclass(slots=True)
+class GetModelStatusQuery:
+    pass
+
+
+def get_model_status(q: GetModelStatusQuery, *, uow: IUnitOfWork) -> Dict[str, Any]:
+    return uow.classification.model_status()
@@ -0,0 +1,102 @@
+"""
+Recall@k against latency of the IVF phrase index.
+
+Builds a synthetic catalog (every disease a cluster of phrase embeddings),
+then for every n_probe setting ranks the top-k diseases of random queries
+twice: exactly over the whole catalog, and over the IVF candidate diseases
+only (as ClassificationRepository does above phrase_ann_min_phrases).
+
+    python -m benchmarks.ann_index
+    python -m benchmarks.ann_index --diseases 20000 --phrases 10 --probes 1 4 16 64 --candidates 64
+
+recall@k is the fraction of the exact top-k diseases the ANN path returns,
+max_err the largest score difference of a returned one to its exact score.
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from infrastructure.ai.ann_index import IVFIndex
+from infrastructure.ai.scoring import score_diseases
+
+DIM = 256
+
+
+def noisy(x: torch.Tensor, spread: float) -> torch.Tensor:
+    return F.normalize(x + spread * torch.randn_like(x) / x.shape[-1] ** 0.5, dim=-1)
+
+
+def synthetic_catalog(diseases: int, per_disease: int, topics: int, spread: float):
+    """Phrases scattered around their disease centre, diseases around one of a few topics"""
+    topic_centres = F.normalize(torch.randn(topics, DIM), dim=-1)
+    centres = noisy(topic_centres[torch.randint(0, topics, (diseases,))], spread)
+    owner = torch.arange(diseases).repeat_interleave(per_disease)
+    embeddings = noisy(centres[owner], spread)
+    return centres, embeddings, owner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--diseases", type=int, default=10000)
+    parser.add_argument("--phrases", type=int, default=10, help="phrases per disease")
+    parser.add_argument("--topics", type=int, default=100, help="clusters of related diseases")
+    parser.add_argument("--spread", type=float, default=1.0, help="noise of a disease around its topic "
+                                                                  "and of a phrase around its disease")
+    parser.add_argument("--lists", type=int, default=None, help="IVF lists (default ~sqrt(phrases))")
+    parser.add_argument("--probes", nargs="+", type=int, default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--candidates", type=int, default=64, help="candidate diseases scored exactly")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    centres, embeddings, owner = synthetic_catalog(args.diseases, args.phrases, args.topics, args.spread)
+    counts = torch.bincount(owner, minlength=args.diseases)
+    allowed = torch.ones(args.diseases, dtype=torch.bool)
+    targets = torch.randint(0, args.diseases, (args.queries,))
+    queries = noisy(centres[targets], args.spread)
+
+    start = time.perf_counter()
+    ann = IVFIndex.build(embeddings, owner, n_lists=args.lists)
+    print(f" {embeddings.shape[0]} phrases, {args.diseases} diseases, {ann.n_lists} lists "
+          f"(built in {time.perf_counter() - start:.1f} s)")
+
+    with torch.no_grad():
+        exact, exact_s = [], []
+        for q in queries:
+            t = time.perf_counter()
+            ranked = score_diseases(q.unsqueeze(0) @ embeddings.T, owner, args.diseases, args.top_k, counts=counts)
+            exact_s.append(time.perf_counter() - t)
+            exact.append(dict(zip(ranked.slots[0].tolist(), ranked.scores[0].tolist())))
+        print(f" exact search: p50 {np.percentile(exact_s, 50) * 1000:.2f} ms")
+
+        selected = torch.ones_like(owner, dtype=torch.bool)
+        print(f"{'n_probe':>8} {'recall@' + str(args.top_k):>9} {'max_err':>8} {'p50_ms':>8} {'p99_ms':>8}")
+        for n_probe in args.probes:
+            hits, error, latencies = 0, 0.0, []
+            for q, truth in zip(queries, exact):
+                t = time.perf_counter()
+                slots = ann.candidate_slots(q, allowed, n_probe, args.candidates)
+                mask = torch.zeros_like(allowed)
+                mask[slots] = True
+                rows = torch.nonzero(mask[owner], as_tuple=True)[0]
+                sims = embeddings[rows] @ q
+                # Bounds estimated over the whole catalog, as ClassificationRepository does
+                lo, hi = ann.similarity_bounds(q, selected, n_probe)
+                bounds = (sims.new_full((1, 1), min(lo, float(sims.min()))),
+                          sims.new_full((1, 1), max(hi, float(sims.max()))))
+                ranked = score_diseases(sims.unsqueeze(0), owner[rows], args.diseases, args.top_k, bounds=bounds)
+                latencies.append(time.perf_counter() - t)
+                for slot, score in zip(ranked.slots[0].tolist(), ranked.scores[0].tolist()):
+                    if slot in truth:
+                        hits += 1
+                        error = max(error, abs(score - truth[slot]))
+            print(f"{n_probe:>8} {hits / (args.top_k * args.queries):>9.3f} {error:>8.4f} "
+                  f"{np.percentile(latencies, 50) * 1000:>8.2f} {np.percentile(latencies, 99) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
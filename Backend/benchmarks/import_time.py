@@ -0,0 +1,95 @@
+"""
+Import cost of the non-ML entry points, and a guard against the ML stack
+leaking back into them.
+
+Imports each module in a fresh `python -X importtime` interpreter and
+reports its cumulative import time and the heavy ML packages it pulled in.
+torch / torchvision / transformers / PIL / numpy must only be imported once
+classification is first used (SqlAlchemyUnitOfWork.classification); the
+script exits with status 1 when one of them is imported by a checked
+module, or when --budget-ms is exceeded, so it can run in CI.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-ms 2000
+    python -m benchmarks.import_time --module presentation.api.v1.diseases
+
+Run it from Backend with the deployment's DATABASE_URL driver installed:
+importing the app creates the SQLAlchemy engine.
+"""
+import argparse
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+MODULES = [
+    "create_tables",
+    "infrastructure.db.unit_of_work.sqlalchemy_uow",
+    "application.usecases.commands.patient.add_patient",
+    "application.usecases.commands.user.register_user",
+    "presentation.main",
+]
+HEAVY = ("torch", "torchvision", "transformers", "PIL", "numpy")
+
+# "import time: self [us] | cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def import_times(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Import module in a fresh interpreter.
+
+    Returns:
+        (total ms, {top-level package: cumulative ms} of every heavy package imported)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        # -X importtime interleaves its rows with the traceback: keep the error only
+        errors = [line for line in proc.stderr.strip().splitlines() if not line.startswith("import time:")]
+        raise SystemExit(f"import {module} failed:\n{errors[-1] if errors else proc.stderr.strip()}")
+
+    total = 0.0
+    heavy: Dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        name = match.group(4)
+        if not match.group(3):
+            # Top-level imports of `-c "import module"`, the module itself included
+            total += cumulative_ms
+        if name in HEAVY:
+            heavy[name] = max(heavy.get(name, 0.0), cumulative_ms)
+    return total, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", action="append", default=None, help="module to check (repeatable)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail when one import takes longer")
+    args = parser.parse_args()
+
+    failures: List[str] = []
+    print(f" {'module':<56}{'import ms':>11}  heavy packages")
+    for module in args.module or MODULES:
+        total, heavy = import_times(module)
+        pulled = ", ".join(f"{name} ({ms:.0f} ms)" for name, ms in heavy.items()) or "-"
+        print(f" {module:<56}{total:>11.0f}  {pulled}")
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)}")
+        if args.budget_ms is not None and total > args.budget_ms:
+            failures.append(f"{module} takes {total:.0f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if failures:
+        print()
+        for failure in failures:
+            print(f" FAIL {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
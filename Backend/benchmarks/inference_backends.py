@@ -0,0 +1,57 @@
+"""
+Throughput of the eager / torchscript / onnx inference backends.
+
+    python -m benchmarks.inference_backends
+    python -m benchmarks.inference_backends --backends eager onnx --batch-sizes 1 8 32
+
+Times the vision tower over random images and the text tower over padded
+phrase batches, per backend and batch size, with the real checkpoint (and the
+exported artifacts for torchscript / onnx).
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from infrastructure.ai.inference_backends import BACKENDS, create_backend
+
+
+def time_call(fn, repeats: int) -> np.ndarray:
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--seq-len", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    device = torch.device("cpu")
+    print(f"{'backend':<12} {'tower':<6} {'batch':>5} {'p50_ms':>8} {'items/s':>9}")
+    for name in args.backends:
+        backend = create_backend(name, device)
+        for batch in args.batch_sizes:
+            pixel_values = torch.randn(batch, 3, 224, 224)
+            input_ids = torch.randint(1000, 2000, (batch, args.seq_len))
+            attention_mask = torch.ones_like(input_ids)
+
+            for tower, fn in (
+                ("vision", lambda: backend.encode_images(pixel_values)),
+                ("text", lambda: backend.encode_text(input_ids, attention_mask)),
+            ):
+                t = time_call(fn, args.repeats)
+                p50 = np.percentile(t, 50)
+                print(f"{name:<12} {tower:<6} {batch:>5} {p50 * 1000:>8.1f} {batch / p50:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
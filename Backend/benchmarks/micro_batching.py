@@ -0,0 +1,92 @@
+"""
+Latency / throughput of the vision micro-batcher.
+
+Closed-loop clients (one thread each) submit single images to a MicroBatcher
+wrapping the Swin-B vision tower; every (window, max batch) configuration is
+measured at several client counts and reported as p50/p99 latency against
+throughput.
+
+    python -m benchmarks.micro_batching
+    python -m benchmarks.micro_batching --configs 0:1 5:4 10:8 20:16 --clients 1 4 8 16
+
+Weights are random: latency does not depend on their values, and the run
+needs neither the fine-tuned checkpoint nor network access.
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+import timm
+import torch
+import torch.nn.functional as F
+
+from infrastructure.ai.micro_batcher import MicroBatcher
+
+
+def build_encoder(model_name: str) -> torch.nn.Module:
+    model = timm.create_model(model_name, pretrained=False, num_classes=0, global_pool="avg")
+    return model.eval()
+
+
+def measure(batcher: MicroBatcher, clients: int, requests: int) -> tuple:
+    """Run `requests` single-image calls from `clients` threads; return (latencies_s, wall_s)"""
+    latencies = []
+    lock = threading.Lock()
+    remaining = [requests]
+    img = torch.randn(3, 224, 224)
+
+    def client():
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            batcher.run(img)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return np.array(latencies), time.perf_counter() - wall_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="swin_base_patch4_window7_224")
+    parser.add_argument("--configs", nargs="+", default=["0:1", "5:4", "10:8", "20:16"],
+                        help="window_ms:max_batch_size pairs")
+    parser.add_argument("--clients", nargs="+", type=int, default=[1, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=64, help="requests per measurement")
+    args = parser.parse_args()
+
+    encoder = build_encoder(args.model)
+
+    def run_batch(items):
+        with torch.no_grad():
+            return list(F.normalize(encoder(torch.stack(items)), dim=-1))
+
+    # One untimed pass so allocator growth does not land on the first config
+    run_batch([torch.randn(3, 224, 224)])
+
+    print(f"{'window_ms':>9} {'max_batch':>9} {'clients':>7} {'img/s':>8} {'p50_ms':>8} {'p99_ms':>8}")
+    for config in args.configs:
+        window_ms, max_batch = config.split(":")
+        batcher = MicroBatcher(run_batch, max_batch_size=int(max_batch), window_ms=float(window_ms))
+        try:
+            for clients in args.clients:
+                lat, wall = measure(batcher, clients, args.requests)
+                print(f"{window_ms:>9} {max_batch:>9} {clients:>7} {len(lat) / wall:>8.2f} "
+                      f"{np.percentile(lat, 50) * 1000:>8.1f} {np.percentile(lat, 99) * 1000:>8.1f}")
+        finally:
+            batcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Startup cost of building the MedCLIP towers and loading the checkpoint.
+
+Times each phase of load_medclip_model separately (architecture
+construction, reading the checkpoint, copying it into the parameters) and
+reports the peak RSS of the process, for the full model or the vision-only
+one. By default the parameters are built on the meta device and the
+memory-mapped checkpoint is assigned in their place, as load_medclip_model
+does; --copy randomly initialises them, reads the checkpoint into RAM and
+copies it into the parameters instead (the former behaviour).
+
+    python -m benchmarks.model_startup
+    python -m benchmarks.model_startup --vision-only --checkpoint path/to/best_model.safetensors
+    python -m benchmarks.model_startup --copy
+
+Run each configuration in a fresh process: peak RSS only ever grows.
+"""
+import argparse
+import resource
+import time
+from pathlib import Path
+
+import torch
+
+from infrastructure.ai.medclip_classifier import (
+    get_model_path,
+    parameters_on_meta,
+    read_state_dict,
+    recompute_meta_buffers,
+)
+
+
+def peak_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checkpoint", type=Path, default=None, help="defaults to get_model_path()")
+    parser.add_argument("--vision-only", action="store_true")
+    parser.add_argument("--copy", action="store_true", help="torch.load into RAM + copying load_state_dict")
+    args = parser.parse_args()
+    checkpoint = args.checkpoint or Path(get_model_path())
+    cpu = torch.device("cpu")
+
+    timings = []
+    start = time.perf_counter()
+
+    def phase(name: str):
+        nonlocal start
+        now = time.perf_counter()
+        timings.append((name, now - start))
+        start = now
+
+    from infrastructure.ai.clipCustopm import MedCLIPCustom, MedCLIPVision
+    phase("import")
+
+    model_cls = MedCLIPVision if args.vision_only else MedCLIPCustom
+    if args.copy:
+        model = model_cls(proj_dim=256, pretrained=False)
+    else:
+        with parameters_on_meta():
+            model = model_cls(proj_dim=256, pretrained=False)
+    phase("construct (config only)")
+
+    if args.copy:
+        state_dict = torch.load(checkpoint, map_location=cpu)
+        if args.vision_only:
+            state_dict = {k: v for k, v in state_dict.items() if k in model.state_dict()}
+    else:
+        state_dict = read_state_dict(checkpoint, cpu, args.vision_only)
+    phase("read checkpoint")
+
+    model.load_state_dict(state_dict, assign=not args.copy)
+    if not args.copy:
+        recompute_meta_buffers(model)
+    model.eval()
+    phase("load_state_dict")
+
+    for name, seconds in timings:
+        print(f" {name:<24} {seconds * 1000:>9.1f} ms")
+    print(f" {'total':<24} {sum(s for _, s in timings) * 1000:>9.1f} ms")
+    print(f" {'peak RSS':<24} {peak_rss_mib():>9.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 from datetime import timedelta
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
+from typing import List, Optional
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -25,6 +26,103 @@ class Settings(BaseSettings):
     # ── ML device preference ──────────────────────────────────
     device_str: str = "auto"  # auto | cpu | cuda
 
+    # ── Inference backend ──────────────────────────────────────
+    inference_backend: str = "eager"  # eager | torchscript | onnx
+    # exported towers (scripts.export_model) for torchscript / onnx
+    inference_artifacts_dir: Path = BASE_DIR / "infrastructure" / "ai" / "weights" / "exported"
+    # fp32 | int8 (dynamic quantization of the Linear layers, CPU only)
+    inference_precision: str = "fp32"
+    # pre-quantized weights (scripts.quantize_model); quantized at load if unset/missing
+    quantized_model_path: Optional[Path] = None
+    # local copy of the Bio_ClinicalBERT tokenizer (scripts.save_tokenizer);
+    # the Hugging Face hub is only contacted when it is missing
+    text_tokenizer_dir: Path = BASE_DIR / "infrastructure" / "ai" / "weights" / "tokenizer"
+    # API workers load only the vision tower + logit_scale and never import
+    # transformers; phrase embeddings come from scripts.rebuild_phrase_index
+    classification_vision_only: bool = False
+    # the model loads in the background at startup; a failed load (e.g. the
+    # database is not up yet) is retried after this many seconds
+    model_load_retry_seconds: float = 30.0
+    # compile the eager vision forward at load: none | trace | torch_compile
+    # (the torchscript / onnx backends are compiled already)
+    inference_compile: str = "none"
+    # dummy batches run before the model is reported ready, so the first
+    # requests do not pay for kernel selection / allocator growth
+    # (0 iterations disables); batch sizes default to 1 and the micro-batch cap,
+    # or every size up to the cap under torch_compile (one graph per size)
+    inference_warmup_iterations: int = 3
+    inference_warmup_batch_sizes: Optional[List[int]] = None
+
+    # ── CPU thread budget ──────────────────────────────────────
+    # intra-op threads per worker (default: the worker's share of the
+    # cores, i.e. cores // gunicorn workers); scripts.autotune_threads
+    # measures the best split for a machine
+    inference_intra_op_threads: Optional[int] = None
+    inference_inter_op_threads: int = 1
+    # pin every worker to its own slice of the cores (Linux only)
+    inference_cpu_affinity: bool = False
+
+    # ── Classification execution ──────────────────────────────
+    # inference threads per worker; keep >= classification_max_batch_size
+    # so concurrent requests can actually fill a vision batch
+    classification_max_concurrency: int = 8
+    # micro-batching of the vision encoder (max_batch_size 1 disables it)
+    classification_batch_window_ms: float = 10.0
+    classification_max_batch_size: int = 8
+    # content-hash cache of image embeddings: memory budget (0 disables)
+    # and optional on-disk tier that survives restarts
+    image_embedding_cache_bytes: int = 64 * 1024 * 1024
+    image_embedding_cache_dir: Optional[Path] = None
+    # archive uploaded originals under resources/uploads after responding
+    classification_persist_uploads: bool = True
+    # admission control: classify requests running or waiting for an
+    # inference thread (0 = unbounded); more are rejected with a 503, and
+    # requests still waiting after the deadline (0 = none) are dropped
+    classification_queue_depth: int = 32
+    classification_request_deadline_s: float = 30.0
+    # batch lane (job workers, bulk re-scoring): its own threads and queue,
+    # so it never takes capacity interactive requests need
+    classification_batch_max_concurrency: int = 2
+    classification_batch_queue_depth: int = 256
+    # interactive p99 latency (ms) inside the vision micro-batcher; batch-lane
+    # images per vision batch are cut while it is exceeded (None: no budget)
+    classification_interactive_p99_budget_ms: Optional[float] = 2000.0
+    # Retry-After (s) sent with 503s while the model is not ready yet or
+    # the inference queue is full
+    classification_retry_after_seconds: int = 5
+
+    # ── Model server ───────────────────────────────────────────
+    # Unix socket of scripts.model_server; when set, API and job workers
+    # load no model and hand preprocessed pixels to the server instead
+    model_server_socket: Optional[Path] = None
+    # a request without a reply after this long drops its connection
+    model_server_timeout_s: float = 60.0
+
+    # ── Classification jobs ────────────────────────────────────
+    # scripts.classification_worker polls the queue this often when idle;
+    # a job running longer than the timeout lost its worker and is
+    # requeued, until it has been claimed max_attempts times
+    classification_job_poll_seconds: float = 1.0
+    classification_job_timeout_s: float = 900.0
+    classification_job_max_attempts: int = 3
+
+    # ── Text encoder ───────────────────────────────────────────
+    # phrases are encoded in length-sorted batches capped by row count and
+    # by padded tokens (rows x longest row), bounding activation memory
+    text_encoder_max_batch_size: int = 64
+    text_encoder_max_batch_tokens: int = 4096
+    # LRU cache of phrase embeddings keyed by normalised text + weights
+    # (0 disables); shared template lines are encoded once
+    text_embedding_cache_bytes: int = 16 * 1024 * 1024
+
+    # ── Phrase ANN index ───────────────────────────────────────
+    # IVF index over the phrase embeddings once the catalog has this many
+    # phrases (0 disables); only the best candidate diseases are scored exactly
+    phrase_ann_min_phrases: int = 50_000
+    phrase_ann_lists: Optional[int] = None  # default: ~sqrt(phrases)
+    phrase_ann_probe: int = 8
+    phrase_ann_candidate_diseases: int = 64
+
     # ── MedCLIP model path ─────────────────────────────────────
     @property
     def medclip_model_path(self) -> Path:
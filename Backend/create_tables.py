@@ -1,5 +1,5 @@
 from infrastructure.db.session import engine
-from infrastructure.db.models import user, patient, disease, patient_disease
+from infrastructure.db.models import user, patient, disease, patient_disease, disease_phrase_embedding, classification_job
 from infrastructure.db.base import Base
 
 
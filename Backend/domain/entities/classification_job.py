@@ -0,0 +1,28 @@
+# domain/entities/classification_job.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List
+
+
+@dataclass(slots=True)
+class ClassificationJob:
+    id: str                      # uuid4 hex, handed to the client
+    status: str                  # queued | running | done | failed
+    max_phrases: int
+    top_k: int
+    image_count: int
+    created_by: int | None
+    created_at: datetime | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    attempts: int = 0
+    error: str | None = None
+    # per image, in upload order: {"index", "filename", "results": [{disease_name, score, best_phrase}]}
+    results: List[Dict[str, Any]] | None = None
+
+
+@dataclass(slots=True)
+class ClassificationJobImage:
+    position: int
+    filename: str
+    data: bytes  # encoded image file contents
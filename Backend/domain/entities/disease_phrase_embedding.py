@@ -0,0 +1,10 @@
+# domain/entities/disease_phrase_embedding.py
+from dataclasses import dataclass
+
+@dataclass(slots=True)
+class DiseasePhraseEmbedding:
+    id: int | None
+    disease_id: int
+    phrase: str
+    embedding: bytes  # float32 buffer of the projected, L2-normalised phrase embedding
+    model_version: str | None = None  # model that produced it; only comparable within one version
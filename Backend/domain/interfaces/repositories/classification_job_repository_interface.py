@@ -0,0 +1,70 @@
+# domain/interfaces/repositories/classification_job_repository_interface.py
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence
+
+from domain.entities.classification_job import ClassificationJob, ClassificationJobImage
+
+
+class IClassificationJobRepository(ABC):
+    """
+    Abstract repository for the durable queue of asynchronous
+    classification jobs (a job and the images it classifies).
+    """
+
+    # ---------- Commands ----------
+    @abstractmethod
+    def add(self, job: ClassificationJob, images: Sequence[ClassificationJobImage]) -> ClassificationJob:
+        """
+        Enqueue a job with its images.
+        """
+        ...
+
+    @abstractmethod
+    def claim_next(self, worker_id: str) -> Optional[ClassificationJob]:
+        """
+        Atomically move the oldest queued job to `running` for this worker.
+        Concurrent workers never claim the same job. Returns None when the
+        queue is empty.
+        """
+        ...
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, results: List[Dict[str, Any]]) -> bool:
+        """
+        Mark a job `worker_id` is running `done` with its per-image results;
+        its images are dropped. Returns False, touching nothing, when the job
+        is no longer running on that worker (it was requeued and reclaimed).
+        """
+        ...
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """
+        Mark a job `worker_id` is running `failed`; its images are dropped.
+        Returns False, touching nothing, when the job is no longer running
+        on that worker.
+        """
+        ...
+
+    @abstractmethod
+    def requeue_stale(self, timeout_s: float, max_attempts: int) -> int:
+        """
+        Put jobs running for longer than `timeout_s` (their worker died)
+        back in the queue, or fail them once they used `max_attempts`.
+        Returns the number of jobs touched.
+        """
+        ...
+
+    # ---------- Queries ----------
+    @abstractmethod
+    def get_by_id(self, job_id: str) -> Optional[ClassificationJob]:
+        ...
+
+    @abstractmethod
+    def list_images(self, job_id: str) -> List[ClassificationJobImage]:
+        """
+        Return the images of a job in upload order.
+        """
+        ...
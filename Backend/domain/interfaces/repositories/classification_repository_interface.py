@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
 
 from domain.entities.disease import Disease
+from domain.entities.disease_phrase_embedding import DiseasePhraseEmbedding
 
 
 class IClassificationRepository(ABC):
@@ -10,12 +11,12 @@ class IClassificationRepository(ABC):
     """
     
     @abstractmethod
-    def classify_image(self, image_path: str, diseases: List[Disease], max_phrases: int = 12, top_k: int = 5) -> List[dict]:
+    def classify_image(self, image: bytes, diseases: List[Disease], max_phrases: int = 12, top_k: int = 5) -> List[dict]:
         """
         Classify an image against a list of diseases.
         
         Args:
-            image_path: Path to the image file
+            image: Encoded image file contents (JPEG, PNG, ...)
             diseases: List of diseases to compare against
             max_phrases: Maximum number of phrases to sample per disease
             top_k: Number of top predictions to return
@@ -24,6 +25,24 @@ class IClassificationRepository(ABC):
             List of dictionaries with disease name, score, and best matching phrase
         """
         ...
+
+    @abstractmethod
+    def classify_images(self, images: List[bytes], diseases: List[Disease], max_phrases: int = 12, top_k: int = 5) -> Iterator[Union[List[dict], Exception]]:
+        """
+        Classify a series of images against a list of diseases.
+        
+        Args:
+            images: Encoded image file contents
+            diseases: List of diseases to compare against
+            max_phrases: Maximum number of phrases to sample per disease
+            top_k: Number of top predictions to return
+            
+        Yields:
+            Per image, in input order: list of dictionaries with disease name,
+            score, and best matching phrase; or, for an image that could not
+            be decoded, the exception (the other images are still classified)
+        """
+        ...
         
     @abstractmethod
     def initialize_model(self) -> None:
@@ -31,4 +50,94 @@ class IClassificationRepository(ABC):
         Initialize the classification model.
         This should be called once during application startup.
         """
-        ...
\ No newline at end of file
+        ...
+
+    @property
+    @abstractmethod
+    def is_ready(self) -> bool:
+        """
+        Whether the model is loaded and the phrase index is in memory, i.e.
+        classify_image returns without loading anything first.
+        """
+        ...
+
+    @abstractmethod
+    def model_status(self) -> Dict[str, Any]:
+        """
+        Load state of the model and phrase index ("not_loaded", "loading",
+        "loading_index", "ready" or "failed") with the loaded model version.
+        """
+        ...
+
+    @property
+    @abstractmethod
+    def model_version(self) -> Optional[str]:
+        """
+        Identifier of the loaded weights (checkpoint fingerprint plus
+        precision), or None before the model is loaded. Phrase embeddings
+        are only comparable with image embeddings of the same version.
+        """
+        ...
+
+    @abstractmethod
+    def encode_phrases(self, phrases: Sequence[str]) -> List[bytes]:
+        """
+        Encode description phrases with the text tower.
+
+        Args:
+            phrases: Phrases to encode
+
+        Returns:
+            One float32 buffer (projected, L2-normalised embedding) per phrase,
+            in input order
+        """
+        ...
+
+    @property
+    @abstractmethod
+    def can_encode_text(self) -> bool:
+        """
+        Whether encode_phrases is available. False when serving vision-only:
+        phrases are then encoded offline by a maintenance command.
+        """
+        ...
+
+    @property
+    @abstractmethod
+    def holds_phrase_index(self) -> bool:
+        """
+        Whether the phrase index lives in this process. False for a client
+        of a model server: load_phrase_index then ignores its entries (the
+        server reloads them from the database), so callers skip reading them.
+        """
+        ...
+
+    @abstractmethod
+    def load_phrase_index(self, entries: Sequence[DiseasePhraseEmbedding], version: str) -> None:
+        """
+        Replace the in-memory phrase index used by classify_image.
+
+        Args:
+            entries: Every stored phrase embedding of the catalog
+                     (unused when holds_phrase_index is False)
+            version: Fingerprint of the stored index the entries were read at
+        """
+        ...
+
+    @property
+    @abstractmethod
+    def phrase_index_version(self) -> Optional[str]:
+        """
+        Fingerprint of the currently loaded phrase index, or None if no
+        index has been loaded yet.
+        """
+        ...
+
+
+    @abstractmethod
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Runtime counters of the classification engine (cache hit rates, ...),
+        for monitoring and sizing.
+        """
+        ...
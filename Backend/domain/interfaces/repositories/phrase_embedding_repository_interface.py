@@ -0,0 +1,64 @@
+# domain/interfaces/repositories/phrase_embedding_repository_interface.py
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Optional, Sequence, Set
+
+from domain.entities.disease_phrase_embedding import DiseasePhraseEmbedding
+
+
+class IPhraseEmbeddingRepository(ABC):
+    """
+    Abstract repository for the persisted phrase-embedding index
+    (one row per description line of every disease and encoder: processes
+    running different checkpoints or precisions keep their own rows).
+    """
+
+    # ---------- Commands ----------
+    @abstractmethod
+    def replace_for_disease(
+        self,
+        disease_id: int,
+        phrases: Sequence[str],
+        embeddings: Sequence[bytes],
+        model_version: Optional[str],
+    ) -> None:
+        """
+        Drop the disease's phrases stored by `model_version` (and untagged
+        ones) and store the given ones; rows of other models are kept.
+        `phrases` and `embeddings` are parallel sequences.
+        """
+        ...
+
+    @abstractmethod
+    def delete_for_disease(self, disease_id: int) -> None:
+        """
+        Drop every stored phrase of the disease, whichever model encoded it
+        (e.g. after its description changed).
+        """
+        ...
+
+    # ---------- Queries ----------
+    @abstractmethod
+    def list_all(self, model_version: Optional[str] = None) -> Sequence[DiseasePhraseEmbedding]:
+        """
+        Return every stored phrase embedding (encoded by `model_version`,
+        when given), ordered by disease then id.
+        """
+        ...
+
+    @abstractmethod
+    def indexed_disease_ids(self, model_version: Optional[str] = None) -> Set[int]:
+        """
+        Return the ids of diseases that have at least one stored phrase
+        (encoded by `model_version`, when given).
+        """
+        ...
+
+    @abstractmethod
+    def version(self) -> str:
+        """
+        Return a cheap fingerprint of the index that changes whenever
+        rows are added, replaced or removed.
+        """
+        ...
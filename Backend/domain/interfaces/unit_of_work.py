@@ -4,6 +4,8 @@ from domain.interfaces.repositories.disease_repository_interface import IDisease
 from domain.interfaces.repositories.patient_disease_repository_interface import IPatientDiseaseRepository
 from domain.interfaces.repositories.user_repository_interface import IUserRepository
 from domain.interfaces.repositories.classification_repository_interface import IClassificationRepository
+from domain.interfaces.repositories.phrase_embedding_repository_interface import IPhraseEmbeddingRepository
+from domain.interfaces.repositories.classification_job_repository_interface import IClassificationJobRepository
 from typing import Optional, Any
 from domain.interfaces.repositories.token_blacklist_repository import (
     ITokenBlacklistRepository,
@@ -56,6 +58,14 @@ class IUnitOfWork(ABC):
     @abstractmethod
     def classification(self) -> IClassificationRepository: ...
 
+    @property
+    @abstractmethod
+    def phrase_embeddings(self) -> IPhraseEmbeddingRepository: ...
+
+    @property
+    @abstractmethod
+    def classification_jobs(self) -> IClassificationJobRepository: ...
+
     # ---------- sync context-manager ----------
     @abstractmethod
     def __enter__(self) -> "IUnitOfWork": ...
@@ -0,0 +1,75 @@
+"""
+gunicorn configuration: pre-forked uvicorn workers sharing one model.
+
+    gunicorn -c gunicorn.conf.py presentation.main:app
+    WEB_CONCURRENCY=8 gunicorn -c gunicorn.conf.py presentation.main:app
+
+The master imports the app (preload_app, before any hook runs), then in
+when_ready loads MedCLIP and the phrase index once and shares them before
+forking: the memory-mapped checkpoint weights through the page cache, the
+rest (computed buffers, int8 weights, the phrase index) moved to shared
+memory. Workers start with the model already initialised (their background
+load finds nothing to do) and map the same pages. Report the per-worker
+overhead with `python -m scripts.worker_memory --pid <master pid>`.
+
+With MODEL_SERVER_SOCKET set the model lives in scripts.model_server
+instead, and neither the master nor the workers load it.
+"""
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
+
+
+def _remote_model() -> bool:
+    from core.settings import settings
+
+    return settings.model_server_socket is not None
+
+
+def on_starting(server):
+    """Master, after the preloaded app is imported, before the model is loaded and any worker is forked"""
+    if _remote_model():
+        return
+    from infrastructure.ai.thread_budget import ThreadBudget, apply_thread_budget
+
+    # libgomp's thread pool does not survive fork: keep the master single-threaded.
+    # Importing the app only imports torch; no parallel op has run yet
+    apply_thread_budget(ThreadBudget(intra_op=1, inter_op=1))
+
+
+def when_ready(server):
+    """Master, after preloading the app, before the first fork"""
+    if _remote_model():
+        return
+    from infrastructure.db.repositories.classification_repository import ClassificationRepository
+    from infrastructure.db.session import engine
+    from presentation.model_loader import initialize_models
+
+    initialize_models()
+    ClassificationRepository().share_memory()
+    # Never hand pooled DB connections to the children
+    engine.dispose()
+
+
+def pre_fork(server, worker):
+    """Master: give the new worker the lowest free slot (its CPU slice when pinning)"""
+    used = {getattr(w, "cpu_slot", None) for w in server.WORKERS.values()}
+    worker.cpu_slot = next(slot for slot in range(len(used) + 1) if slot not in used)
+
+
+def post_fork(server, worker):
+    """Worker, right after the fork"""
+    from infrastructure.db.session import engine
+
+    engine.dispose(close=False)
+    if _remote_model():
+        return
+    from infrastructure.ai.thread_budget import apply_thread_budget, plan_thread_budget
+    from infrastructure.db.repositories.classification_repository import ClassificationRepository
+
+    ClassificationRepository().after_fork()
+    apply_thread_budget(plan_thread_budget(server.cfg.workers, worker.cpu_slot))
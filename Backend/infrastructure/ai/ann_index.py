@@ -0,0 +1,191 @@
+"""
+Inverted-file (IVF) approximate nearest-neighbour index over phrase embeddings.
+
+Phrase embeddings are clustered with spherical k-means; every phrase lives
+in the list of its nearest centroid. A query only visits the `n_probe`
+lists closest to it and returns the diseases owning its best matches, so
+exact per-disease scoring runs over a few candidate diseases instead of
+the whole catalog.
+"""
+
+import math
+from typing import Optional, Tuple
+
+import torch
+import torch.nn.functional as F
+
+# Rows per assignment matmul: bounds the (rows, lists) similarity buffer
+_ASSIGN_CHUNK = 16384
+# k-means is trained on at most this many points per list
+_TRAIN_POINTS_PER_LIST = 64
+# Centroids of a previous build are reused while the catalog size stays within this factor
+_RETRAIN_GROWTH = 2.0
+
+
+def _assign(x: torch.Tensor, centroids: torch.Tensor) -> torch.Tensor:
+    """Nearest centroid (max cosine similarity) of every row of x"""
+    return torch.cat([
+        (chunk @ centroids.T).argmax(dim=1) for chunk in torch.split(x, _ASSIGN_CHUNK)
+    ])
+
+
+def train_centroids(
+    x: torch.Tensor,
+    n_lists: int,
+    iterations: int = 10,
+    generator: Optional[torch.Generator] = None,
+) -> torch.Tensor:
+    """
+    Spherical k-means over L2-normalised rows.
+
+    Args:
+        x: (N, D) L2-normalised embeddings
+        n_lists: Number of centroids
+        iterations: Lloyd iterations
+        generator: Optional RNG for reproducible sampling / initialisation
+
+    Returns:
+        (n_lists, D) L2-normalised centroids
+    """
+    max_points = n_lists * _TRAIN_POINTS_PER_LIST
+    if x.shape[0] > max_points:
+        x = x[torch.randperm(x.shape[0], generator=generator, device=x.device)[:max_points]]
+
+    centroids = x[torch.randperm(x.shape[0], generator=generator, device=x.device)[:n_lists]].clone()
+    for _ in range(iterations):
+        assign = _assign(x, centroids)
+        sums = torch.zeros_like(centroids).index_add_(0, assign, x)
+        counts = torch.bincount(assign, minlength=n_lists)
+        # Empty lists keep their previous centroid
+        centroids = torch.where((counts > 0).unsqueeze(1), F.normalize(sums, dim=1), centroids)
+    return centroids
+
+
+class IVFIndex:
+    """Phrase rows bucketed by nearest centroid, each list stored contiguously"""
+
+    def __init__(self, centroids: torch.Tensor, embeddings: torch.Tensor, owner: torch.Tensor, trained_size: int):
+        """
+        Args:
+            centroids: (C, D) L2-normalised list centroids
+            embeddings: (N, D) phrase embeddings
+            owner: (N,) disease slot of every phrase
+            trained_size: Number of phrases the centroids were trained on
+        """
+        assign = _assign(embeddings, centroids)
+        order = torch.argsort(assign, stable=True)
+        counts = torch.bincount(assign, minlength=centroids.shape[0])
+
+        self.centroids = centroids
+        self.trained_size = trained_size
+        self.embeddings = embeddings[order].contiguous()   # list-major copy
+        self.owner = owner[order]
+        self.rows = order                                  # index row of every list entry
+        self.offsets = torch.cat([counts.new_zeros(1), torch.cumsum(counts, 0)]).tolist()
+
+    @classmethod
+    def build(
+        cls,
+        embeddings: torch.Tensor,
+        owner: torch.Tensor,
+        n_lists: Optional[int] = None,
+        previous: Optional["IVFIndex"] = None,
+        generator: Optional[torch.Generator] = None,
+    ) -> "IVFIndex":
+        """
+        Index phrase embeddings.
+
+        Args:
+            embeddings: (N, D) L2-normalised phrase embeddings
+            owner: (N,) disease slot of every phrase
+            n_lists: Number of lists, ~sqrt(N) by default
+            previous: Index of an earlier catalog version; its centroids are
+                      reused (no k-means) while the catalog size is comparable
+            generator: Optional RNG for reproducible training
+
+        Returns:
+            Ready-to-query IVFIndex
+        """
+        n = embeddings.shape[0]
+        if previous is not None and previous.reusable_for(n, embeddings.shape[1]):
+            return cls(previous.centroids, embeddings, owner, previous.trained_size)
+
+        n_lists = min(n_lists or max(1, int(math.sqrt(n))), n)
+        return cls(train_centroids(embeddings, n_lists, generator=generator), embeddings, owner, n)
+
+    def reusable_for(self, n: int, dim: int) -> bool:
+        """Whether these centroids still fit a catalog of n phrases of dimension dim"""
+        if dim != self.centroids.shape[1]:
+            return False
+        return 1 / _RETRAIN_GROWTH <= n / self.trained_size <= _RETRAIN_GROWTH
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    def candidate_slots(
+        self,
+        query: torch.Tensor,
+        allowed: torch.Tensor,
+        n_probe: int,
+        n_candidates: int,
+    ) -> torch.Tensor:
+        """
+        Diseases whose best phrase in the probed lists is closest to the query.
+
+        Args:
+            query: (D,) L2-normalised image embedding
+            allowed: (M,) bool, disease slots taking part in the request
+            n_probe: Number of lists to visit
+            n_candidates: Maximum number of disease slots to return
+
+        Returns:
+            (K,) candidate disease slots, best first
+        """
+        lists = (self.centroids @ query).topk(min(n_probe, self.n_lists)).indices.tolist()
+        spans = [(self.offsets[l], self.offsets[l + 1]) for l in lists]
+
+        # Lists are contiguous: no gather of the probed embeddings
+        sims = torch.cat([self.embeddings[a:b] @ query for a, b in spans])
+        owners = torch.cat([self.owner[a:b] for a, b in spans])
+
+        best = sims.new_full((allowed.shape[0],), float("-inf")).scatter_reduce(
+            0, owners, sims, reduce="amax", include_self=True
+        )
+        best[~allowed] = float("-inf")
+        k = min(n_candidates, int(torch.isfinite(best).sum()))
+        return best.topk(k).indices
+
+    def similarity_bounds(
+        self,
+        query: torch.Tensor,
+        selected: torch.Tensor,
+        n_probe: int,
+    ) -> Optional[Tuple[float, float]]:
+        """
+        Estimated lowest and highest similarity of the query to the selected phrases.
+
+        The highest is searched in the n_probe lists closest to the query, the
+        lowest in the n_probe lists closest to its opposite; exact when those
+        lists hold the extreme phrases, as they do for all lists.
+
+        Args:
+            query: (D,) L2-normalised image embedding
+            selected: (N,) bool over index rows, phrases taking part in the request
+            n_probe: Number of lists to visit per direction
+
+        Returns:
+            (lo, hi), or None when the probed lists hold no selected phrase
+        """
+        n_probe = min(n_probe, self.n_lists)
+        centroid_sims = self.centroids @ query
+        bounds = []
+        for lists, reduce in ((centroid_sims.topk(n_probe, largest=False).indices, torch.min),
+                              (centroid_sims.topk(n_probe).indices, torch.max)):
+            spans = [(self.offsets[l], self.offsets[l + 1]) for l in lists.tolist()]
+            sims = torch.cat([self.embeddings[a:b] @ query for a, b in spans])
+            keep = torch.cat([selected[self.rows[a:b]] for a, b in spans])
+            if not bool(keep.any()):
+                return None
+            bounds.append(float(reduce(sims[keep])))
+        return bounds[0], bounds[1]
@@ -3,7 +3,10 @@ import torch.nn as nn
 import torch.nn.functional as F
 import numpy as np
 import timm
-from transformers import AutoModel
+
+BIO_CLINICALBERT = "emilyalsentzer/Bio_ClinicalBERT"
+# Architecture of Bio_ClinicalBERT (bert-base-cased); every other field is a BertConfig default
+BIO_CLINICALBERT_CONFIG = {"vocab_size": 28996}
 
 class PhraseCrossAggregator(nn.Module):
     def __init__(self, dim: int, num_heads: int = 4):
@@ -26,10 +29,11 @@ class PhraseCrossAggregator(nn.Module):
 
 
 class SwinEncoder(nn.Module):
-    def __init__(self, model_name="swin_base_patch4_window7_224", proj_dim=256):
+    def __init__(self, model_name="swin_base_patch4_window7_224", proj_dim=256, pretrained=True):
+        """pretrained=False builds the architecture only (no ImageNet download), for loading a checkpoint"""
         super().__init__()
         self.model = timm.create_model(model_name,
-                                       pretrained=True,
+                                       pretrained=pretrained,
                                        num_classes=0,
                                        global_pool="avg")
         self.proj = nn.Linear(self.model.num_features, proj_dim)
@@ -41,9 +45,15 @@ class SwinEncoder(nn.Module):
 
 
 class BioClinicalBERTEncoder(nn.Module):
-    def __init__(self, proj_dim=256, n_heads=4):
+    def __init__(self, proj_dim=256, n_heads=4, pretrained=True):
+        """pretrained=False builds BERT from its config (no hub access), for loading a checkpoint"""
         super().__init__()
-        self.model = AutoModel.from_pretrained("emilyalsentzer/Bio_ClinicalBERT")
+        # Imported here so vision-only processes never load transformers
+        from transformers import AutoModel, BertConfig
+        if pretrained:
+            self.model = AutoModel.from_pretrained(BIO_CLINICALBERT)
+        else:
+            self.model = AutoModel.from_config(BertConfig(**BIO_CLINICALBERT_CONFIG))
         for p in self.model.parameters():
             p.requires_grad = False
         self.model.eval()
@@ -81,13 +91,27 @@ class BioClinicalBERTEncoder(nn.Module):
 
 
 class MedCLIPCustom(nn.Module):
-    def __init__(self, proj_dim=256):
+    def __init__(self, proj_dim=256, pretrained=True):
         super().__init__()
-        self.vision_encoder = SwinEncoder(proj_dim=proj_dim)
-        self.text_encoder   = BioClinicalBERTEncoder(proj_dim=proj_dim)
+        self.vision_encoder = SwinEncoder(proj_dim=proj_dim, pretrained=pretrained)
+        self.text_encoder   = BioClinicalBERTEncoder(proj_dim=proj_dim, pretrained=pretrained)
         self.logit_scale    = nn.Parameter(torch.ones([]) * np.log(1 / 0.07))
 
     def forward(self, images, input_ids, attention_mask):
         img_feat = self.vision_encoder(images)  # (B, D)
         txt_feat = self.text_encoder(input_ids, attention_mask, img_feat)  # (B, D)
-        return img_feat, txt_feat
\ No newline at end of file
+        return img_feat, txt_feat
+
+
+class MedCLIPVision(nn.Module):
+    """
+    Vision half of MedCLIPCustom for serving against precomputed phrase
+    embeddings: same parameter names, minus the whole text_encoder.
+    """
+    def __init__(self, proj_dim=256, pretrained=True):
+        super().__init__()
+        self.vision_encoder = SwinEncoder(proj_dim=proj_dim, pretrained=pretrained)
+        self.logit_scale    = nn.Parameter(torch.ones([]) * np.log(1 / 0.07))
+
+    def forward(self, images):
+        return self.vision_encoder(images)  # (B, D)
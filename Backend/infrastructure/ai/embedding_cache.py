@@ -0,0 +1,135 @@
+"""
+Bounded LRU cache of embeddings keyed by content hash.
+
+The memory tier evicts least-recently-used entries once the stored
+embeddings exceed a byte budget. An optional disk tier keeps one .npy file
+per key so entries survive restarts and memory evictions.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger("EmbeddingCache")
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU cache of float32 embeddings.
+
+    Args:
+        max_bytes: Memory budget for cached embeddings and their keys
+        disk_dir: Directory of the optional on-disk tier (None disables it)
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[Path] = None):
+        self._max_bytes = max_bytes
+        self._disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for key, or None on a miss"""
+        with self._lock:
+            emb = self._entries.get(key)
+            if emb is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return emb
+
+        emb = self._read_disk(key)
+        with self._lock:
+            if emb is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+            self._store(key, emb)
+        return emb
+
+    def put(self, key: str, emb: np.ndarray) -> None:
+        """Cache an embedding (and write it to the disk tier if enabled)"""
+        emb = np.ascontiguousarray(emb, dtype=np.float32)
+        emb.setflags(write=False)
+        with self._lock:
+            self._store(key, emb)
+        self._write_disk(key, emb)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and memory usage, for sizing the cache"""
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            return {
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits + self._disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+            }
+
+    # ------------------------------------------------------------------ #
+    # Memory tier (caller holds the lock)
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _entry_size(key: str, emb: np.ndarray) -> int:
+        return emb.nbytes + len(key)
+
+    def _store(self, key: str, emb: np.ndarray) -> None:
+        size = self._entry_size(key, emb)
+        if size > self._max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= self._entry_size(key, old)
+        self._entries[key] = emb
+        self._bytes += size
+        while self._bytes > self._max_bytes:
+            old_key, old_emb = self._entries.popitem(last=False)
+            self._bytes -= self._entry_size(old_key, old_emb)
+
+    # ------------------------------------------------------------------ #
+    # Disk tier
+    # ------------------------------------------------------------------ #
+    def _disk_path(self, key: str) -> Path:
+        return self._disk_dir / key[:2] / f"{key}.npy"
+
+    def _read_disk(self, key: str) -> Optional[np.ndarray]:
+        if self._disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            emb = np.load(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache file {path}: {e}")
+            return None
+        emb.setflags(write=False)
+        return emb
+
+    def _write_disk(self, key: str, emb: np.ndarray) -> None:
+        if self._disk_dir is None:
+            return
+        path = self._disk_path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                np.save(f, emb)
+            # Atomic rename: readers never see a half-written file
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache file {path}: {e}")
@@ -0,0 +1,318 @@
+"""
+Pluggable inference backends for the MedCLIP towers.
+
+Every backend turns pixels / token ids into the same projected,
+L2-normalised embeddings, so the classification code does not care which
+runtime produced them:
+
+* eager       – the PyTorch MedCLIPCustom module as trained
+* torchscript – traced + frozen towers (exported files, or traced at load)
+* onnx        – ONNX Runtime sessions over the exported graphs (CPU-friendly)
+
+Exported artifacts are produced by `python -m scripts.export_model` and live
+in settings.inference_artifacts_dir next to a medclip.json metadata file.
+
+Vision-only backends (settings.classification_vision_only) load the image
+tower alone; their encode_text raises.
+"""
+
+import json
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+from core.settings import settings
+from infrastructure.ai.medclip_classifier import (
+    checkpoint_fingerprint,
+    get_model_path,
+    load_medclip_model,
+    share_anonymous_memory,
+)
+
+logger = logging.getLogger("InferenceBackends")
+
+BACKENDS = ("eager", "torchscript", "onnx")
+
+METADATA_FILE = "medclip.json"
+VISION_ONNX, TEXT_ONNX = "vision.onnx", "text.onnx"
+VISION_TS, TEXT_TS = "vision.ts", "text.ts"
+
+
+# ─────────────────────────── Export wrappers ────────────────────────────
+class VisionTower(nn.Module):
+    """pixel_values (B, 3, 224, 224) -> image_embeds (B, D), L2-normalised"""
+
+    def __init__(self, model: nn.Module):
+        super().__init__()
+        self.encoder = model.vision_encoder
+
+    def forward(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        return F.normalize(self.encoder(pixel_values), dim=-1)
+
+
+class TextTower(nn.Module):
+    """(input_ids, attention_mask) (B, L) -> text_embeds (B, D), L2-normalised"""
+
+    def __init__(self, model: nn.Module):
+        super().__init__()
+        self.encoder = model.text_encoder
+
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        return F.normalize(self.encoder(input_ids, attention_mask), dim=-1)
+
+
+def model_metadata(model: nn.Module, model_version: str) -> Dict[str, Any]:
+    """Everything besides the towers that inference needs from a checkpoint"""
+    return {
+        "model_version": model_version,
+        "similarity_scale": float(model.logit_scale.exp().item()),
+        "embed_dim": int(model.vision_encoder.proj.out_features),
+    }
+
+
+def example_inputs(device: torch.device, batch: int = 2, seq_len: int = 16):
+    """Dummy inputs used to trace / export the towers"""
+    pixel_values = torch.randn(batch, 3, 224, 224, device=device)
+    input_ids = torch.randint(1000, 2000, (batch, seq_len), device=device)
+    attention_mask = torch.ones(batch, seq_len, dtype=torch.long, device=device)
+    return pixel_values, input_ids, attention_mask
+
+
+# ─────────────────────────── Backends ────────────────────────────
+class InferenceBackend(ABC):
+    """Common interface of the MedCLIP inference runtimes"""
+    name: str
+    model_version: str
+    similarity_scale: float   # exp(logit_scale) of the checkpoint
+    embed_dim: int
+
+    @abstractmethod
+    def encode_images(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        """(B, 3, 224, 224) -> (B, D) projected, L2-normalised"""
+        ...
+
+    @abstractmethod
+    def encode_text(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        """(B, L) token ids / mask -> (B, D) projected, L2-normalised"""
+        ...
+
+    def share_memory(self) -> None:
+        """Move the weights to shared memory before forking workers (no-op if not applicable)"""
+
+    def compile_vision(self, mode: str, device: torch.device) -> None:
+        """Compile the vision forward path: trace | torch_compile (no-op if already compiled)"""
+        logger.info(f"The {self.name} backend is compiled already, ignoring inference_compile='{mode}'")
+
+    def _set_metadata(self, metadata: Dict[str, Any]) -> None:
+        self.model_version = metadata["model_version"]
+        self.similarity_scale = metadata["similarity_scale"]
+        self.embed_dim = metadata["embed_dim"]
+
+
+def _text_tower_missing() -> RuntimeError:
+    return RuntimeError("The text tower is not loaded (vision-only serving); "
+                        "encode phrases with scripts.rebuild_phrase_index")
+
+
+class EagerBackend(InferenceBackend):
+    name = "eager"
+
+    def __init__(self, model: nn.Module, model_version: str):
+        self.model = model
+        self.vision = VisionTower(model).eval()
+        # MedCLIPVision models have no text_encoder
+        self.text = TextTower(model).eval() if hasattr(model, "text_encoder") else None
+        self._set_metadata(model_metadata(model, model_version))
+
+    def share_memory(self):
+        # The fp32 weights are mapped from the checkpoint file: only the
+        # computed buffers (and int8 weights) need moving
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        skipped = share_anonymous_memory(tensors)
+        if skipped:
+            logger.info(f"{skipped} of {len(tensors)} weight tensors are file-backed, left in the page cache")
+
+    def compile_vision(self, mode, device):
+        if mode == "trace":
+            # Not frozen: the traced graph keeps referencing the model's parameters
+            # (the mapped checkpoint), so the weights are not duplicated
+            pixel_values, _, _ = example_inputs(device)
+            with torch.no_grad():
+                self.vision = torch.jit.trace(self.vision, pixel_values)
+        elif mode == "torch_compile":
+            # Specialises per batch size on first use; the default warm-up runs every
+            # size up to classification_max_batch_size so none compiles mid-request
+            self.vision = torch.compile(self.vision, dynamic=False)
+        else:
+            raise ValueError(f"Unknown inference_compile '{mode}', expected none | trace | torch_compile")
+        logger.info(f"Vision forward compiled with {mode}")
+
+    def encode_images(self, pixel_values):
+        with torch.no_grad():
+            return self.vision(pixel_values)
+
+    def encode_text(self, input_ids, attention_mask):
+        if self.text is None:
+            raise _text_tower_missing()
+        with torch.no_grad():
+            return self.text(input_ids, attention_mask)
+
+
+class TorchScriptBackend(InferenceBackend):
+    name = "torchscript"
+
+    def __init__(self, vision: torch.jit.ScriptModule, text: Optional[torch.jit.ScriptModule], metadata: Dict[str, Any]):
+        self.vision = vision
+        self.text = text
+        self._set_metadata(metadata)
+
+    @classmethod
+    def trace(cls, model: nn.Module, model_version: str, device: torch.device) -> "TorchScriptBackend":
+        """Trace and freeze the towers of an eager model (the text one only if it has it)"""
+        pixel_values, input_ids, attention_mask = example_inputs(device)
+        with torch.no_grad():
+            vision = torch.jit.freeze(torch.jit.trace(VisionTower(model).eval(), pixel_values))
+            text = None
+            if hasattr(model, "text_encoder"):
+                text = torch.jit.freeze(torch.jit.trace(TextTower(model).eval(), (input_ids, attention_mask)))
+        return cls(vision, text, model_metadata(model, model_version))
+
+    @classmethod
+    def load(cls, artifacts_dir: Path, device: torch.device, vision_only: bool = False) -> "TorchScriptBackend":
+        """Load towers previously saved by scripts.export_model"""
+        return cls(
+            torch.jit.load(str(artifacts_dir / VISION_TS), map_location=device),
+            None if vision_only else torch.jit.load(str(artifacts_dir / TEXT_TS), map_location=device),
+            read_metadata(artifacts_dir),
+        )
+
+    def share_memory(self):
+        for tower in (self.vision, self.text):
+            if tower is not None:
+                tower.share_memory()
+
+    def encode_images(self, pixel_values):
+        with torch.no_grad():
+            return self.vision(pixel_values)
+
+    def encode_text(self, input_ids, attention_mask):
+        if self.text is None:
+            raise _text_tower_missing()
+        with torch.no_grad():
+            return self.text(input_ids, attention_mask)
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    name = "onnx"
+
+    def __init__(self, artifacts_dir: Path, device: torch.device, vision_only: bool = False):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("inference_backend='onnx' requires the onnxruntime package") from e
+
+        providers = ["CPUExecutionProvider"]
+        if device.type == "cuda" and "CUDAExecutionProvider" in ort.get_available_providers():
+            providers.insert(0, "CUDAExecutionProvider")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.device = device
+        self.vision = ort.InferenceSession(str(artifacts_dir / VISION_ONNX), options, providers=providers)
+        self.text = None if vision_only else ort.InferenceSession(str(artifacts_dir / TEXT_ONNX), options, providers=providers)
+        self._set_metadata(read_metadata(artifacts_dir))
+
+    def encode_images(self, pixel_values):
+        (out,) = self.vision.run(None, {"pixel_values": pixel_values.cpu().numpy()})
+        return torch.from_numpy(out).to(self.device)
+
+    def encode_text(self, input_ids, attention_mask):
+        if self.text is None:
+            raise _text_tower_missing()
+        (out,) = self.text.run(None, {
+            "input_ids": input_ids.cpu().numpy().astype("int64"),
+            "attention_mask": attention_mask.cpu().numpy().astype("int64"),
+        })
+        return torch.from_numpy(out).to(self.device)
+
+
+# ─────────────────────────── Factory ────────────────────────────
+def read_metadata(artifacts_dir: Path) -> Dict[str, Any]:
+    with open(artifacts_dir / METADATA_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_metadata(artifacts_dir: Path, metadata: Dict[str, Any]) -> None:
+    with open(artifacts_dir / METADATA_FILE, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+
+
+def _weights_path(precision: str) -> Path:
+    """The weights file an eager / traced model is actually built from"""
+    quantized_path = settings.quantized_model_path
+    if precision == "int8" and quantized_path is not None and quantized_path.exists():
+        return quantized_path
+    return Path(get_model_path())
+
+
+def _model_version(weights_path: Path, precision: str) -> str:
+    version = checkpoint_fingerprint(weights_path)
+    # int8 embeddings differ slightly from fp32 ones: keep their caches apart
+    return version if precision == "fp32" else f"{version}-{precision}"
+
+
+def _check_version(backend: InferenceBackend) -> InferenceBackend:
+    """Warn when exported towers were built from another checkpoint than the configured one"""
+    try:
+        model_path = Path(get_model_path())
+    except FileNotFoundError:
+        return backend
+    if checkpoint_fingerprint(model_path) != backend.model_version:
+        logger.warning(f"Exported {backend.name} towers ({backend.model_version}) do not match "
+                       f"{model_path.name}; re-run scripts.export_model")
+    return backend
+
+
+def create_backend(name: str, device: torch.device, vision_only: bool = False,
+                   precision: Optional[str] = None) -> InferenceBackend:
+    """
+    Build the configured inference backend
+
+    Args:
+        name: eager | torchscript | onnx
+        device: Device the embeddings should end up on
+        vision_only: Load the vision tower only (encode_text then raises)
+        precision: fp32 | int8 (defaults to settings.inference_precision)
+
+    Returns:
+        Ready-to-use InferenceBackend
+    """
+    artifacts_dir = settings.inference_artifacts_dir
+    precision = precision or settings.inference_precision
+
+    if name == "eager":
+        model = load_medclip_model(device, precision=precision, vision_only=vision_only)
+        return EagerBackend(model, _model_version(_weights_path(precision), precision))
+
+    if name == "torchscript":
+        if (artifacts_dir / VISION_TS).exists() and (vision_only or (artifacts_dir / TEXT_TS).exists()):
+            logger.info(f"Loading TorchScript towers from {artifacts_dir}")
+            return _check_version(TorchScriptBackend.load(artifacts_dir, device, vision_only))
+        logger.info("No exported TorchScript towers found, tracing at load time")
+        model = load_medclip_model(device, precision=precision, vision_only=vision_only)
+        return TorchScriptBackend.trace(model, _model_version(_weights_path(precision), precision), device)
+
+    if name == "onnx":
+        if precision != "fp32":
+            logger.warning(f"inference_precision='{precision}' is ignored by the onnx backend; "
+                           "quantize the exported graphs instead")
+        logger.info(f"Loading ONNX graphs from {artifacts_dir}")
+        return _check_version(OnnxRuntimeBackend(artifacts_dir, device, vision_only))
+
+    raise ValueError(f"Unknown inference backend '{name}', expected one of {BACKENDS}")
@@ -0,0 +1,265 @@
+"""
+Dedicated executor for CPU/GPU-bound classification work.
+
+Inference must never run on the event loop: a single forward pass would
+stall every other request on the worker (logins, patient lookups, ...).
+Calls go through bounded thread pools instead, and the pool sizes are the
+concurrency limit on the one shared, read-only MedCLIP model.
+
+Every call runs in a priority lane (infrastructure.ai.lanes) with its own
+pool and admission queue, so bulk work can neither take the threads nor
+fill the queue interactive requests need; inside the model the vision
+micro-batcher serves the interactive lane first.
+
+Requests are admitted in front of the pools (submit_inference): at most
+the lane's queue depth of calls may be running or waiting, a call still
+waiting after settings.classification_request_deadline_s is dropped, and
+so is the call of a client that disconnected while it waited. Only work
+somebody is still waiting for reaches the model. A request that runs
+several calls (a streamed batch) holds one slot for all of them
+(reserve_inference_slot).
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from core.settings import settings
+from infrastructure.ai.lanes import BATCH, INTERACTIVE, LANES, LatencyWindow, inference_lane
+
+logger = logging.getLogger("InferenceExecutor")
+
+T = TypeVar("T")
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executor_lock = threading.Lock()
+
+# How often a waiting request checks its client and deadline
+_POLL_INTERVAL_S = 0.1
+
+
+class InferenceQueueFullError(Exception):
+    """Raised when the inference queue is at its configured depth."""
+
+
+class InferenceDeadlineError(Exception):
+    """Raised when a request waited longer than its deadline for an inference thread."""
+
+
+class InferenceCancelledError(Exception):
+    """Raised when the client disconnected before its inference started."""
+
+
+class _Admission:
+    """Admitted-call counter and outcome counters of the inference queue"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait = LatencyWindow()   # admission -> thread start
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.expired = 0
+        self.cancelled = 0
+
+    def try_admit(self, depth: int) -> bool:
+        with self._lock:
+            if depth > 0 and self.in_flight >= depth:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def count(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+
+_admissions = {lane: _Admission() for lane in LANES}
+
+
+class InferenceSlot:
+    """An admission slot held across several inference calls of one request"""
+
+    def __init__(self, lane: str):
+        self.lane = lane
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        """Give the slot back (idempotent)"""
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        _admissions[self.lane].release()
+
+
+def reserve_inference_slot(lane: str = INTERACTIVE) -> InferenceSlot:
+    """
+    Admit a multi-step request to a lane's bounded queue once.
+
+    Its calls then go through submit_inference(..., slot=slot), which keeps
+    the deadline and disconnect checks but does not admit them again. The
+    caller releases the slot when the request is done.
+
+    Raises:
+        InferenceQueueFullError: The lane's queue is at its depth
+    """
+    depth = _lane_limits(lane)[1]
+    if not _admissions[lane].try_admit(depth):
+        raise InferenceQueueFullError(f"The {lane} inference queue is full ({depth} requests)")
+    return InferenceSlot(lane)
+
+
+def _lane_limits(lane: str) -> Tuple[int, int]:
+    """(threads, queue depth) of a lane"""
+    if lane == BATCH:
+        return settings.classification_batch_max_concurrency, settings.classification_batch_queue_depth
+    return settings.classification_max_concurrency, settings.classification_queue_depth
+
+
+def get_inference_executor(lane: str = INTERACTIVE) -> ThreadPoolExecutor:
+    """Return the process-wide inference pool of a lane, creating it on first use"""
+    executor = _executors.get(lane)
+    if executor is None:
+        with _executor_lock:
+            executor = _executors.get(lane)
+            if executor is None:
+                workers = max(1, _lane_limits(lane)[0])
+                logger.info(f"Starting {lane} inference executor with {workers} workers")
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"inference-{lane}")
+                _executors[lane] = executor
+    return executor
+
+
+def _in_lane(lane: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    with inference_lane(lane):
+        return fn(*args, **kwargs)
+
+
+async def run_inference(fn: Callable[..., T], *args: Any, lane: str = INTERACTIVE, **kwargs: Any) -> T:
+    """
+    Run a blocking inference call on a lane's pool and await its result.
+
+    Args:
+        fn: Blocking callable (e.g. a classification use case)
+        *args, **kwargs: Arguments forwarded to fn
+        lane: Priority lane of the call
+
+    Returns:
+        Whatever fn returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_inference_executor(lane), functools.partial(_in_lane, lane, fn, *args, **kwargs))
+
+
+async def submit_inference(
+    fn: Callable[..., T],
+    *args: Any,
+    lane: str = INTERACTIVE,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    slot: Optional[InferenceSlot] = None,
+    **kwargs: Any,
+) -> T:
+    """
+    Admit a blocking inference call to a lane's bounded queue and await its result.
+
+    Args:
+        fn: Blocking callable (e.g. a classification use case)
+        *args, **kwargs: Arguments forwarded to fn
+        lane: Priority lane of the call
+        is_disconnected: Async check of the client connection (Request.is_disconnected);
+                         the call is dropped if it turns True before fn starts
+        slot: Slot of the request from reserve_inference_slot; the call is
+              then not admitted (or counted against the depth) again
+
+    Returns:
+        Whatever fn returns
+
+    Raises:
+        InferenceQueueFullError: The lane's queue is at its depth
+        InferenceDeadlineError: fn did not start within settings.classification_request_deadline_s
+        InferenceCancelledError: The client disconnected before fn started
+    """
+    admission = _admissions[lane]
+    if slot is None:
+        depth = _lane_limits(lane)[1]
+        if not admission.try_admit(depth):
+            raise InferenceQueueFullError(f"The {lane} inference queue is full ({depth} requests)")
+    elif slot.lane != lane:
+        raise ValueError(f"A {slot.lane} slot cannot admit a {lane} call")
+
+    deadline = settings.classification_request_deadline_s
+    enqueued = time.monotonic()
+
+    def expired() -> bool:
+        return deadline > 0 and time.monotonic() - enqueued > deadline
+
+    def guarded():
+        admission.wait.add((time.monotonic() - enqueued) * 1000)
+        # Last check before the model: the waiting side may not have noticed yet
+        if expired():
+            raise InferenceDeadlineError(f"Request waited more than {deadline:g} s for an inference thread")
+        return _in_lane(lane, fn, *args, **kwargs)
+
+    try:
+        future = get_inference_executor(lane).submit(guarded)
+    except BaseException:
+        if slot is None:
+            admission.release()
+        raise
+    if slot is None:
+        # The slot is held until the call actually finishes (or is dropped unstarted)
+        future.add_done_callback(lambda _: admission.release())
+
+    waiter = asyncio.wrap_future(future)
+    try:
+        # Until a thread picks the call up, keep checking whether anybody still wants it
+        while not future.running():
+            done, _ = await asyncio.wait({waiter}, timeout=_POLL_INTERVAL_S)
+            if done:
+                break
+            if expired() and future.cancel():
+                raise InferenceDeadlineError(f"Request waited more than {deadline:g} s for an inference thread")
+            if is_disconnected is not None and await is_disconnected() and future.cancel():
+                admission.count("cancelled")
+                raise InferenceCancelledError("Client disconnected before inference started")
+        return await waiter
+    except InferenceDeadlineError:
+        admission.count("expired")
+        raise
+
+
+def inference_queue_stats() -> Dict[str, Dict[str, Any]]:
+    """Per lane: depth, outcome counters and wait-for-a-thread percentiles"""
+    return {
+        lane: {
+            "depth": _lane_limits(lane)[1],
+            "in_flight": admission.in_flight,
+            "admitted": admission.admitted,
+            "rejected": admission.rejected,
+            "expired": admission.expired,
+            "cancelled": admission.cancelled,
+            "wait_p50_ms": admission.wait.percentile(0.50),
+            "wait_p99_ms": admission.wait.percentile(0.99),
+        }
+        for lane, admission in _admissions.items()
+    }
+
+
+def shutdown_inference_executor() -> None:
+    """Wait for running inferences and release the pool threads"""
+    with _executor_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=True)
+        _executors.clear()
@@ -0,0 +1,71 @@
+"""
+Priority lanes of the classification execution path.
+
+* interactive – a doctor waiting on the answer (POST /classification/classify, ...)
+* batch       – bulk work nobody watches live (job workers, archive re-scoring,
+                evaluation runs)
+
+The lane of the current inference call travels in a context variable, set
+by the inference executor around the call, so the repository and the
+vision micro-batcher see it without threading it through every signature.
+Interactive work goes first at every vision batch boundary; batch work
+gets whatever capacity the interactive latency budget leaves.
+"""
+
+import contextlib
+import contextvars
+import threading
+from collections import deque
+from typing import Dict, Iterator
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+LANES = (INTERACTIVE, BATCH)   # most urgent first
+
+_current_lane: contextvars.ContextVar[str] = contextvars.ContextVar("inference_lane", default=INTERACTIVE)
+
+
+def current_lane() -> str:
+    """Lane of the inference call running on this thread (interactive by default)"""
+    return _current_lane.get()
+
+
+@contextlib.contextmanager
+def inference_lane(lane: str) -> Iterator[None]:
+    """Run the enclosed inference in `lane`"""
+    if lane not in LANES:
+        raise ValueError(f"Unknown inference lane '{lane}', expected one of {LANES}")
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+class LatencyWindow:
+    """Percentiles over the most recent samples (thread-safe)"""
+
+    def __init__(self, size: int = 1024):
+        self._samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, ms: float) -> None:
+        with self._lock:
+            self._samples.append(ms)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def stats(self) -> Dict[str, float]:
+        return {"p50_ms": self.percentile(0.50), "p99_ms": self.percentile(0.99)}
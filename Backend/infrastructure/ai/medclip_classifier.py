@@ -2,19 +2,255 @@
 Infrastructure implementation of the MedCLIP classifier
 """
 
+import contextlib
+import functools
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import torch
+import torch.nn as nn
+
 from core.settings import settings
 
+logger = logging.getLogger("MedCLIPClassifier")
+
+# State dict keys of the BioClinicalBERT tower inside a MedCLIPCustom checkpoint
+TEXT_ENCODER_PREFIX = "text_encoder."
+
 
 def get_model_path() -> str:
     """
-    Get the path to the MedCLIP model file
+    Get the path to the MedCLIP model file. A safetensors copy written by
+    scripts.convert_checkpoint next to best_model.pth takes precedence.
 
     Returns:
         Path to the model file as a string
     """
     model_path = settings.medclip_model_path
+    converted = model_path.with_suffix(".safetensors")
+    if converted.exists():
+        return str(converted)
 
     if not model_path.exists():
         raise FileNotFoundError(f"MedCLIP model not found at {model_path}")
 
     return str(model_path)
+
+
+def load_tokenizer():
+    """
+    Load the Bio_ClinicalBERT tokenizer from the local copy written by
+    scripts.save_tokenizer (no network), or from the hub when there is none.
+    """
+    from transformers import AutoTokenizer
+
+    from infrastructure.ai.clipCustopm import BIO_CLINICALBERT
+
+    tokenizer_dir = settings.text_tokenizer_dir
+    source = str(tokenizer_dir) if tokenizer_dir.exists() else BIO_CLINICALBERT
+    logger.info(f"Loading Bio_ClinicalBERT tokenizer from {source}...")
+    return AutoTokenizer.from_pretrained(source)
+
+
+def checkpoint_fingerprint(model_path: Path) -> str:
+    """
+    Short identifier of the weights in a checkpoint file.
+
+    Hashes tensor names, dtypes, shapes and contents rather than file
+    metadata, so copies of one checkpoint on other hosts, redeploys and the
+    .safetensors conversion of a .pth all share it. Anything derived from
+    the weights (cached, stored or exported embeddings) is only valid for
+    one fingerprint. Computed once per process and file state.
+    """
+    stat = model_path.stat()
+    return _content_fingerprint(str(model_path), stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=8)
+def _content_fingerprint(path: str, size: int, mtime_ns: int) -> str:
+    digest = hashlib.sha1()
+    try:
+        state_dict = read_state_dict(Path(path), torch.device("cpu"))
+    except Exception:
+        state_dict = None
+    if isinstance(state_dict, dict) and all(isinstance(t, torch.Tensor) for t in state_dict.values()):
+        for key in sorted(state_dict):
+            tensor = state_dict[key].contiguous()
+            digest.update(f"{key}:{tensor.dtype}:{tuple(tensor.shape)}".encode())
+            digest.update(tensor.reshape(-1).view(torch.uint8).numpy())
+    else:
+        # Not a plain state dict (e.g. packed int8 weights): hash the file itself
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def file_mapped_ranges() -> List[Tuple[int, int]]:
+    """Address ranges of this process's file-backed mappings (empty where /proc is missing)"""
+    ranges = []
+    try:
+        with open("/proc/self/maps") as maps:
+            for line in maps:
+                fields = line.split()
+                # address perms offset dev inode [path]; inode 0 is anonymous
+                if len(fields) >= 6 and fields[4] != "0" and fields[5].startswith("/"):
+                    start, end = (int(address, 16) for address in fields[0].split("-"))
+                    ranges.append((start, end))
+    except OSError:
+        pass
+    return ranges
+
+
+def share_anonymous_memory(tensors: Iterable[torch.Tensor]) -> int:
+    """
+    share_memory_() every tensor that is not memory-mapped from a file.
+
+    Checkpoint tensors from read_state_dict already live in the page cache,
+    which forked workers share; share_memory_() would copy them into
+    anonymous shared memory instead. Returns how many tensors were skipped.
+    """
+    mapped = file_mapped_ranges()
+    skipped = 0
+    for tensor in tensors:
+        address = tensor.untyped_storage().data_ptr()
+        if any(start <= address < end for start, end in mapped):
+            skipped += 1
+        else:
+            tensor.share_memory_()
+    return skipped
+
+
+@contextlib.contextmanager
+def parameters_on_meta():
+    """
+    Create every nn.Parameter on the meta device while a model is built:
+    no memory and no random init for weights a checkpoint replaces anyway.
+
+    Unlike building the whole model under torch.device("meta"), buffers are
+    still created for real: the Swin relative-position tables / attention
+    masks and BERT's position ids are not in the checkpoint. Buffers derived
+    from a parameter's device end up on meta; call
+    recompute_meta_buffers once the weights are loaded.
+    """
+    register_parameter = nn.Module.register_parameter
+
+    def register_on_meta(module, name, param):
+        if param is not None and param.device.type != "meta":
+            param = nn.Parameter(param.to("meta"), requires_grad=param.requires_grad)
+        register_parameter(module, name, param)
+
+    nn.Module.register_parameter = register_on_meta
+    try:
+        yield
+    finally:
+        nn.Module.register_parameter = register_parameter
+
+
+def recompute_meta_buffers(model: nn.Module) -> None:
+    """Refill buffers left on meta by parameters_on_meta (timm's _init_buffers hook)"""
+    for module in model.modules():
+        if any(b.is_meta for b in module.buffers(recurse=False)) and hasattr(module, "_init_buffers"):
+            module._init_buffers()
+    leftover = [name for name, b in model.named_buffers() if b.is_meta]
+    if leftover:
+        raise RuntimeError(f"Buffers left on the meta device after loading: {leftover}")
+
+
+def quantize_medclip_model(model: nn.Module) -> nn.Module:
+    """
+    Dynamic int8 quantization of every nn.Linear in both towers (CPU only).
+    Weights are stored as int8 and activations quantized on the fly, which
+    cuts the Linear-dominated Swin/BERT weights roughly 4x.
+    """
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def read_state_dict(path: Path, device: torch.device, vision_only: bool = False) -> Dict[str, torch.Tensor]:
+    """
+    Memory-map a MedCLIPCustom checkpoint instead of reading it into RAM.
+
+    Safetensors files and zip-format .pth files are both mapped read-only:
+    CPU tensors share the file's pages in the OS page cache, so worker
+    processes on one host hold a single copy of the weights.
+
+    Args:
+        path: .safetensors or .pth checkpoint
+        device: Device the tensors should end up on
+        vision_only: Drop the text tower's entries
+
+    Returns:
+        State dict
+    """
+    if path.suffix == ".safetensors":
+        from safetensors import safe_open
+
+        with safe_open(str(path), framework="pt", device=str(device)) as f:
+            return {
+                k: f.get_tensor(k) for k in f.keys()
+                if not (vision_only and k.startswith(TEXT_ENCODER_PREFIX))
+            }
+
+    state_dict = torch.load(path, map_location=device, mmap=True, weights_only=True)
+    if vision_only:
+        state_dict = {k: v for k, v in state_dict.items() if not k.startswith(TEXT_ENCODER_PREFIX)}
+    return state_dict
+
+
+def _load_quantized_weights(model: nn.Module, path: Path, device: torch.device, vision_only: bool) -> None:
+    """Load a quantized state dict (packed int8 params cannot be memory-mapped)"""
+    state_dict = torch.load(path, map_location=device)
+    if vision_only:
+        state_dict = {k: v for k, v in state_dict.items() if not k.startswith(TEXT_ENCODER_PREFIX)}
+    model.load_state_dict(state_dict)
+
+
+def load_medclip_model(device: torch.device, model_path: Optional[Path] = None, precision: str = "fp32",
+                       vision_only: bool = False):
+    """
+    Build MedCLIPCustom and load the fine-tuned weights
+
+    Args:
+        device: Device to place the model on
+        model_path: Checkpoint to load (defaults to settings.medclip_model_path)
+        precision: fp32, or int8 for dynamic quantization (CPU only). With
+            int8, a pre-quantized settings.quantized_model_path is loaded
+            directly when it exists; otherwise the fp32 weights are
+            quantized at load time.
+        vision_only: Build MedCLIPVision (vision tower + logit_scale) and skip
+            the text tower's weights; transformers is never imported
+
+    Returns:
+        MedCLIPCustom (or MedCLIPVision) in eval mode
+    """
+    from infrastructure.ai.clipCustopm import MedCLIPCustom, MedCLIPVision
+
+    model_cls = MedCLIPVision if vision_only else MedCLIPCustom
+
+    if precision not in ("fp32", "int8"):
+        raise ValueError(f"Unknown precision '{precision}', expected fp32 or int8")
+    if precision == "int8" and device.type != "cpu":
+        raise ValueError("int8 dynamic quantization is only supported on CPU")
+
+    quantized_path = settings.quantized_model_path
+    if precision == "int8" and quantized_path is not None and quantized_path.exists():
+        # Quantize the freshly built modules first so the state dict keys match
+        model = quantize_medclip_model(model_cls(proj_dim=256, pretrained=False).eval())
+        _load_quantized_weights(model, quantized_path, device, vision_only)
+        return model.eval()
+
+    model_path = Path(model_path or get_model_path())
+    # Architecture from config only, with meta parameters; the memory-mapped
+    # checkpoint tensors then become its parameters (assign=True, strict, so
+    # none is left on meta) and only the computed buffers move to the device
+    with parameters_on_meta():
+        model = model_cls(proj_dim=256, pretrained=False)
+    model.load_state_dict(read_state_dict(model_path, device, vision_only), assign=True)
+    recompute_meta_buffers(model)
+    model.to(device).eval()
+
+    if precision == "int8":
+        model = quantize_medclip_model(model).eval()
+    return model
@@ -0,0 +1,227 @@
+"""
+Dynamic micro-batching for model forward passes.
+
+Inference threads submit single items; a scheduler thread collects whatever
+arrives within a short window (or until the batch is full), runs one
+batched call and hands each caller its own result. On CPU a batch of N
+Swin forward passes costs far less than N batch-1 passes.
+
+Items are submitted to priority lanes (see infrastructure.ai.lanes). Every
+batch is filled from the most urgent lane first, so urgent items overtake
+queued background items at the next batch boundary. With a latency budget,
+the number of background items riding in one batch (which every item of
+that batch waits for) is adapted so the urgent lane's p99 stays within it.
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, TypeVar
+
+from infrastructure.ai.lanes import LatencyWindow
+
+logger = logging.getLogger("MicroBatcher")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# The background limit follows the urgent lane's p99 over its most recent items
+_BUDGET_WINDOW = 200
+_MIN_BUDGET_SAMPLES = 20
+# Without urgent items for this long, the background limit grows back
+_IDLE_RECOVERY_S = 5.0
+
+
+@dataclass(order=True)
+class _Pending(Generic[T, R]):
+    priority: int                  # lane index, 0 = most urgent
+    seq: int                       # FIFO inside a lane
+    item: Any = field(compare=False)
+    submitted: float = field(compare=False, default_factory=time.perf_counter)
+    future: "Future[R]" = field(compare=False, default_factory=Future)
+
+
+_STOP = object()
+
+
+class _LaneStats:
+    def __init__(self):
+        self.queued = 0
+        self.processed = 0
+        self.wait = LatencyWindow()      # submit -> batch start
+        self.latency = LatencyWindow()   # submit -> result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "processed": self.processed,
+            "wait_p50_ms": self.wait.percentile(0.50),
+            "wait_p99_ms": self.wait.percentile(0.99),
+            "latency_p50_ms": self.latency.percentile(0.50),
+            "latency_p99_ms": self.latency.percentile(0.99),
+        }
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Coalesce items submitted from many threads into batched calls.
+
+    Args:
+        run_batch: Called with a list of items, must return one result per item
+        max_batch_size: Upper bound on items per call
+        window_ms: How long to wait for more items after the first one arrives
+        name: Name of the scheduler thread
+        lanes: Lane names, most urgent first
+        latency_budget_ms: p99 latency budget of the first lane; background
+                           items per batch are cut while it is exceeded
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[T]], Sequence[R]],
+        max_batch_size: int,
+        window_ms: float,
+        name: str = "micro-batcher",
+        lanes: Sequence[str] = ("default",),
+        latency_budget_ms: Optional[float] = None,
+    ):
+        self._run_batch = run_batch
+        self._max_batch_size = max(1, max_batch_size)
+        self._window = max(0.0, window_ms) / 1000.0
+        self._lanes = list(lanes)
+        self._budget_ms = latency_budget_ms
+        # Background items allowed in one batch (adapted against the budget)
+        self._background_limit = self._max_batch_size
+        self._urgent_recent = LatencyWindow(_BUDGET_WINDOW)
+        self._urgent_last_seen = 0.0
+        self._lane_stats = [_LaneStats() for _ in self._lanes]
+        self._stats_lock = threading.Lock()
+        self._seq = itertools.count()
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+    def submit(self, item: T, lane: Optional[str] = None) -> "Future[R]":
+        """Queue one item (in the first lane by default) and return a future for its result"""
+        priority = self._lanes.index(lane) if lane is not None else 0
+        pending = _Pending(priority, next(self._seq), item)
+        with self._stats_lock:
+            self._lane_stats[priority].queued += 1
+        self._queue.put(pending)
+        return pending.future
+
+    def run(self, item: T, timeout: Optional[float] = None, lane: Optional[str] = None) -> R:
+        """Queue one item and block until its result is ready"""
+        return self.submit(item, lane).result(timeout=timeout)
+
+    def stop(self) -> None:
+        """Finish queued work and stop the scheduler thread"""
+        # Sorts after every queued item
+        self._queue.put(_Pending(len(self._lanes), next(self._seq), _STOP))
+        self._thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-lane queue depth and wait / latency percentiles"""
+        with self._stats_lock:
+            lanes = {name: lane.stats() for name, lane in zip(self._lanes, self._lane_stats)}
+        return {
+            "lanes": lanes,
+            "background_batch_limit": self._background_limit,
+            "latency_budget_ms": self._budget_ms,
+        }
+
+    # ------------------------------------------------------------------ #
+    # Scheduler
+    # ------------------------------------------------------------------ #
+    def _collect(self, first: _Pending) -> tuple:
+        batch = [first]
+        background = int(first.priority > 0)
+        stop = False
+        deadline = time.monotonic() + self._window
+        while len(batch) < self._max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                # Even with the window elapsed, take what is already queued
+                nxt = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if nxt.item is _STOP:
+                stop = True
+                break
+            if nxt.priority > 0:
+                if background >= self._background_limit:
+                    # Most urgent first: nothing more urgent is left, leave it for a later batch
+                    self._queue.put(nxt)
+                    break
+                background += 1
+            batch.append(nxt)
+        return batch, stop
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first.item is _STOP:
+                return
+
+            batch, stop = self._collect(first)
+            started = time.perf_counter()
+            self._record(batch, started, "wait")
+            try:
+                results = self._run_batch([p.item for p in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"run_batch returned {len(results)} results for {len(batch)} items")
+                for pending, result in zip(batch, results):
+                    pending.future.set_result(result)
+            except Exception as e:
+                logger.error(f"Batch of {len(batch)} failed: {e}", exc_info=True)
+                for pending in batch:
+                    pending.future.set_exception(e)
+            self._record(batch, time.perf_counter(), "latency")
+            self._adapt()
+
+            if stop:
+                return
+
+    def _record(self, batch: List[_Pending], now: float, window: str) -> None:
+        with self._stats_lock:
+            for pending in batch:
+                lane = self._lane_stats[pending.priority]
+                ms = (now - pending.submitted) * 1000
+                getattr(lane, window).add(ms)
+                if window == "wait":
+                    lane.queued -= 1
+                else:
+                    lane.processed += 1
+                    if pending.priority == 0:
+                        self._urgent_recent.add(ms)
+                        self._urgent_last_seen = now
+
+    def _adapt(self) -> None:
+        """AIMD on the background items per batch, against the first lane's p99 latency"""
+        if self._budget_ms is None or len(self._lanes) < 2:
+            return
+        limit = self._background_limit
+        p99 = self._urgent_recent.percentile(0.99)
+        if time.perf_counter() - self._urgent_last_seen > _IDLE_RECOVERY_S:
+            # Nobody urgent to protect right now
+            limit = min(self._max_batch_size, limit + 1)
+        elif len(self._urgent_recent) < _MIN_BUDGET_SAMPLES:
+            return
+        elif p99 > self._budget_ms:
+            # Keep one slot: background work slows down but never starves.
+            # Judge the new limit on fresh samples only
+            limit = max(1, limit // 2)
+            self._urgent_recent.clear()
+        elif p99 < 0.8 * self._budget_ms:
+            limit = min(self._max_batch_size, limit + 1)
+        if limit != self._background_limit:
+            logger.info(f"{self._lanes[0]} p99 {p99:.0f} ms (budget {self._budget_ms:.0f} ms): "
+                        f"background items per batch {self._background_limit} -> {limit}")
+            self._background_limit = limit
@@ -0,0 +1,170 @@
+"""
+Standalone model server: one process owns MedCLIP, API workers talk to it.
+
+Loading the model into every API worker ties web concurrency to model
+memory. scripts.model_server loads it once and serves classification over a
+Unix socket (multiprocessing.connection, authenticated with the app secret);
+RemoteClassificationRepository is the client. Clients decode and preprocess
+uploads themselves (infrastructure.ai.preprocessing) and hand the pixels over
+in a POSIX shared-memory segment they own, so only cache keys, disease names
+and results are pickled. Every client connection is served by its own
+thread; concurrent requests still meet in the vision micro-batcher.
+
+Requests are tuples (op, *args); replies are ("ok", value) or ("error", message).
+"""
+
+import logging
+import os
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import AuthenticationError, Connection, Listener
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+
+from domain.entities.disease import Disease
+from infrastructure.ai.lanes import inference_lane
+from infrastructure.ai.preprocessing import PIXEL_SHAPE
+
+logger = logging.getLogger("ModelServer")
+
+STATUS = "status"
+CLASSIFY = "classify"
+ENCODE_PHRASES = "encode_phrases"
+REFRESH_INDEX = "refresh_index"
+METRICS = "metrics"
+
+
+class ModelServerError(RuntimeError):
+    """The model server is unreachable, timed out or failed the request"""
+
+
+def attach_segment(name: str) -> shared_memory.SharedMemory:
+    """Map a shared-memory segment created (and later unlinked) by another process"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        # Older Pythons track attached segments too and would unlink the client's on exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class _Segment:
+    """The shared-memory segment a client connection currently writes its pixels to"""
+
+    def __init__(self):
+        self._shm: Optional[shared_memory.SharedMemory] = None
+
+    def pixels(self, name: str, count: int) -> np.ndarray:
+        """(count, 3, 224, 224) view of the segment; attaches when the client switched segments"""
+        if self._shm is None or self._shm.name != name.lstrip("/"):
+            self.close()
+            self._shm = attach_segment(name)
+        return np.ndarray((count, *PIXEL_SHAPE), dtype=np.float32, buffer=self._shm.buf)
+
+    def close(self) -> None:
+        if self._shm is not None:
+            try:
+                self._shm.close()
+            except BufferError:
+                # A view is still referenced (e.g. by a traceback); the mapping goes with it
+                logger.debug("Pixel segment still in use, left mapped")
+            self._shm = None
+
+
+class ModelServer:
+    """
+    Serve a loaded ClassificationRepository over a Unix socket.
+
+    Args:
+        repository: Initialised ClassificationRepository with its phrase index
+        address: Path of the Unix socket
+        authkey: Shared secret clients authenticate with
+        refresh_index: Reloads the repository's phrase index from the database
+    """
+
+    def __init__(self, repository, address: Path, authkey: bytes, refresh_index: Callable[[], None]):
+        self._repository = repository
+        self._address = Path(address)
+        self._authkey = authkey
+        self._refresh_index = refresh_index
+        self._listener: Optional[Listener] = None
+        self._closed = threading.Event()
+
+    def serve_forever(self) -> None:
+        """Accept connections until close() is called"""
+        if self._address.exists():
+            # Left behind by a server that did not shut down cleanly
+            self._address.unlink()
+        self._listener = Listener(str(self._address), family="AF_UNIX", authkey=self._authkey)
+        os.chmod(self._address, 0o660)
+        logger.info(f"Model server listening on {self._address}")
+
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except AuthenticationError:
+                logger.warning("Rejected a model-server client with the wrong key")
+                continue
+            except OSError:
+                if self._closed.is_set():
+                    break
+                raise
+            threading.Thread(target=self._serve, args=(conn,), name="model-server-conn", daemon=True).start()
+
+    def close(self) -> None:
+        """Stop accepting; connections in progress finish their current request"""
+        self._closed.set()
+        if self._listener is not None:
+            self._listener.close()
+
+    def _serve(self, conn: Connection) -> None:
+        segment = _Segment()
+        try:
+            while True:
+                try:
+                    op, *args = conn.recv()
+                except EOFError:
+                    return
+                try:
+                    reply: Tuple[str, Any] = ("ok", self._handle(segment, op, args))
+                except Exception as e:
+                    logger.error(f"Model-server request '{op}' failed: {e}", exc_info=True)
+                    reply = ("error", f"{type(e).__name__}: {e}")
+                conn.send(reply)
+        except OSError as e:
+            logger.info(f"Model-server client went away: {e}")
+        finally:
+            segment.close()
+            conn.close()
+
+    def _handle(self, segment: _Segment, op: str, args: list) -> Any:
+        repository = self._repository
+        if op == CLASSIFY:
+            name, count, keys, diseases, max_phrases, top_k, lane = args
+            # Only id and name take part in scoring
+            catalog = [Disease(id=disease_id, name=disease_name, created_by=None, description="")
+                       for disease_id, disease_name in diseases]
+            with inference_lane(lane):
+                return repository.classify_pixels(keys, segment.pixels(name, count), catalog, max_phrases, top_k)
+        if op == STATUS:
+            return self._status()
+        if op == ENCODE_PHRASES:
+            return repository.encode_phrases(args[0])
+        if op == REFRESH_INDEX:
+            self._refresh_index()
+            return self._status()
+        if op == METRICS:
+            return repository.metrics()
+        raise ValueError(f"Unknown model-server request '{op}'")
+
+    def _status(self) -> dict:
+        repository = self._repository
+        return {
+            "ready": repository.is_ready,
+            "model_status": repository.model_status(),
+            "can_encode_text": repository.can_encode_text,
+            "phrase_index_version": repository.phrase_index_version,
+        }
@@ -0,0 +1,44 @@
+"""
+Image preprocessing for the vision tower, in numpy only.
+
+Matches the torchvision pipeline the model was trained with
+(Resize((224, 224)) -> ToTensor -> Normalize(ImageNet mean/std)) without
+importing torch, so processes that only prepare pixels for a model server
+stay lightweight.
+"""
+
+import hashlib
+import io
+from typing import Tuple
+
+import numpy as np
+from PIL import Image
+
+IMAGE_SIZE = 224
+PIXEL_SHAPE = (3, IMAGE_SIZE, IMAGE_SIZE)
+
+_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32).reshape(3, 1, 1)
+_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32).reshape(3, 1, 1)
+
+
+def prepare_image(image: bytes) -> Tuple[str, np.ndarray]:
+    """
+    Decode an encoded image and turn it into vision-tower input.
+
+    Args:
+        image: Encoded image file contents (JPEG, PNG, ...)
+
+    Returns:
+        (key, pixels): SHA-256 of the decoded RGB pixels, the embedding cache
+        key, so re-encoded copies of a scan still hit; and the (3, 224, 224)
+        float32 normalised pixels
+    """
+    img = Image.open(io.BytesIO(image)).convert("RGB")
+
+    digest = hashlib.sha256(f"{img.width}x{img.height}:".encode())
+    digest.update(img.tobytes())
+
+    # Same resampling as torchvision's Resize on a PIL image
+    resized = np.asarray(img.resize((IMAGE_SIZE, IMAGE_SIZE), Image.BILINEAR), dtype=np.float32)
+    pixels = (resized.transpose(2, 0, 1) / 255.0 - _MEAN) / _STD
+    return digest.hexdigest(), np.ascontiguousarray(pixels, dtype=np.float32)
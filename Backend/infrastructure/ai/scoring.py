@@ -0,0 +1,132 @@
+"""
+Vectorised disease scoring over phrase similarities.
+
+Phrases are mapped to disease "slots" (0..M-1) once, when the phrase index
+is loaded, and kept grouped by slot. Per request everything is a handful of
+tensor ops, independent of Python-level loops over diseases or phrases:
+
+* per-disease phrase sampling   – random rank inside oversized segments
+* per-disease mean              – index_add_ over the slot of every phrase
+* top-k diseases                – topk
+* best phrase                   – argmax inside the k winning segments only
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import torch
+
+
+@dataclass
+class DiseaseScores:
+    """Top-k result of a (B, P) similarity batch"""
+    scores: torch.Tensor       # (B, k) mean normalised similarity, descending
+    slots: torch.Tensor        # (B, k) disease slot of each score
+    best_rows: torch.Tensor    # (B, k) selected-phrase position of each disease's best phrase
+
+
+def select_phrase_rows(
+    owner: torch.Tensor,
+    counts: torch.Tensor,
+    allowed: torch.Tensor,
+    max_phrases: int,
+    generator: Optional[torch.Generator] = None,
+) -> torch.Tensor:
+    """
+    Pick at most `max_phrases` random phrases of every allowed disease.
+
+    Args:
+        owner: (N,) disease slot of every indexed phrase, grouped by slot
+        counts: (M,) number of indexed phrases per slot
+        allowed: (M,) bool, slots taking part in this request
+        max_phrases: Per-disease sampling cap
+        generator: Optional RNG for reproducible sampling
+
+    Returns:
+        Row numbers into the index, still grouped by slot
+    """
+    n = owner.numel()
+    if n == 0:
+        return torch.zeros(0, dtype=torch.long, device=owner.device)
+
+    oversized = allowed & (counts > max_phrases)
+    if not bool(oversized.any()):
+        # Nothing to sample: keep every phrase of the allowed diseases, in index order
+        if bool(allowed.all()):
+            return torch.arange(n, device=owner.device)
+        return torch.nonzero(allowed[owner], as_tuple=True)[0]
+
+    keep = allowed[owner]
+
+    # Only rows of oversized diseases are ranked: random keys in [slot, slot + 1)
+    # sort them grouped by slot and shuffled inside each segment
+    candidates = torch.nonzero(oversized[owner], as_tuple=True)[0]
+    keys = owner[candidates].double() + torch.rand(
+        candidates.numel(), generator=generator, dtype=torch.float64, device=owner.device
+    )
+    shuffled = candidates[torch.argsort(keys)]
+
+    sizes = torch.where(oversized, counts, torch.zeros_like(counts))
+    seg_start = torch.cumsum(sizes, 0) - sizes
+    rank = torch.arange(shuffled.numel(), device=owner.device) - seg_start[owner[shuffled]]
+    keep[shuffled[rank >= max_phrases]] = False
+
+    # nonzero keeps index order, so the rows stay grouped by slot
+    return torch.nonzero(keep, as_tuple=True)[0]
+
+
+def score_diseases(
+    sims: torch.Tensor,
+    owner: torch.Tensor,
+    num_slots: int,
+    top_k: int,
+    counts: Optional[torch.Tensor] = None,
+    bounds: Optional[Tuple[torch.Tensor, torch.Tensor]] = None,
+) -> DiseaseScores:
+    """
+    Rank diseases from image-phrase similarities.
+
+    Similarities are min-max normalised per image, averaged per disease,
+    and the best phrase of each disease is its first arg-max.
+
+    Args:
+        sims: (B, P) scaled similarities of each image to the selected phrases.
+              Compute them against the whole index and slice the selected
+              columns: gathering (P, D) phrase embeddings costs far more.
+        owner: (P,) disease slot of every selected phrase, grouped by slot
+        num_slots: Total number of disease slots M
+        top_k: Number of diseases to return per image
+        counts: (M,) selected phrases per slot, if the caller already has them
+        bounds: (lo, hi), each (B, 1): normalisation range when `sims` holds
+                only part of the phrases (default: min / max of `sims`)
+
+    Returns:
+        DiseaseScores with (B, k) tensors, k = min(top_k, diseases present);
+        k = 0 when no phrase is selected or top_k < 1
+    """
+    if sims.shape[1] == 0 or top_k < 1:
+        none = torch.zeros((sims.shape[0], 0), dtype=torch.long, device=sims.device)
+        return DiseaseScores(scores=sims.new_zeros((sims.shape[0], 0)), slots=none, best_rows=none)
+
+    lo, hi = bounds if bounds is not None else (sims.amin(dim=1, keepdim=True), sims.amax(dim=1, keepdim=True))
+    norm = (sims - lo) / (hi - lo + 1e-8)
+
+    # Per-disease mean
+    if counts is None:
+        counts = torch.bincount(owner, minlength=num_slots)
+    sums = norm.new_zeros(sims.shape[0], num_slots).index_add_(1, owner, norm)
+    means = sums / counts.clamp(min=1)
+    means[:, counts == 0] = float("-inf")
+
+    k = min(top_k, int((counts > 0).sum()))
+    scores, slots = means.topk(k, dim=1)                            # (B, k)
+
+    # Best phrase of the winners only: segments are contiguous, so the
+    # phrases of slot s are norm[b, start[s]:start[s] + counts[s]]
+    starts = torch.cumsum(counts, 0) - counts
+    best_rows = torch.tensor([
+        [start + int(norm[b, start:start + length].argmax()) for start, length in zip(row_starts, row_lengths)]
+        for b, (row_starts, row_lengths) in enumerate(zip(starts[slots].tolist(), counts[slots].tolist()))
+    ], dtype=torch.long, device=sims.device).reshape(slots.shape)
+
+    return DiseaseScores(scores=scores, slots=slots, best_rows=best_rows)
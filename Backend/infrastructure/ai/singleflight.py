@@ -0,0 +1,97 @@
+"""
+Singleflight coalescing of identical in-flight async computations.
+
+The first caller of a key starts the computation; callers arriving with
+the same key while it runs await that same result instead of starting
+their own. Nothing is cached: once the computation finishes, the next
+caller starts a new one.
+
+The shared computation is told its callers' connection state through one
+combined `is_disconnected` check, which only turns True once every caller
+waiting on it is gone, so one client hanging up never cancels the work
+for the others.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, TypeVar
+
+logger = logging.getLogger("Singleflight")
+
+T = TypeVar("T")
+DisconnectCheck = Callable[[], Awaitable[bool]]
+
+
+class _Flight(Generic[T]):
+    def __init__(self):
+        self.task: Optional["asyncio.Future[T]"] = None
+        # One entry per waiting caller; None means its connection cannot be checked
+        self.waiters: List[List[Optional[DisconnectCheck]]] = []
+
+    async def all_disconnected(self) -> bool:
+        for (check,) in list(self.waiters):
+            if check is None or not await check():
+                return False
+        return True
+
+
+class Singleflight(Generic[T]):
+    """Coalesce concurrent calls with the same key into one computation (single event loop)"""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight[T]] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[DisconnectCheck], Awaitable[T]],
+        is_disconnected: Optional[DisconnectCheck] = None,
+    ) -> T:
+        """
+        Run fn for key, or join the run already in flight.
+
+        Args:
+            key: Identifies calls with the same result
+            fn: Starts the computation; receives the combined disconnect
+                check of every caller waiting on it
+            is_disconnected: This caller's connection check
+
+        Returns:
+            The result of the shared computation (its exception is raised to every caller)
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.ensure_future(fn(flight.all_disconnected))
+            flight.task.add_done_callback(lambda task, key=key, flight=flight: self._finish(key, flight, task))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+            logger.info(f"Coalesced with an identical in-flight request ({len(flight.waiters)} already waiting)")
+
+        waiter = [is_disconnected]
+        flight.waiters.append(waiter)
+        try:
+            # A caller going away must not cancel the work the others wait for
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters.remove(waiter)
+
+    def _finish(self, key: str, flight: _Flight[T], task: "asyncio.Future[T]") -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not task.cancelled():
+            # Retrieved here too, in case every caller left before it finished
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._flights),
+            "executed": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_rate": self.coalesced / total if total else 0.0,
+        }
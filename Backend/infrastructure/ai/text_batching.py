@@ -0,0 +1,70 @@
+"""
+Length-bucketed batching for the text encoder.
+
+Padding a whole phrase list to its longest member makes BERT spend most of
+its FLOPs on pad tokens when one description line is much longer than the
+rest. Phrases are sorted by token length and split into power-of-two length
+buckets; each bucket is cut into capped batches, which bounds both padding
+and the size of each forward pass. The caller scatters the outputs back to
+input order.
+"""
+
+from typing import Iterator, List, Sequence, Tuple
+
+import torch
+
+# Shortest bucket: every phrase carries [CLS]/[SEP] and a few words anyway
+_MIN_BUCKET_TOKENS = 8
+
+
+def length_bucket(length: int) -> int:
+    """Padded length of a sequence's bucket: the next power of two (at least 8)"""
+    return max(_MIN_BUCKET_TOKENS, 1 << (max(length, 1) - 1).bit_length())
+
+
+def length_bucketed_batches(
+    lengths: Sequence[int],
+    max_batch_size: int,
+    max_batch_tokens: int,
+) -> Iterator[List[int]]:
+    """
+    Group sequence positions into batches from the same length bucket.
+
+    Args:
+        lengths: Token count of every sequence
+        max_batch_size: Maximum sequences per batch
+        max_batch_tokens: Maximum padded tokens (rows x longest row) per batch;
+                          a single longer sequence still gets its own batch
+
+    Yields:
+        Lists of positions into `lengths`, shortest sequences first
+    """
+    batch: List[int] = []
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        # Sorted ascending: the newcomer is the longest row of the batch
+        if batch and (
+            length_bucket(lengths[i]) != length_bucket(lengths[batch[0]])
+            or len(batch) >= max_batch_size
+            or (len(batch) + 1) * lengths[i] > max_batch_tokens
+        ):
+            yield batch
+            batch = []
+        batch.append(i)
+    if batch:
+        yield batch
+
+
+def pad_batch(sequences: Sequence[Sequence[int]], pad_id: int) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Right-pad token id lists to the longest one.
+
+    Returns:
+        (input_ids, attention_mask), both (B, L) int64
+    """
+    max_len = max(len(s) for s in sequences)
+    input_ids = torch.full((len(sequences), max_len), pad_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(sequences), max_len), dtype=torch.long)
+    for row, seq in enumerate(sequences):
+        input_ids[row, :len(seq)] = torch.tensor(seq, dtype=torch.long)
+        attention_mask[row, :len(seq)] = 1
+    return input_ids, attention_mask
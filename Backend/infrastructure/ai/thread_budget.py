@@ -0,0 +1,101 @@
+"""
+CPU thread budget of the inference process.
+
+PyTorch sizes its intra-op pool to every core of the machine. With several
+workers per host each of them does so, and under load they oversubscribe
+the CPU: threads are preempted in the middle of GEMMs and throughput drops
+below that of a single worker. The budget splits the available cores
+between the workers (settings.inference_intra_op_threads overrides the
+share) and can pin each worker to its own slice of them.
+
+gunicorn.conf.py applies the budget in every forked worker; a single
+uvicorn process applies it when the model is loaded.
+`python -m scripts.autotune_threads` finds the best split for a machine.
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+import torch
+
+from core.settings import settings
+
+logger = logging.getLogger("ThreadBudget")
+
+_applied: Optional["ThreadBudget"] = None
+
+
+@dataclass(frozen=True)
+class ThreadBudget:
+    intra_op: int
+    inter_op: int
+    cpus: Optional[List[int]] = None   # affinity; None leaves it unchanged
+
+
+def available_cpus() -> List[int]:
+    """Cores this process may run on (honours cgroup / taskset restrictions on Linux)"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_thread_budget(
+    workers: int,
+    slot: int,
+    intra_op: Optional[int] = None,
+    inter_op: Optional[int] = None,
+    pin: Optional[bool] = None,
+    cpus: Optional[List[int]] = None,
+) -> ThreadBudget:
+    """
+    Thread budget of one of `workers` processes sharing the machine.
+
+    Args:
+        workers: Number of inference processes on the host
+        slot: This worker's index, 0..workers-1 (selects its cores when pinning)
+        intra_op: Intra-op threads (default: settings, else the worker's share of the cores)
+        inter_op: Inter-op threads (default: settings)
+        pin: Pin the worker to its cores (default: settings.inference_cpu_affinity)
+        cpus: Cores to split (default: available_cpus())
+
+    Returns:
+        ThreadBudget to pass to apply_thread_budget
+    """
+    cpus = cpus if cpus is not None else available_cpus()
+    workers = max(1, workers)
+    share = max(1, len(cpus) // workers)
+    intra_op = intra_op or settings.inference_intra_op_threads or share
+    inter_op = inter_op or settings.inference_inter_op_threads
+    pin = settings.inference_cpu_affinity if pin is None else pin
+
+    pinned = None
+    if pin and hasattr(os, "sched_setaffinity"):
+        # Contiguous slices keep a worker on neighbouring cores (shared caches);
+        # wraps around when there are more workers than slices
+        start = (slot % max(1, len(cpus) // share)) * share
+        pinned = cpus[start:start + max(share, intra_op)] or cpus
+    return ThreadBudget(intra_op=intra_op, inter_op=inter_op, cpus=pinned)
+
+
+def apply_thread_budget(budget: ThreadBudget) -> None:
+    """Configure torch (and the CPU affinity) of the calling process"""
+    global _applied
+    if budget.cpus is not None:
+        os.sched_setaffinity(0, budget.cpus)
+    torch.set_num_threads(budget.intra_op)
+    try:
+        torch.set_num_interop_threads(budget.inter_op)
+    except RuntimeError:
+        # Only settable before the first inter-op work; a forked worker inherits the parent's
+        logger.debug("Inter-op threads already fixed for this process")
+    _applied = budget
+    logger.info(f"Thread budget: {budget.intra_op} intra-op / {budget.inter_op} inter-op threads"
+                + (f", pinned to CPUs {budget.cpus}" if budget.cpus is not None else ""))
+
+
+def ensure_thread_budget() -> None:
+    """Apply the single-process budget unless a worker budget was applied already"""
+    if _applied is None:
+        apply_thread_budget(plan_thread_budget(workers=1, slot=0))
@@ -0,0 +1,61 @@
+"""
+Load-time warm-up of the inference path.
+
+The first forward passes of a fresh process are several times slower than
+steady state: the allocator grows its pools, oneDNN / cuDNN pick kernels per
+input shape, compiled graphs specialise, and the tokenizer fills its caches.
+Running a few dummy batches of the shapes production will see moves that
+cost out of the first requests after a deploy.
+"""
+
+import logging
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Callable, List
+
+import torch
+
+logger = logging.getLogger("Warmup")
+
+# Dummy phrases of a few lengths, so several text length buckets get warmed
+WARMUP_PHRASES = [
+    "normal study",
+    "diffuse ground-glass opacities in both lower lobes",
+    "well-circumscribed hyperdense lesion in the left frontal lobe with surrounding "
+    "vasogenic oedema and mild mass effect on the adjacent lateral ventricle",
+]
+
+
+@dataclass
+class WarmupTiming:
+    shape: str
+    first_ms: float    # cold call
+    steady_ms: float   # median of the following calls
+
+
+def time_warmup(shape: str, fn: Callable[[], object], iterations: int, device: torch.device) -> WarmupTiming:
+    """
+    Call fn `iterations` times and time the cold and the warm calls.
+
+    Args:
+        shape: Label of the input shape, for the log
+        fn: One forward pass
+        iterations: Number of calls (at least 1)
+        device: Device fn runs on; CUDA calls are synchronised before timing
+    """
+    times = []
+    for _ in range(max(iterations, 1)):
+        start = time.perf_counter()
+        fn()
+        if device.type == "cuda":
+            torch.cuda.synchronize(device)
+        times.append((time.perf_counter() - start) * 1000)
+    steady = statistics.median(times[1:]) if len(times) > 1 else times[0]
+    return WarmupTiming(shape=shape, first_ms=times[0], steady_ms=steady)
+
+
+def log_warmup(timings: List[WarmupTiming], total_s: float) -> None:
+    for t in timings:
+        logger.info(f"Warm-up {t.shape}: first {t.first_ms:.1f} ms, steady {t.steady_ms:.1f} ms")
+    logger.info(f"Warm-up complete in {total_s:.2f} s")
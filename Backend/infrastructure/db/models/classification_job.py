@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, LargeBinary, String, Text, func
+from sqlalchemy.orm import relationship
+
+from infrastructure.db.base import Base
+
+
+class ClassificationJob(Base):
+    __tablename__ = "classification_jobs"
+
+    id = Column(String(32), primary_key=True)
+    status = Column(String(16), nullable=False, default="queued")
+    max_phrases = Column(Integer, nullable=False)
+    top_k = Column(Integer, nullable=False)
+    image_count = Column(Integer, nullable=False)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String(128), nullable=True)
+    error = Column(Text, nullable=True)
+    results = Column(Text, nullable=True)  # JSON, see domain ClassificationJob.results
+
+    images = relationship(
+        "ClassificationJobImage",
+        back_populates="job",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="ClassificationJobImage.position",
+    )
+
+    # Workers poll for the oldest queued job
+    __table_args__ = (Index("ix_classification_jobs_status_created_at", "status", "created_at"),)
+
+    def __repr__(self) -> str:
+        return f"<ClassificationJob id={self.id} status={self.status}>"
+
+
+class ClassificationJobImage(Base):
+    __tablename__ = "classification_job_images"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(32), ForeignKey("classification_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)
+    filename = Column(String, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+    job = relationship("ClassificationJob", back_populates="images")
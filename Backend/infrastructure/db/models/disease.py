@@ -26,6 +26,12 @@ class Disease(Base):
         cascade="all, delete-orphan",
         passive_deletes=True,
     )
+    phrase_embeddings = relationship(
+        "DiseasePhraseEmbedding",
+        back_populates="disease",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
     def __repr__(self) -> str:
         return f"<Disease id={self.id} name={self.name}>"
\ No newline at end of file
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, Index, Integer, ForeignKey, LargeBinary, String, Text
+from sqlalchemy.orm import relationship
+
+from infrastructure.db.base import Base
+
+
+class DiseasePhraseEmbedding(Base):
+    __tablename__ = "disease_phrase_embeddings"
+    # Each encoder keeps its own rows per disease
+    __table_args__ = (
+        Index("ix_disease_phrase_embeddings_disease_model", "disease_id", "model_version"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    disease_id = Column(Integer, ForeignKey("diseases.id", ondelete="CASCADE"), nullable=False, index=True)
+    phrase = Column(Text, nullable=False)
+    embedding = Column(LargeBinary, nullable=False)  # float32[proj_dim]
+    # checkpoint fingerprint + precision of the encoder (NULL: unknown, pre-dates tracking)
+    model_version = Column(String(64), nullable=True)
+
+    disease = relationship("Disease", back_populates="phrase_embeddings", passive_deletes=True)
+
+    def __repr__(self) -> str:
+        return f"<DiseasePhraseEmbedding id={self.id} disease={self.disease_id}>"
@@ -0,0 +1,173 @@
+# infrastructure/db/repositories/classification_job_repository.py
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from domain.entities.classification_job import ClassificationJob, ClassificationJobImage
+from domain.interfaces.repositories.classification_job_repository_interface import (
+    IClassificationJobRepository,
+)
+
+from infrastructure.db.models.classification_job import (
+    ClassificationJob as ORMClassificationJob,
+    ClassificationJobImage as ORMClassificationJobImage,
+)
+from infrastructure.db.repositories._mapping import orm_to_entity
+
+# Claims lost to a concurrent worker before giving up for this poll
+_CLAIM_RETRIES = 5
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _to_entity(row: ORMClassificationJob) -> ClassificationJob:
+    return orm_to_entity(
+        row,
+        ClassificationJob,
+        extra={"results": json.loads(row.results) if row.results is not None else None},
+    )
+
+
+class ClassificationJobRepository(IClassificationJobRepository):
+
+    # --------------------------------------------------------------------- #
+    # constructor
+    # --------------------------------------------------------------------- #
+    def __init__(self, db: Session) -> None:
+        self._db = db
+
+    # --------------------------------------------------------------------- #
+    # Commands
+    # --------------------------------------------------------------------- #
+    def add(self, job: ClassificationJob, images: Sequence[ClassificationJobImage]) -> ClassificationJob:
+        row = ORMClassificationJob(
+            id=job.id,
+            status=job.status,
+            max_phrases=job.max_phrases,
+            top_k=job.top_k,
+            image_count=job.image_count,
+            created_by=job.created_by,
+            attempts=0,
+            images=[
+                ORMClassificationJobImage(position=img.position, filename=img.filename, data=img.data)
+                for img in images
+            ],
+        )
+        self._db.add(row)
+        self._db.flush()
+        self._db.refresh(row)
+        return _to_entity(row)
+
+    def claim_next(self, worker_id: str) -> Optional[ClassificationJob]:
+        for _ in range(_CLAIM_RETRIES):
+            # SKIP LOCKED lets PostgreSQL workers pass over each other's candidates
+            # (SQLite has no row locks and ignores it)
+            candidate = (
+                self._db.query(ORMClassificationJob.id)
+                .filter(ORMClassificationJob.status == "queued")
+                .order_by(ORMClassificationJob.created_at.asc(), ORMClassificationJob.id.asc())
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar()
+            )
+            if candidate is None:
+                return None
+
+            # Conditional update: exactly one worker wins the job, on any backend
+            claimed = (
+                self._db.query(ORMClassificationJob)
+                .filter(ORMClassificationJob.id == candidate, ORMClassificationJob.status == "queued")
+                .update(
+                    {
+                        ORMClassificationJob.status: "running",
+                        ORMClassificationJob.started_at: _now(),
+                        ORMClassificationJob.attempts: ORMClassificationJob.attempts + 1,
+                        ORMClassificationJob.worker_id: worker_id,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            if claimed:
+                self._db.flush()
+                return self.get_by_id(candidate)
+        return None
+
+    def complete(self, job_id: str, worker_id: str, results: List[Dict[str, Any]]) -> bool:
+        return self._finish(job_id, worker_id, status="done", results=json.dumps(results))
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        return self._finish(job_id, worker_id, status="failed", error=error)
+
+    def _finish(self, job_id: str, worker_id: str, **values: Any) -> bool:
+        # Only the current claim settles the job: a worker whose job was
+        # requeued and reclaimed meanwhile must not overwrite the new run
+        settled = (
+            self._db.query(ORMClassificationJob)
+            .filter(
+                ORMClassificationJob.id == job_id,
+                ORMClassificationJob.status == "running",
+                ORMClassificationJob.worker_id == worker_id,
+            )
+            .update({**values, "finished_at": _now()}, synchronize_session=False)
+        )
+        if not settled:
+            return False
+        # The uploads are only needed until the job is settled
+        (
+            self._db.query(ORMClassificationJobImage)
+            .filter(ORMClassificationJobImage.job_id == job_id)
+            .delete(synchronize_session=False)
+        )
+        self._db.flush()
+        return True
+
+    def requeue_stale(self, timeout_s: float, max_attempts: int) -> int:
+        stale = (
+            ORMClassificationJob.status == "running",
+            ORMClassificationJob.started_at < _now() - timedelta(seconds=timeout_s),
+        )
+        exhausted = (
+            self._db.query(ORMClassificationJob.id, ORMClassificationJob.worker_id)
+            .filter(*stale, ORMClassificationJob.attempts >= max_attempts)
+            .all()
+        )
+        failed = sum(
+            self.fail(job_id, worker_id, f"Worker lost {max_attempts} times while processing the job")
+            for job_id, worker_id in exhausted
+        )
+
+        requeued = (
+            self._db.query(ORMClassificationJob)
+            .filter(*stale, ORMClassificationJob.attempts < max_attempts)
+            .update(
+                {ORMClassificationJob.status: "queued", ORMClassificationJob.worker_id: None},
+                synchronize_session=False,
+            )
+        )
+        self._db.flush()
+        return failed + requeued
+
+    # --------------------------------------------------------------------- #
+    # Queries
+    # --------------------------------------------------------------------- #
+    def get_by_id(self, job_id: str) -> Optional[ClassificationJob]:
+        row = self._db.get(ORMClassificationJob, job_id)
+        if row is None:
+            return None
+        self._db.refresh(row)
+        return _to_entity(row)
+
+    def list_images(self, job_id: str) -> List[ClassificationJobImage]:
+        rows = (
+            self._db.query(ORMClassificationJobImage)
+            .filter(ORMClassificationJobImage.job_id == job_id)
+            .order_by(ORMClassificationJobImage.position.asc())
+            .all()
+        )
+        return [orm_to_entity(r, ClassificationJobImage) for r in rows]
@@ -1,61 +1,148 @@
+import hashlib
+import unicodedata
 import torch
-import json
 import random
 import numpy as np
-import torch.nn.functional as F
-from torchvision import transforms
-from transformers import AutoTokenizer
-from PIL import Image
-from typing import List, Dict, Any, Optional
-from pathlib import Path
-from collections import defaultdict
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Union
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import logging
+import threading
+import time
 from dataclasses import dataclass
 
 from domain.interfaces.repositories.classification_repository_interface import IClassificationRepository
 from domain.entities.disease import Disease
+from domain.entities.disease_phrase_embedding import DiseasePhraseEmbedding
 from core.settings import settings
+from infrastructure.ai.micro_batcher import MicroBatcher
+from infrastructure.ai.embedding_cache import EmbeddingCache
+from infrastructure.ai.inference_backends import create_backend
+from infrastructure.ai.medclip_classifier import load_tokenizer
+from infrastructure.ai.scoring import DiseaseScores, score_diseases, select_phrase_rows
+from infrastructure.ai.ann_index import IVFIndex
+from infrastructure.ai.text_batching import length_bucketed_batches, pad_batch
+from infrastructure.ai.warmup import WARMUP_PHRASES, log_warmup, time_warmup
+from infrastructure.ai.thread_budget import ensure_thread_budget
+from infrastructure.ai.lanes import LANES, current_lane
+from infrastructure.ai.preprocessing import prepare_image
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("ClassificationRepository")
 
 
+@dataclass
+class PhraseIndex:
+    """In-memory copy of the persisted phrase-embedding index"""
+    embeddings: torch.Tensor    # (N, D) projected, L2-normalised
+    phrases: List[str]          # N phrases, aligned with embeddings
+    owner: torch.Tensor         # (N,) disease slot of every row
+    counts: torch.Tensor        # (M,) rows per disease slot
+    disease_ids: np.ndarray     # (M,) disease id of every slot, ascending
+    version: str
+    ann: Optional[IVFIndex] = None   # candidate retrieval for large catalogs
+
+
+@dataclass
+class PreparedImage:
+    """A decoded upload, either already embedded (cache hit) or ready for the encoder"""
+    key: str                             # SHA-256 of the decoded pixels
+    embedding: Optional[torch.Tensor]    # (D,) on a cache hit
+    tensor: Optional[torch.Tensor]       # (3, 224, 224) on a miss
+    error: Optional[Exception] = None    # the upload could not be decoded
+
+
 class ClassificationRepository(IClassificationRepository):
     """
     Repository implementation for classification operations using MedCLIP
     """
     _instance = None
     _is_initialized = False
+    _lock = threading.Lock()
+    _loading = False
+    _load_error: Optional[str] = None
     
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
-            logger.info("Creating new ClassificationRepository instance")
-            cls._instance = super(ClassificationRepository, cls).__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    logger.info("Creating new ClassificationRepository instance")
+                    instance = super(ClassificationRepository, cls).__new__(cls)
+                    # State is set up exactly once here; a UoW built on another
+                    # thread must never reset it while the model is loading.
+                    instance.backend = None
+                    instance.tokenizer = None
+                    instance.device = None
+                    instance.phrase_index = None
+                    instance.vision_batcher = None
+                    instance.image_cache = None
+                    instance.text_cache = None
+                    instance._model_version = None
+                    instance._decode_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-decode")
+                    instance._tokenizer_lock = threading.Lock()
+                    cls._instance = instance
         return cls._instance
     
-    def __init__(self):
-        # Skip initialization if already initialized
-        if ClassificationRepository._is_initialized:
-            return
-        
-        self.model = None
-        self.tokenizer = None
-        self.device = None
-        self.img_transform = None
-        self.txt_embeddings = None
-        self.phrase_info = None
-    
     def initialize_model(self) -> None:
-        """Initialize the MedCLIP model"""
+        """Initialize the MedCLIP model (thread-safe, runs once per process)"""
         if ClassificationRepository._is_initialized:
             logger.info("Model already initialized, skipping")
             return
-            
+        
+        with ClassificationRepository._lock:
+            if ClassificationRepository._is_initialized:
+                logger.info("Model initialized by another thread, skipping")
+                return
+            ClassificationRepository._loading = True
+            try:
+                self._load_model()
+            except Exception as e:
+                ClassificationRepository._load_error = str(e)
+                raise
+            finally:
+                ClassificationRepository._loading = False
+            ClassificationRepository._load_error = None
+            ClassificationRepository._is_initialized = True
+    
+    @property
+    def is_ready(self) -> bool:
+        return ClassificationRepository._is_initialized and self.phrase_index is not None
+    
+    @property
+    def model_version(self) -> Optional[str]:
+        return self._model_version
+    
+    def model_status(self) -> Dict[str, Any]:
+        """Load state of the model and phrase index, for the readiness probe"""
+        if self.is_ready:
+            state = "ready"
+        elif ClassificationRepository._loading:
+            state = "loading"
+        elif ClassificationRepository._load_error is not None:
+            state = "failed"
+        elif ClassificationRepository._is_initialized:
+            state = "loading_index"
+        else:
+            state = "not_loaded"
+        index = self.phrase_index
+        return {
+            "state": state,
+            "backend": settings.inference_backend,
+            "model_version": self._model_version,
+            "phrases": len(index.phrases) if index is not None else None,
+            "error": ClassificationRepository._load_error,
+        }
+    
+    def _load_model(self) -> None:
+        """Load tokenizer, towers and weights; caller holds the init lock"""
         logger.info("Initializing MedCLIP model...")
         
         # Set up device
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         logger.info(f"Using device: {self.device}")
+        
+        # Size the torch thread pools before the first parallel op
+        ensure_thread_budget()
 
         # Set random seed for reproducibility
         seed = 42
@@ -63,30 +150,140 @@ class ClassificationRepository(IClassificationRepository):
         np.random.seed(seed)
         torch.manual_seed(seed)
         
-        # Image transformation pipeline
-        self.img_transform = transforms.Compose([
-            transforms.Resize((224, 224)),
-            transforms.ToTensor(),
-            transforms.Normalize([0.485, 0.456, 0.406],
-                               [0.229, 0.224, 0.225])
-        ])
+        vision_only = settings.classification_vision_only
+        tokenizer_future = None
+        if vision_only:
+            # Phrase embeddings are precomputed: no BERT, tokenizer or transformers import
+            logger.info("Vision-only serving: skipping the Bio_ClinicalBERT tokenizer and text tower")
+        else:
+            # The tokenizer loads (mostly file I/O) while the towers are built
+            loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tokenizer-load")
+            tokenizer_future = loader.submit(self._load_tokenizer)
+            loader.shutdown(wait=False)
+        
+        # Load the towers through the configured inference backend
+        logger.info(f"Loading MedCLIP model with the '{settings.inference_backend}' backend")
+        self.backend = create_backend(settings.inference_backend, self.device, vision_only=vision_only)
+        if tokenizer_future is not None:
+            self.tokenizer = tokenizer_future.result()
+        
+        if settings.inference_compile != "none":
+            self.backend.compile_vision(settings.inference_compile, self.device)
         
-        # Load tokenizer
-        logger.info("Loading Bio_ClinicalBERT tokenizer...")
-        self.tokenizer = AutoTokenizer.from_pretrained("emilyalsentzer/Bio_ClinicalBERT")
+        # Identifies the weights: cached embeddings are only valid for one checkpoint
+        self._model_version = self.backend.model_version
         
-        # Get model path
-        model_path = settings.medclip_model_path
-        logger.info(f"Loading MedCLIP model from: {model_path}")
+        # Cache image embeddings by pixel hash (re-uploads skip the vision encoder)
+        if settings.image_embedding_cache_bytes > 0:
+            disk_dir = settings.image_embedding_cache_dir
+            self.image_cache = EmbeddingCache(
+                max_bytes=settings.image_embedding_cache_bytes,
+                disk_dir=disk_dir / self._model_version if disk_dir is not None else None,
+            )
         
-        # Load model
-        from infrastructure.ai.clipCustopm import MedCLIPCustom
-        self.model = MedCLIPCustom(proj_dim=256).to(self.device)
-        self.model.load_state_dict(torch.load(model_path, map_location=self.device))
-        self.model.eval()
+        # Cache phrase embeddings by normalised text, so shared template lines hit BERT once
+        if settings.text_embedding_cache_bytes > 0 and not vision_only:
+            self.text_cache = EmbeddingCache(max_bytes=settings.text_embedding_cache_bytes)
+        
+        # Coalesce concurrent requests into batched vision forward passes
+        if settings.classification_max_batch_size > 1:
+            self.vision_batcher = self._create_vision_batcher()
+            logger.info(f"Vision micro-batching enabled: up to {settings.classification_max_batch_size} "
+                        f"images per {settings.classification_batch_window_ms} ms window")
+        
+        if settings.inference_warmup_iterations > 0:
+            self._warm_up()
         
         logger.info("MedCLIP model initialization complete")
-        ClassificationRepository._is_initialized = True
+    
+    def _warm_up(self) -> None:
+        """Run dummy batches of the served shapes through the towers and log their latency"""
+        iterations = settings.inference_warmup_iterations
+        batch_sizes = settings.inference_warmup_batch_sizes or self._default_warmup_batch_sizes()
+        started = time.perf_counter()
+        
+        timings = []
+        for batch_size in batch_sizes:
+            pixels = [torch.randn(3, 224, 224) for _ in range(batch_size)]
+            timings.append(time_warmup(
+                f"vision batch {batch_size}", lambda: self._embed_image_batch(pixels), iterations, self.device
+            ))
+        
+        if self.can_encode_text:
+            # Goes through the tokenizer too; bypasses the phrase-embedding cache
+            timings.append(time_warmup(
+                f"text {len(WARMUP_PHRASES)} phrases", lambda: self._encode_texts(WARMUP_PHRASES), iterations, self.device
+            ))
+        
+        log_warmup(timings, time.perf_counter() - started)
+    
+    def _default_warmup_batch_sizes(self) -> List[int]:
+        max_batch_size = settings.classification_max_batch_size
+        if settings.inference_compile == "torch_compile" and self.backend.name == "eager":
+            # torch.compile builds one graph per batch size and the micro-batcher
+            # serves every size up to the cap: compile them all before ready
+            return list(range(1, max_batch_size + 1))
+        return sorted({1, max_batch_size})
+    
+    @staticmethod
+    def _load_tokenizer():
+        # From the local copy when there is one (no network)
+        return load_tokenizer()
+    
+    def _create_vision_batcher(self) -> MicroBatcher:
+        return MicroBatcher(
+            self._embed_image_batch,
+            max_batch_size=settings.classification_max_batch_size,
+            window_ms=settings.classification_batch_window_ms,
+            name="vision-batcher",
+            lanes=LANES,
+            latency_budget_ms=settings.classification_interactive_p99_budget_ms,
+        )
+    
+    def share_memory(self) -> None:
+        """
+        Move the weights and the phrase index into shared memory. Called in a
+        pre-fork master (gunicorn.conf.py) so every forked worker maps the
+        same pages instead of holding its own copy of the model. Weights
+        memory-mapped from the checkpoint are shared through the page cache
+        already and stay where they are.
+        """
+        if not ClassificationRepository._is_initialized:
+            self.initialize_model()
+        self.backend.share_memory()
+        index = self.phrase_index
+        if index is not None:
+            tensors = [index.embeddings, index.owner, index.counts]
+            if index.ann is not None:
+                tensors += [index.ann.centroids, index.ann.embeddings, index.ann.owner]
+            for tensor in tensors:
+                tensor.share_memory_()
+        logger.info("Model weights and phrase index shared for the forked workers")
+    
+    def after_fork(self) -> None:
+        """Recreate the threads and locks a forked worker does not inherit in a usable state"""
+        self._decode_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-decode")
+        self._tokenizer_lock = threading.Lock()
+        if self.vision_batcher is not None:
+            # The scheduler thread only exists in the parent process
+            self.vision_batcher = self._create_vision_batcher()
+    
+    def _embed_image_batch(self, img_tensors: List[torch.Tensor]) -> List[torch.Tensor]:
+        """Run the vision encoder once over a list of (3, H, W) tensors"""
+        with torch.no_grad():
+            batch = torch.stack(img_tensors).to(self.device)
+            img_emb = self.backend.encode_images(batch)
+        return list(img_emb)
+    
+    def _embed_images(self, img_tensors: List[torch.Tensor]) -> List[torch.Tensor]:
+        """Embed images, through the micro-batcher when enabled"""
+        if self.vision_batcher is not None:
+            # Submit all first so they can share a batch with concurrent requests;
+            # the lane decides who goes first at each batch boundary
+            lane = current_lane()
+            futures = [self.vision_batcher.submit(t, lane) for t in img_tensors]
+            return [f.result() for f in futures]
+        return self._embed_image_batch(img_tensors)
     
     def _get_confidence_label(self, score: float) -> str:
         """Convert similarity score to confidence label"""
@@ -96,100 +293,390 @@ class ClassificationRepository(IClassificationRepository):
         if score >= 0.30: return "Uncertain"
         return "Unlikely"
 
-    def classify_image(self, image_path: str, diseases: List[Disease], max_phrases: int = 12, top_k: int = 5) -> List[dict]:
+    def encode_phrases(self, phrases: Sequence[str]) -> List[bytes]:
         """
-        Classify an image against a list of diseases.
+        Encode description phrases with the BioClinicalBERT text tower.
+        
+        Phrases already in the text-embedding cache, or repeated within the
+        call, are not encoded again.
         
         Args:
-            image_path: Path to the image file
-            diseases: List of diseases to compare against
-            max_phrases: Maximum number of phrases to sample per disease
-            top_k: Number of top predictions to return
+            phrases: Phrases to encode
             
         Returns:
-            List of dictionaries with disease name, score, and best matching phrase
+            One float32 buffer (projected, L2-normalised embedding) per phrase
         """
+        if not self.can_encode_text:
+            raise RuntimeError("Vision-only serving cannot encode phrases; "
+                               "run scripts.rebuild_phrase_index instead")
+        
         if not ClassificationRepository._is_initialized:
             self.initialize_model()
         
-        logger.info(f"Processing image: {image_path}")
+        if not phrases:
+            return []
         
-        # Load and process image
-        img = Image.open(image_path).convert("RGB")
-        img_tensor = self.img_transform(img).unsqueeze(0).to(self.device)
+        texts = [self._normalize_phrase(p) for p in phrases]
+        keys = [self._phrase_key(t) for t in texts]
+        txt_emb = np.empty((len(phrases), self.backend.embed_dim), dtype=np.float32)
         
-        # Get image embeddings
-        with torch.no_grad():
-            img_emb = F.normalize(self.model.vision_encoder(img_tensor), dim=-1)
-        
-        # Build disease phrases
-        phrases, owners = [], []
-        for disease in diseases:
-            # Split description into sentences/phrases
-            disease_phrases = [p.strip() for p in disease.description.split("\n") if p.strip()]
-            if disease_phrases:
-                # Limit phrases if needed
-                if len(disease_phrases) > max_phrases:
-                    disease_phrases = random.sample(disease_phrases, max_phrases)
-                
-                for phrase in disease_phrases:
-                    phrases.append(phrase)
-                    owners.append(disease.name)
+        # Only phrases neither cached nor repeated earlier in this call reach the encoder
+        pending: Dict[str, List[int]] = {}
+        for i, key in enumerate(keys):
+            if key in pending:
+                pending[key].append(i)
+                continue
+            cached = self.text_cache.get(key) if self.text_cache is not None else None
+            if cached is not None:
+                txt_emb[i] = cached
+            else:
+                pending[key] = [i]
         
-        if not phrases:
-            logger.warning("No valid phrases found in disease descriptions")
-            return []
+        logger.info(f"Encoding {len(pending)} of {len(phrases)} phrases")
+        if pending:
+            unique = [positions[0] for positions in pending.values()]
+            encoded = self._encode_texts([texts[i] for i in unique])
+            for positions, emb in zip(pending.values(), encoded):
+                txt_emb[positions] = emb
+                if self.text_cache is not None:
+                    self.text_cache.put(keys[positions[0]], emb)
         
-        # Get text embeddings
-        logger.info(f"Processing {len(phrases)} phrases from {len(set(owners))} diseases")
-        tok = self.tokenizer(phrases, padding=True, truncation=True, 
-                          max_length=128, return_tensors="pt").to(self.device)
+        return [row.tobytes() for row in txt_emb]
+    
+    @property
+    def can_encode_text(self) -> bool:
+        return not settings.classification_vision_only
+    
+    @staticmethod
+    def _normalize_phrase(phrase: str) -> str:
+        """Unicode-normalised, whitespace-collapsed phrase (case is kept: the tokenizer is cased)"""
+        return " ".join(unicodedata.normalize("NFC", phrase).split())
+    
+    def _phrase_key(self, text: str) -> str:
+        """Cache key of a normalised phrase under the loaded weights"""
+        return hashlib.sha256(f"{self._model_version}:{text}".encode("utf-8")).hexdigest()
+    
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        """(len(texts), D) float32 embeddings from the text tower, in input order"""
+        # Fast tokenizers are not safe to call from several threads at once
+        with self._tokenizer_lock:
+            token_ids = self.tokenizer(texts, truncation=True, max_length=128)["input_ids"]
+        
+        # Encode similar-length phrases together so short ones are not padded to the longest
+        txt_emb = np.empty((len(texts), self.backend.embed_dim), dtype=np.float32)
+        batches = length_bucketed_batches(
+            [len(ids) for ids in token_ids],
+            max_batch_size=settings.text_encoder_max_batch_size,
+            max_batch_tokens=settings.text_encoder_max_batch_tokens,
+        )
+        for positions in batches:
+            input_ids, attention_mask = pad_batch([token_ids[i] for i in positions], self.tokenizer.pad_token_id)
+            with torch.no_grad():
+                emb = self.backend.encode_text(input_ids.to(self.device), attention_mask.to(self.device))
+            # Scatter back to the input order
+            txt_emb[positions] = emb.cpu().numpy()
+        return txt_emb
+    
+    @property
+    def holds_phrase_index(self) -> bool:
+        return True
+
+    def load_phrase_index(self, entries: Sequence[DiseasePhraseEmbedding], version: str) -> None:
+        """
+        Replace the in-memory phrase index with the given stored embeddings.
+        
+        Args:
+            entries: The stored phrase embeddings of the loaded model
+            version: Fingerprint of the stored index the entries were read at
+        """
+        if not ClassificationRepository._is_initialized:
+            self.initialize_model()
+        
+        # Never score against phrases another checkpoint / precision encoded
+        stale = {e.disease_id for e in entries if e.model_version != self._model_version}
+        if stale:
+            logger.warning(f"{len(stale)} diseases have phrase embeddings from another model than "
+                           f"{self._model_version} and are left out of the index; re-index them with "
+                           "scripts.rebuild_phrase_index")
+            entries = [e for e in entries if e.disease_id not in stale]
         
+        # Map every row to a dense disease slot once, so scoring is pure tensor ops;
+        # the scoring engine expects the rows of a disease to be contiguous
+        entries = sorted(entries, key=lambda e: e.disease_id)
+        owner_ids = np.fromiter((e.disease_id for e in entries), dtype=np.int64, count=len(entries))
+        disease_ids, owner = np.unique(owner_ids, return_inverse=True)
+        owner = torch.from_numpy(owner.astype(np.int64)).to(self.device)
+        
+        if entries:
+            embeddings = np.stack([np.frombuffer(e.embedding, dtype=np.float32) for e in entries])
+        else:
+            embeddings = np.zeros((0, self.backend.embed_dim), dtype=np.float32)
+        
+        embeddings = torch.from_numpy(embeddings).to(self.device)
+        
+        # Swap the whole index at once so concurrent readers never see a mix
+        self.phrase_index = PhraseIndex(
+            embeddings=embeddings,
+            phrases=[e.phrase for e in entries],
+            owner=owner,
+            counts=torch.bincount(owner, minlength=len(disease_ids)),
+            disease_ids=disease_ids,
+            version=version,
+            ann=self._build_ann(embeddings, owner),
+        )
+        logger.info(f"Loaded phrase index {version}: {len(entries)} phrases from {len(disease_ids)} diseases")
+    
+    def _build_ann(self, embeddings: torch.Tensor, owner: torch.Tensor) -> Optional[IVFIndex]:
+        """IVF index over the phrases once the catalog is large enough to need one"""
+        threshold = settings.phrase_ann_min_phrases
+        if threshold <= 0 or embeddings.shape[0] < threshold:
+            return None
+        
+        # Catalog edits only move a few phrases: keep the trained centroids
+        previous = self.phrase_index.ann if self.phrase_index is not None else None
         with torch.no_grad():
-            txt_emb = self.model.text_encoder(tok.input_ids, tok.attention_mask)
-            txt_emb = F.normalize(txt_emb, dim=-1)
+            ann = IVFIndex.build(embeddings, owner, n_lists=settings.phrase_ann_lists, previous=previous)
+        logger.info(f"Built IVF phrase index: {ann.n_lists} lists over {embeddings.shape[0]} phrases")
+        return ann
+    
+    @property
+    def phrase_index_version(self) -> Optional[str]:
+        index = self.phrase_index
+        return index.version if index is not None else None
+
+    def _prepare_image(self, image: bytes) -> PreparedImage:
+        """Decode encoded image bytes; look the pixels up in the embedding cache"""
+        try:
+            key, pixels = prepare_image(image)
+        except Exception as e:
+            # One corrupt upload must not fail the rest of its series
+            logger.warning(f"Could not decode image: {e}")
+            return PreparedImage("", None, None, error=e)
+        return self._prepare_pixels(key, pixels)
+    
+    def _prepare_pixels(self, key: str, pixels: np.ndarray) -> PreparedImage:
+        """Look preprocessed (3, 224, 224) pixels up in the embedding cache by their key"""
+        if self.image_cache is not None:
+            cached = self.image_cache.get(key)
+            if cached is not None:
+                return PreparedImage(key, torch.tensor(cached, device=self.device), None)
         
-        # Calculate similarities with temperature scaling
+        return PreparedImage(key, None, torch.from_numpy(pixels))
+    
+    def _embed_prepared(self, batch: List[PreparedImage]) -> List[torch.Tensor]:
+        """Run the vision encoder on cache misses only and cache their embeddings"""
+        misses = [p for p in batch if p.embedding is None]
+        if misses:
+            for p, emb in zip(misses, self._embed_images([p.tensor for p in misses])):
+                p.embedding = emb
+                if self.image_cache is not None:
+                    self.image_cache.put(p.key, emb.cpu().numpy())
+        return [p.embedding for p in batch]
+    
+    def _allowed_slots(self, index: PhraseIndex, diseases: List[Disease]) -> torch.Tensor:
+        """(M,) bool mask of the index slots belonging to the given diseases"""
+        requested = np.fromiter((d.id for d in diseases), dtype=np.int64, count=len(diseases))
+        return torch.from_numpy(np.isin(index.disease_ids, requested)).to(self.device)
+    
+    def _score(self, index: PhraseIndex, img_emb: torch.Tensor, rows: torch.Tensor,
+               names: Dict[int, str], top_k: int) -> List[List[dict]]:
+        """Score a (B, D) batch of image embeddings against the selected phrase rows"""
         with torch.no_grad():
-            # Apply temperature scaling from the model
-            logits = (self.model.logit_scale.exp() * img_emb @ txt_emb.T).squeeze(0)
+            # Apply temperature scaling from the model; one matmul over the whole index
+            sims = self.backend.similarity_scale * img_emb @ index.embeddings.T
+            num_slots = len(index.disease_ids)
+            if rows.numel() == index.owner.numel():
+                # Every indexed phrase takes part: no column gather needed
+                ranked = score_diseases(sims, index.owner, num_slots, top_k, counts=index.counts)
+            else:
+                ranked = score_diseases(sims[:, rows], index.owner[rows], num_slots, top_k)
+        
+        return self._format_results(index, ranked, rows, names)
+    
+    def _score_candidates(self, index: PhraseIndex, img_emb: torch.Tensor, allowed: torch.Tensor,
+                          rows: torch.Tensor, names: Dict[int, str], top_k: int) -> List[dict]:
+        """
+        Score one (D,) image embedding against the selected rows of its ANN candidate diseases.
+        
+        Like _score, similarities are normalised with the lowest and highest over all
+        selected rows, not over the candidates only: those lack the least similar diseases
+        and would inflate every score. The bounds are estimated from the IVF lists rather
+        than computed over the whole index, which would cost as much as exact scoring.
+        """
+        with torch.no_grad():
+            slots = index.ann.candidate_slots(img_emb, allowed, settings.phrase_ann_probe,
+                                              settings.phrase_ann_candidate_diseases)
+            if slots.numel() < min(top_k, int(allowed.sum())):
+                # The probed lists missed (some of) the requested diseases: score them all
+                candidates = allowed
+            else:
+                candidates = torch.zeros_like(allowed)
+                candidates[slots] = True
+            kept = rows[candidates[index.owner[rows]]]
+            scale = self.backend.similarity_scale
+            sims = scale * (index.embeddings[kept] @ img_emb)
             
-            # Normalize to 0-1 range for easier interpretation
-            sims = logits
-            sims_min, sims_max = sims.min(), sims.max()
-            sims_norm = ((sims - sims_min) / (sims_max - sims_min + 1e-8)).cpu().numpy()
-        
-        # Aggregate by disease
-        dz_sims = defaultdict(list)
-        dz_phrases = defaultdict(list)
-        
-        for sim, phrase, disease_name in zip(sims_norm, phrases, owners):
-            dz_sims[disease_name].append(sim)
-            dz_phrases[disease_name].append((sim, phrase))
-        
-        # Calculate mean score for each disease
-        dz_mean = {dz: float(np.mean(sims)) for dz, sims in dz_sims.items()}
-        
-        # Get top diseases
-        top_diseases = sorted(dz_mean.items(), key=lambda x: x[1], reverse=True)[:top_k]
-        
-        # Format results
-        results = []
-        for disease_name, score in top_diseases:
-            # Get best phrase for this disease
-            disease_phrase_pairs = dz_phrases[disease_name]
-            disease_phrase_pairs.sort(key=lambda x: x[0], reverse=True)
-            best_phrase = disease_phrase_pairs[0][1]
+            selected = torch.zeros_like(index.owner, dtype=torch.bool)
+            selected[rows] = True
+            estimate = index.ann.similarity_bounds(img_emb, selected, settings.phrase_ann_probe)
+            if estimate is None:
+                # No selected phrase in the probed lists (few diseases requested): cheap to compute
+                all_sims = index.embeddings[rows] @ img_emb
+                estimate = float(all_sims.min()), float(all_sims.max())
+            lo = min(scale * estimate[0], float(sims.min()))
+            hi = max(scale * estimate[1], float(sims.max()))
+            ranked = score_diseases(sims.unsqueeze(0), index.owner[kept], len(index.disease_ids), top_k,
+                                    bounds=(sims.new_full((1, 1), lo), sims.new_full((1, 1), hi)))
+        
+        return self._format_results(index, ranked, kept, names)[0]
+    
+    def _format_results(self, index: PhraseIndex, ranked: DiseaseScores, rows: torch.Tensor,
+                        names: Dict[int, str]) -> List[List[dict]]:
+        """Turn ranked slots into result dicts; only the top-k of each image leave the tensors"""
+        scores, slots = ranked.scores.tolist(), ranked.slots.tolist()
+        best_rows = rows[ranked.best_rows].tolist()
+        
+        batch_results = []
+        for img_scores, img_slots, img_best in zip(scores, slots, best_rows):
+            results = []
+            for score, slot, row in zip(img_scores, img_slots, img_best):
+                disease_name = names[int(index.disease_ids[slot])]
+                
+                # Add confidence label for logging
+                confidence = self._get_confidence_label(score)
+                logger.info(f"Disease: {disease_name}, Score: {score:.3f}, Confidence: {confidence}")
+                
+                results.append({
+                    "disease_name": disease_name,
+                    "score": score,
+                    "best_phrase": index.phrases[row]
+                })
+            batch_results.append(results)
+        return batch_results
+
+    def metrics(self) -> Dict[str, Any]:
+        """Runtime counters of the classification engine"""
+        return {
+            "image_embedding_cache": self.image_cache.stats() if self.image_cache is not None else None,
+            "text_embedding_cache": self.text_cache.stats() if self.text_cache is not None else None,
+            "vision_lanes": self.vision_batcher.stats() if self.vision_batcher is not None else None,
+        }
+
+    def classify_image(self, image: bytes, diseases: List[Disease], max_phrases: int = 12, top_k: int = 5) -> List[dict]:
+        """
+        Classify an image against a list of diseases.
+        
+        Phrase embeddings come from the loaded phrase index, so only the
+        vision encoder runs per request.
+        
+        Args:
+            image: Encoded image file contents (JPEG, PNG, ...)
+            diseases: List of diseases to compare against
+            max_phrases: Maximum number of phrases to sample per disease
+            top_k: Number of top predictions to return
             
-            # Add confidence label for logging
-            confidence = self._get_confidence_label(score)
-            logger.info(f"Disease: {disease_name}, Score: {score:.3f}, Confidence: {confidence}")
+        Returns:
+            List of dictionaries with disease name, score, and best matching phrase
+        """
+        results = next(self.classify_images([image], diseases, max_phrases, top_k))
+        if isinstance(results, Exception):
+            raise results
+        logger.info(f"Classification complete. Found {len(results)} matching diseases.")
+        return results
+    
+    def classify_images(self, images: List[bytes], diseases: List[Disease], max_phrases: int = 12, top_k: int = 5) -> Iterator[Union[List[dict], Exception]]:
+        """
+        Classify a series of images against a list of diseases.
+        
+        Images are decoded in parallel, embedded in vision batches and each
+        batch is scored against the same phrase selection in one matmul.
+        
+        Args:
+            images: Encoded image file contents
+            diseases: List of diseases to compare against
+            max_phrases: Maximum number of phrases to sample per disease
+            top_k: Number of top predictions to return
             
-            results.append({
-                "disease_name": disease_name,
-                "score": score,
-                "best_phrase": best_phrase
-            })
+        Yields:
+            Per image, in input order and as soon as its batch is scored:
+            list of dictionaries with disease name, score, and best matching phrase,
+            or the decoding error of an image that is not a readable picture
+        """
+        if not ClassificationRepository._is_initialized:
+            self.initialize_model()
         
-        logger.info(f"Classification complete. Found {len(results)} matching diseases.")
-        return results
\ No newline at end of file
+        # Decode every image straight from memory, in parallel; map keeps input order
+        prepared = self._decode_pool.map(self._prepare_image, images)
+        yield from self._classify_prepared(prepared, len(images), diseases, max_phrases, top_k)
+    
+    def classify_pixels(self, keys: Sequence[str], pixels: np.ndarray, diseases: List[Disease],
+                        max_phrases: int = 12, top_k: int = 5) -> List[List[dict]]:
+        """
+        Classify images that were decoded and preprocessed elsewhere
+        (infrastructure.ai.preprocessing), e.g. by a model-server client.
+        
+        Args:
+            keys: Embedding cache key of every image
+            pixels: (B, 3, 224, 224) float32 normalised pixels
+            diseases: List of diseases to compare against
+            max_phrases: Maximum number of phrases to sample per disease
+            top_k: Number of top predictions to return
+            
+        Returns:
+            Per image, in input order: list of dictionaries with disease name,
+            score, and best matching phrase
+        """
+        if not ClassificationRepository._is_initialized:
+            self.initialize_model()
+        
+        prepared = (self._prepare_pixels(key, p) for key, p in zip(keys, pixels))
+        return list(self._classify_prepared(prepared, len(keys), diseases, max_phrases, top_k))
+    
+    def _classify_prepared(self, prepared: Iterator[PreparedImage], count: int, diseases: List[Disease],
+                           max_phrases: int, top_k: int) -> Iterator[Union[List[dict], Exception]]:
+        """Embed and score prepared images in vision batches, yielding per image in input order"""
+        index = self.phrase_index
+        if index is None:
+            logger.warning("Phrase index not loaded, nothing to compare against")
+            for _ in range(count):
+                yield []
+            return
+        
+        allowed = self._allowed_slots(index, diseases)
+        if not bool(allowed.any()):
+            logger.warning("No indexed phrases found for the given diseases")
+            for _ in range(count):
+                yield []
+            return
+        
+        names = {d.id: d.name for d in diseases}
+        # Pick the indexed phrases of every disease, shared by the whole series
+        rows = select_phrase_rows(index.owner, index.counts, allowed, max_phrases)
+        if rows.numel() == 0:
+            logger.warning(f"No phrases selected (max_phrases={max_phrases}), nothing to compare against")
+            for _ in range(count):
+                yield []
+            return
+        if index.ann is not None:
+            # Large catalog: every image only scores its own candidate diseases
+            logger.info(f"Scoring {count} images against ANN candidates among {len(diseases)} diseases")
+        else:
+            logger.info(f"Scoring {count} images against {rows.numel()} phrases from {len(diseases)} diseases")
+        
+        batch_size = max(1, settings.classification_max_batch_size)
+        
+        while True:
+            batch = list(islice(prepared, batch_size))
+            if not batch:
+                return
+            decoded = [p for p in batch if p.error is None]
+            if not decoded:
+                scored = iter([])
+            elif index.ann is not None:
+                img_emb = torch.stack(self._embed_prepared(decoded))
+                scored = (self._score_candidates(index, emb, allowed, rows, names, top_k) for emb in img_emb)
+            else:
+                img_emb = torch.stack(self._embed_prepared(decoded))
+                scored = iter(self._score(index, img_emb, rows, names, top_k))
+            for p in batch:
+                yield p.error if p.error is not None else next(scored)
@@ -0,0 +1,95 @@
+# infrastructure/db/repositories/phrase_embedding_repository.py
+from __future__ import annotations
+
+from typing import Optional, Sequence, Set
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from domain.entities.disease_phrase_embedding import DiseasePhraseEmbedding
+from domain.interfaces.repositories.phrase_embedding_repository_interface import (
+    IPhraseEmbeddingRepository,
+)
+
+from infrastructure.db.models.disease_phrase_embedding import (
+    DiseasePhraseEmbedding as ORMDiseasePhraseEmbedding,
+)
+from infrastructure.db.repositories._mapping import orm_to_entity
+
+
+class PhraseEmbeddingRepository(IPhraseEmbeddingRepository):
+
+    # --------------------------------------------------------------------- #
+    # constructor
+    # --------------------------------------------------------------------- #
+    def __init__(self, db: Session) -> None:
+        self._db = db
+
+    # --------------------------------------------------------------------- #
+    # Commands
+    # --------------------------------------------------------------------- #
+    def replace_for_disease(
+        self,
+        disease_id: int,
+        phrases: Sequence[str],
+        embeddings: Sequence[bytes],
+        model_version: Optional[str],
+    ) -> None:
+        if len(phrases) != len(embeddings):
+            raise ValueError("phrases and embeddings must have the same length")
+
+        (
+            self._db.query(ORMDiseasePhraseEmbedding)
+            .filter(
+                ORMDiseasePhraseEmbedding.disease_id == disease_id,
+                or_(
+                    ORMDiseasePhraseEmbedding.model_version == model_version,
+                    ORMDiseasePhraseEmbedding.model_version.is_(None),
+                ),
+            )
+            .delete(synchronize_session=False)
+        )
+        self._db.add_all(
+            ORMDiseasePhraseEmbedding(
+                disease_id=disease_id, phrase=phrase, embedding=embedding, model_version=model_version
+            )
+            for phrase, embedding in zip(phrases, embeddings)
+        )
+        self._db.flush()
+
+    def delete_for_disease(self, disease_id: int) -> None:
+        (
+            self._db.query(ORMDiseasePhraseEmbedding)
+            .filter(ORMDiseasePhraseEmbedding.disease_id == disease_id)
+            .delete(synchronize_session=False)
+        )
+        self._db.flush()
+
+    # --------------------------------------------------------------------- #
+    # Queries
+    # --------------------------------------------------------------------- #
+    def list_all(self, model_version: Optional[str] = None) -> Sequence[DiseasePhraseEmbedding]:
+        query = self._db.query(ORMDiseasePhraseEmbedding)
+        if model_version is not None:
+            query = query.filter(ORMDiseasePhraseEmbedding.model_version == model_version)
+        rows = (
+            query
+            .order_by(ORMDiseasePhraseEmbedding.disease_id.asc(), ORMDiseasePhraseEmbedding.id.asc())
+            .all()
+        )
+        return [orm_to_entity(r, DiseasePhraseEmbedding) for r in rows]
+
+    def indexed_disease_ids(self, model_version: Optional[str] = None) -> Set[int]:
+        query = self._db.query(ORMDiseasePhraseEmbedding.disease_id)
+        if model_version is not None:
+            query = query.filter(ORMDiseasePhraseEmbedding.model_version == model_version)
+        return {r[0] for r in query.distinct().all()}
+
+    def version(self) -> str:
+        # Replacing a disease always allocates fresh ids and deleting one
+        # changes the count, so (count, max id) moves on every change.
+        count, max_id = self._db.query(
+            func.count(ORMDiseasePhraseEmbedding.id),
+            func.max(ORMDiseasePhraseEmbedding.id),
+        ).one()
+        return f"{count}:{max_id or 0}"
@@ -0,0 +1,241 @@
+import atexit
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from domain.interfaces.repositories.classification_repository_interface import IClassificationRepository
+from domain.entities.disease import Disease
+from domain.entities.disease_phrase_embedding import DiseasePhraseEmbedding
+from core.settings import settings
+from infrastructure.ai.lanes import current_lane
+from infrastructure.ai.preprocessing import PIXEL_SHAPE, prepare_image
+from infrastructure.ai.model_server import (
+    CLASSIFY,
+    ENCODE_PHRASES,
+    METRICS,
+    REFRESH_INDEX,
+    STATUS,
+    ModelServerError,
+)
+
+logger = logging.getLogger("RemoteClassificationRepository")
+
+_PIXEL_BYTES = int(np.prod(PIXEL_SHAPE)) * np.dtype(np.float32).itemsize
+
+
+def _try_prepare_image(image: bytes) -> Union[Tuple[str, np.ndarray], Exception]:
+    """prepare_image, or the error of an upload that is not a readable picture"""
+    try:
+        return prepare_image(image)
+    except Exception as e:
+        logger.warning(f"Could not decode image: {e}")
+        return e
+
+
+class _Channel:
+    """One connection to the model server and the shared-memory segment its pixels go through"""
+
+    def __init__(self, address: Path, authkey: bytes):
+        self.conn = Client(str(address), family="AF_UNIX", authkey=authkey)
+        self.segment: Optional[shared_memory.SharedMemory] = None
+
+    def write_pixels(self, pixels: Sequence[np.ndarray]) -> str:
+        """Copy (3, 224, 224) arrays into the segment (grown as needed); returns its name"""
+        size = len(pixels) * _PIXEL_BYTES
+        if self.segment is None or self.segment.size < size:
+            self._release_segment()
+            self.segment = shared_memory.SharedMemory(create=True, size=size)
+        view = np.ndarray((len(pixels), *PIXEL_SHAPE), dtype=np.float32, buffer=self.segment.buf)
+        for i, p in enumerate(pixels):
+            view[i] = p
+        del view   # no export may outlive the segment
+        return self.segment.name
+
+    def call(self, request: tuple, timeout: float) -> Any:
+        self.conn.send(request)
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"No reply from the model server within {timeout:g} s")
+        status, value = self.conn.recv()
+        if status == "error":
+            raise ModelServerError(value)
+        return value
+
+    def _release_segment(self) -> None:
+        if self.segment is not None:
+            self.segment.close()
+            self.segment.unlink()
+            self.segment = None
+
+    def close(self) -> None:
+        self.conn.close()
+        self._release_segment()
+
+
+class ModelServerClient:
+    """
+    Per-process connection pool to scripts.model_server (settings.model_server_socket).
+
+    One connection, with its own pixel segment, is kept open per concurrent caller.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(ModelServerClient, cls).__new__(cls)
+                    instance.address = settings.model_server_socket
+                    instance._authkey = settings.secret_key.encode()
+                    instance._channels = queue.LifoQueue()
+                    instance.decode_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-decode")
+                    # Unlink the pixel segments rather than leave them to the resource tracker
+                    atexit.register(instance.close)
+                    cls._instance = instance
+        return cls._instance
+
+    def call(self, op: str, *args: Any, pixels: Optional[Sequence[np.ndarray]] = None) -> Any:
+        """Send one request on an idle connection; pixels go through its segment, named first"""
+        try:
+            channel = self._channels.get_nowait()
+        except queue.Empty:
+            channel = None
+        try:
+            if channel is None:
+                channel = _Channel(self.address, self._authkey)
+            if pixels is not None:
+                args = (channel.write_pixels(pixels), *args)
+            value = channel.call((op, *args), settings.model_server_timeout_s)
+        except ModelServerError:
+            # The server answered: the connection is still in step
+            self._channels.put(channel)
+            raise
+        except (OSError, EOFError) as e:
+            if channel is not None:
+                channel.close()
+            raise ModelServerError(f"Model server at {self.address} unavailable: {e}") from e
+        self._channels.put(channel)
+        return value
+
+    def close(self) -> None:
+        """Close the idle connections and release their segments"""
+        while True:
+            try:
+                self._channels.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class RemoteClassificationRepository(IClassificationRepository):
+    """
+    Classification on a model server.
+
+    Nothing of the model lives in this process: uploads are decoded and
+    preprocessed here, their pixels are handed to the server through shared
+    memory, and results, phrase embeddings, status and metrics come back
+    over the socket. Created per unit of work, i.e. per request: the
+    server's status is fetched once and reused for the rest of it.
+    """
+
+    def __init__(self):
+        self._client = ModelServerClient()
+        self._cached_status: Optional[Dict[str, Any]] = None
+
+    def _status(self) -> Dict[str, Any]:
+        if self._cached_status is None:
+            self._cached_status = self._client.call(STATUS)
+        return self._cached_status
+
+    def initialize_model(self) -> None:
+        """Nothing to load in this process; raises (and is retried) while the server is unreachable"""
+        status = self._status()
+        logger.info(f"Using the model server at {self._client.address} ({status['model_status']['state']})")
+
+    @property
+    def is_ready(self) -> bool:
+        try:
+            return self._status()["ready"]
+        except ModelServerError:
+            return False
+
+    def model_status(self) -> Dict[str, Any]:
+        """The server's load state; "failed" with the error while it cannot be reached"""
+        try:
+            return self._status()["model_status"]
+        except ModelServerError as e:
+            return {
+                "state": "failed",
+                "backend": "remote",
+                "model_version": None,
+                "phrases": None,
+                "error": str(e),
+            }
+
+    @property
+    def model_version(self) -> Optional[str]:
+        return self._status()["model_status"]["model_version"]
+
+    def encode_phrases(self, phrases: Sequence[str]) -> List[bytes]:
+        return self._client.call(ENCODE_PHRASES, list(phrases))
+
+    @property
+    def can_encode_text(self) -> bool:
+        return self._status()["can_encode_text"]
+
+    @property
+    def holds_phrase_index(self) -> bool:
+        return False
+
+    def load_phrase_index(self, entries: Sequence[DiseasePhraseEmbedding], version: str) -> None:
+        """The server reloads the index from the database itself; the entries are not shipped"""
+        # Replies with its status after the reload
+        self._cached_status = self._client.call(REFRESH_INDEX)
+        logger.info(f"Model server reloaded its phrase index (version "
+                    f"{self._cached_status['phrase_index_version']}, requested {version})")
+
+    @property
+    def phrase_index_version(self) -> Optional[str]:
+        return self._status()["phrase_index_version"]
+
+    def metrics(self) -> Dict[str, Any]:
+        return self._client.call(METRICS)
+
+    def classify_image(self, image: bytes, diseases: List[Disease], max_phrases: int = 12, top_k: int = 5) -> List[dict]:
+        """Classify an image on the model server"""
+        results = next(self.classify_images([image], diseases, max_phrases, top_k))
+        if isinstance(results, Exception):
+            raise results
+        return results
+
+    def classify_images(self, images: List[bytes], diseases: List[Disease], max_phrases: int = 12, top_k: int = 5) -> Iterator[Union[List[dict], Exception]]:
+        """
+        Classify a series of images on the model server.
+
+        Images are decoded here in parallel and sent in chunks of
+        classification_max_batch_size, so results stream back per chunk; an
+        image that cannot be decoded yields its error instead.
+        """
+        catalog = [(d.id, d.name) for d in diseases]
+        lane = current_lane()
+        prepared = self._client.decode_pool.map(_try_prepare_image, images)
+        batch_size = max(1, settings.classification_max_batch_size)
+
+        while True:
+            batch = list(islice(prepared, batch_size))
+            if not batch:
+                return
+            decoded = [p for p in batch if not isinstance(p, Exception)]
+            scored = iter(self._client.call(
+                CLASSIFY, len(decoded), [key for key, _ in decoded], catalog, max_phrases, top_k, lane,
+                pixels=[pixels for _, pixels in decoded],
+            ) if decoded else [])
+            for p in batch:
+                yield p if isinstance(p, Exception) else next(scored)
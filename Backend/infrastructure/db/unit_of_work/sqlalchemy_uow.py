@@ -1,6 +1,7 @@
 from contextlib import AbstractAsyncContextManager
 from sqlalchemy.orm import Session
 
+from core.settings import settings
 from domain.interfaces.unit_of_work import IUnitOfWork
 
 from infrastructure.db.repositories.patient_repository import PatientRepository
@@ -10,7 +11,8 @@ from infrastructure.db.repositories.patient_disease_repository import PatientDis
 from infrastructure.db.repositories.token_blacklist_repository import (
     TokenBlacklistRepository,
 )
-from infrastructure.db.repositories.classification_repository import ClassificationRepository
+from infrastructure.db.repositories.phrase_embedding_repository import PhraseEmbeddingRepository
+from infrastructure.db.repositories.classification_job_repository import ClassificationJobRepository
 
 class SqlAlchemyUnitOfWork(IUnitOfWork, AbstractAsyncContextManager):
     """
@@ -27,9 +29,13 @@ class SqlAlchemyUnitOfWork(IUnitOfWork, AbstractAsyncContextManager):
         self._patient_diseases = PatientDiseaseRepository(db)
         self._users = UserRepository(db)
         self._token_blacklist = TokenBlacklistRepository(db)
+        self._phrase_embeddings = PhraseEmbeddingRepository(db)
+        self._classification_jobs = ClassificationJobRepository(db)
         
-        # ML-backed repos
-        self._classification = ClassificationRepository()
+        # ML-backed repos: created on first use, so CRUD-only code paths
+        # (migrations, create_tables, user/patient endpoints) never import torch;
+        # with a model server, this process never loads the model at all
+        self._classification = None
         
 
     # ---------- interface properties ----------
@@ -52,8 +58,25 @@ class SqlAlchemyUnitOfWork(IUnitOfWork, AbstractAsyncContextManager):
         
     @property
     def classification(self):
+        if self._classification is None:
+            if settings.model_server_socket is not None:
+                from infrastructure.db.repositories.remote_classification_repository import (
+                    RemoteClassificationRepository,
+                )
+                self._classification = RemoteClassificationRepository()
+            else:
+                from infrastructure.db.repositories.classification_repository import ClassificationRepository
+                self._classification = ClassificationRepository()
         return self._classification
 
+    @property
+    def phrase_embeddings(self) -> PhraseEmbeddingRepository:
+        return self._phrase_embeddings
+
+    @property
+    def classification_jobs(self) -> ClassificationJobRepository:
+        return self._classification_jobs
+
     # ---------- transaction control ----------
     def commit(self): self._db.commit()
 
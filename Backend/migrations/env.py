@@ -11,6 +11,8 @@ from infrastructure.db.models.disease import Disease     # noqa: F401
 from infrastructure.db.models.patient import Patient     # noqa: F401
 from infrastructure.db.models.patient_disease import PatientDisease  # noqa: F401
 from infrastructure.db.models.token_blacklist import TokenBlacklist  # noqa: F401
+from infrastructure.db.models.disease_phrase_embedding import DiseasePhraseEmbedding  # noqa: F401
+from infrastructure.db.models.classification_job import ClassificationJob  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
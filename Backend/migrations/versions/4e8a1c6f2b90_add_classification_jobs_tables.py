@@ -0,0 +1,62 @@
+"""add classification_jobs tables
+
+Revision ID: 4e8a1c6f2b90
+Revises: 9c41d2b7e5a3
+Create Date: 2026-10-18 14:02:17.524031
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e8a1c6f2b90'
+down_revision: Union[str, Sequence[str], None] = '9c41d2b7e5a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'classification_jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('max_phrases', sa.Integer(), nullable=False),
+        sa.Column('top_k', sa.Integer(), nullable=False),
+        sa.Column('image_count', sa.Integer(), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('worker_id', sa.String(length=128), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('results', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_classification_jobs_status_created_at', 'classification_jobs', ['status', 'created_at'], unique=False)
+    op.create_table(
+        'classification_job_images',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.String(length=32), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['classification_jobs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_classification_job_images_id'), 'classification_job_images', ['id'], unique=False)
+    op.create_index(op.f('ix_classification_job_images_job_id'), 'classification_job_images', ['job_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_classification_job_images_job_id'), table_name='classification_job_images')
+    op.drop_index(op.f('ix_classification_job_images_id'), table_name='classification_job_images')
+    op.drop_table('classification_job_images')
+    op.drop_index('ix_classification_jobs_status_created_at', table_name='classification_jobs')
+    op.drop_table('classification_jobs')
@@ -0,0 +1,40 @@
+"""add disease_phrase_embeddings table
+
+Revision ID: 9c41d2b7e5a3
+Revises: 283b1a9abe6a
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c41d2b7e5a3'
+down_revision: Union[str, Sequence[str], None] = '283b1a9abe6a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'disease_phrase_embeddings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('disease_id', sa.Integer(), nullable=False),
+        sa.Column('phrase', sa.Text(), nullable=False),
+        sa.Column('embedding', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['disease_id'], ['diseases.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_disease_phrase_embeddings_id'), 'disease_phrase_embeddings', ['id'], unique=False)
+    op.create_index(op.f('ix_disease_phrase_embeddings_disease_id'), 'disease_phrase_embeddings', ['disease_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_disease_phrase_embeddings_disease_id'), table_name='disease_phrase_embeddings')
+    op.drop_index(op.f('ix_disease_phrase_embeddings_id'), table_name='disease_phrase_embeddings')
+    op.drop_table('disease_phrase_embeddings')
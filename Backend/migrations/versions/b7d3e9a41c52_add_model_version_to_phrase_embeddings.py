@@ -0,0 +1,31 @@
+"""add model_version to disease_phrase_embeddings
+
+Revision ID: b7d3e9a41c52
+Revises: 4e8a1c6f2b90
+Create Date: 2026-10-18 15:20:44.731902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e9a41c52'
+down_revision: Union[str, Sequence[str], None] = '4e8a1c6f2b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows stay NULL: their encoder is unknown, so they are re-indexed
+    op.add_column('disease_phrase_embeddings', sa.Column('model_version', sa.String(length=64), nullable=True))
+    op.create_index('ix_disease_phrase_embeddings_disease_model', 'disease_phrase_embeddings', ['disease_id', 'model_version'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_disease_phrase_embeddings_disease_model', table_name='disease_phrase_embeddings')
+    op.drop_column('disease_phrase_embeddings', 'model_version')
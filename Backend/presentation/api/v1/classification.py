@@ -1,36 +1,106 @@
 import os
 import uuid
 import logging
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pathlib import Path
-from typing import List
+from typing import List, Literal
 
+from core.settings import settings
 from domain.interfaces.unit_of_work import IUnitOfWork
+from infrastructure.ai.inference_executor import (
+    InferenceCancelledError,
+    InferenceDeadlineError,
+    InferenceQueueFullError,
+    inference_queue_stats,
+    reserve_inference_slot,
+    submit_inference,
+)
+from infrastructure.ai.singleflight import Singleflight
 from presentation.di import get_uow
 from presentation.security import require_role
-from presentation.schemas.classification import ClassificationResponseOut, ClassificationResultOut
+from presentation.schemas.classification import (
+    BatchClassificationItemOut,
+    ClassificationJobOut,
+    ClassificationMetricsOut,
+    ClassificationResponseOut,
+    ClassificationResultOut,
+)
 
+from application.usecases.errors import ClassificationJobNotFoundError, ModelNotReadyError
 from application.usecases.commands.classification.classify_image import (
     ClassifyImageCommand,
     classify_image,
     ClassificationResult
 )
+from application.usecases.commands.classification.classify_image_batch import (
+    ClassifyImageBatchCommand,
+    classify_image_batch,
+)
+from application.usecases.commands.classification.submit_classification_job import (
+    SubmitClassificationJobCommand,
+    submit_classification_job,
+)
+from application.usecases.queries.classification.get_classification_job import (
+    GetClassificationJobQuery,
+    get_classification_job,
+)
+from application.usecases.queries.classification.get_classification_metrics import (
+    GetClassificationMetricsQuery,
+    get_classification_metrics,
+)
 
 # Configure logging
 logger = logging.getLogger("classification_api")
 
 router = APIRouter(prefix="/classification", tags=["Classification"])
 
-# Define the uploads directory
+# Status of a request whose client went away (nginx convention); nobody reads the response
+CLIENT_CLOSED_REQUEST = 499
+
+# Identical concurrent classify requests (retries, two doctors opening the
+# same study) share one computation
+classification_flights: Singleflight[List[ClassificationResult]] = Singleflight()
+
+# Define the uploads directory (only touched when uploads are persisted)
 UPLOADS_DIR = Path(__file__).parent.parent.parent.parent / "resources" / "uploads"
-os.makedirs(UPLOADS_DIR, exist_ok=True)
+
+
+def service_unavailable(e: Exception) -> HTTPException:
+    """Fast 503 while the model loads or the inference queue is saturated; clients retry later"""
+    logger.info(f"Rejected classification request: {e}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": str(settings.classification_retry_after_seconds)},
+    )
+
+
+def persist_upload(data: bytes, filename: str) -> None:
+    """
+    Archive an uploaded original under resources/uploads.
+    
+    Runs as a background task after the response is sent; classification
+    never depends on it, so failures (e.g. read-only filesystem) are only logged.
+    """
+    file_path = UPLOADS_DIR / f"{uuid.uuid4()}{os.path.splitext(filename or '')[1]}"
+    try:
+        os.makedirs(UPLOADS_DIR, exist_ok=True)
+        with open(file_path, "wb") as f:
+            f.write(data)
+        logger.info(f"Saved uploaded image as: {file_path}")
+    except OSError as e:
+        logger.warning(f"Could not persist upload {filename}: {e}")
 
 
 @router.post("/classify", response_model=ClassificationResponseOut)
 async def classify_disease_image(
+    request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    max_phrases: int = 12,
-    top_k: int = 5,
+    max_phrases: int = Query(12, ge=1),
+    top_k: int = Query(5, ge=1),
     uow: IUnitOfWork = Depends(get_uow),
     _=Depends(require_role("doctor")),
 ):
@@ -38,9 +108,10 @@ async def classify_disease_image(
     Classify a medical image to identify potential diseases.
     
     The API will:
-    1. Save the uploaded image
+    1. Decode the uploaded image directly from memory
     2. Process the image with MedCLIP model
     3. Return top diseases with similarity scores
+    4. Optionally archive the original after responding
     
     Args:
         file: The uploaded medical image
@@ -58,48 +129,266 @@ async def classify_disease_image(
             detail="File must be an image"
         )
     
-    # Generate unique filename and save
-    file_ext = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = UPLOADS_DIR / unique_filename
-    
-    logger.info(f"Saving uploaded image as: {file_path}")
-    
-    # Save the uploaded file
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
+    data = await file.read()
     
     try:
         # Classify the image
-        logger.info(f"Starting classification for image: {unique_filename}")
+        logger.info(f"Starting classification for image: {file.filename}")
         command = ClassifyImageCommand(
-            image_path=str(file_path),
+            image=data,
             max_phrases=max_phrases,
             top_k=top_k
         )
         
-        results = classify_image(command, uow)
-        logger.info(f"Classification complete for {unique_filename}, found {len(results)} matches")
-        
-        # Convert results to output schema
-        return ClassificationResponseOut(
-            results=[
-                ClassificationResultOut(
-                    disease_name=r.disease_name,
-                    score=r.score,
-                    best_phrase=r.best_phrase
-                )
-                for r in results
-            ]
+        # Inference is CPU-bound: keep it off the event loop, behind admission control.
+        # Duplicates of an in-flight request await its result instead
+        results = await classification_flights.do(
+            command.coalescing_key(uow.classification.phrase_index_version),
+            lambda is_disconnected: submit_inference(classify_image, command, uow, is_disconnected=is_disconnected),
+            is_disconnected=request.is_disconnected,
         )
+        logger.info(f"Classification complete for {file.filename}, found {len(results)} matches")
         
+    except (ModelNotReadyError, InferenceQueueFullError, InferenceDeadlineError) as e:
+        raise service_unavailable(e)
+    except InferenceCancelledError:
+        logger.info(f"Client went away, dropped classification of {file.filename}")
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
     except Exception as e:
-        logger.error(f"Error classifying image {unique_filename}: {str(e)}", exc_info=True)
-        # Clean up file in case of error
-        if file_path.exists():
-            os.unlink(file_path)
-            logger.info(f"Removed file {unique_filename} due to error")
+        logger.error(f"Error classifying image {file.filename}: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error classifying image: {str(e)}"
         )
+    
+    if settings.classification_persist_uploads:
+        background_tasks.add_task(persist_upload, data, file.filename)
+    
+    # Convert results to output schema
+    return ClassificationResponseOut(
+        results=[
+            ClassificationResultOut(
+                disease_name=r.disease_name,
+                score=r.score,
+                best_phrase=r.best_phrase
+            )
+            for r in results
+        ]
+    )
+
+
+@router.post("/classify-batch")
+async def classify_disease_image_batch(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    max_phrases: int = Query(12, ge=1),
+    top_k: int = Query(5, ge=1),
+    priority: Literal["interactive", "batch"] = "interactive",
+    uow: IUnitOfWork = Depends(get_uow),
+    _=Depends(require_role("doctor")),
+):
+    """
+    Classify a series of medical images (e.g. several MRI slices) in one call.
+    
+    The images are decoded in parallel, run through the vision encoder in
+    batches and scored against the catalog together. Results stream back as
+    NDJSON: one BatchClassificationItemOut line per image, in upload order,
+    as soon as its batch is done.
+    
+    Args:
+        files: The uploaded medical images
+        max_phrases: Maximum number of phrases to sample per disease
+        top_k: Number of top predictions to return per image
+        priority: Inference lane; "batch" for bulk uploads nobody is waiting
+                  on, so they yield to interactive requests
+        
+    Returns:
+        application/x-ndjson stream of per-image results
+    """
+    # Validate every file is an image before doing any work
+    for file in files:
+        if not file.content_type.startswith("image/"):
+            logger.warning(f"Rejected non-image file: {file.filename} ({file.content_type})")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File must be an image: {file.filename}"
+            )
+    
+    filenames = [file.filename for file in files]
+    images = [await file.read() for file in files]
+    
+    logger.info(f"Starting batch classification for {len(images)} images")
+    command = ClassifyImageBatchCommand(
+        images=images,
+        max_phrases=max_phrases,
+        top_k=top_k
+    )
+    
+    # One admission slot for the whole stream: every step below runs inside it
+    try:
+        slot = reserve_inference_slot(priority)
+    except InferenceQueueFullError as e:
+        raise service_unavailable(e)
+    
+    def submit_step(fn, *args):
+        return submit_inference(fn, *args, lane=priority, slot=slot, is_disconnected=request.is_disconnected)
+    
+    streaming = False
+    try:
+        # Reads the catalog; the returned iterator no longer needs the session
+        batch_results = await submit_step(classify_image_batch, command, uow)
+        streaming = True
+    except (ModelNotReadyError, InferenceDeadlineError) as e:
+        raise service_unavailable(e)
+    except InferenceCancelledError:
+        logger.info(f"Client went away, dropped batch classification of {len(images)} images")
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+    except Exception as e:
+        logger.error(f"Error preparing batch classification: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error classifying images: {str(e)}"
+        )
+    finally:
+        if not streaming:
+            slot.release()
+    
+    async def ndjson_lines():
+        next_index = 0
+        try:
+            while True:
+                # Each step may decode and run a vision batch: off the event loop, within
+                # the request's slot, dropped once past the deadline or the client is gone
+                item = await submit_step(next, batch_results, None)
+                if item is None:
+                    break
+                next_index = item.index + 1
+                yield BatchClassificationItemOut(
+                    index=item.index,
+                    filename=filenames[item.index],
+                    results=[
+                        ClassificationResultOut(
+                            disease_name=r.disease_name,
+                            score=r.score,
+                            best_phrase=r.best_phrase
+                        )
+                        for r in item.results
+                    ],
+                    error=item.error
+                ).model_dump_json() + "\n"
+        except InferenceCancelledError:
+            logger.info(f"Client went away, stopped batch classification at image {next_index}")
+            return
+        except Exception as e:
+            logger.error(f"Error classifying batch at image {next_index}: {str(e)}", exc_info=True)
+            for i in range(next_index, len(filenames)):
+                yield BatchClassificationItemOut(
+                    index=i,
+                    filename=filenames[i],
+                    error=f"Error classifying image: {str(e)}"
+                ).model_dump_json() + "\n"
+        finally:
+            slot.release()
+        logger.info(f"Batch classification complete, streamed {len(filenames)} results")
+    
+    # Backstop for a stream that never starts; releasing twice is a no-op
+    background_tasks.add_task(slot.release)
+    if settings.classification_persist_uploads:
+        for data, filename in zip(images, filenames):
+            background_tasks.add_task(persist_upload, data, filename)
+    
+    return StreamingResponse(
+        ndjson_lines(),
+        media_type="application/x-ndjson",
+        background=background_tasks,
+    )
+
+
+@router.post("/jobs", response_model=ClassificationJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def submit_classification_job_endpoint(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    max_phrases: int = Query(12, ge=1),
+    top_k: int = Query(5, ge=1),
+    uow: IUnitOfWork = Depends(get_uow),
+    user=Depends(require_role("doctor")),
+):
+    """
+    Queue a series of medical images for classification and return at once.
+    
+    The images are stored with the job and classified by a worker process
+    (python -m scripts.classification_worker); poll GET /classification/jobs/{id}
+    for the status and, once it is 'done', the per-image results.
+    
+    Args:
+        files: The uploaded medical images
+        max_phrases: Maximum number of phrases to sample per disease
+        top_k: Number of top predictions to return per image
+        
+    Returns:
+        The queued job
+    """
+    for file in files:
+        if not file.content_type.startswith("image/"):
+            logger.warning(f"Rejected non-image file: {file.filename} ({file.content_type})")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File must be an image: {file.filename}"
+            )
+    
+    filenames = [file.filename for file in files]
+    images = [await file.read() for file in files]
+    
+    # Writes the uploads to the database: not on the event loop
+    job = await run_in_threadpool(
+        submit_classification_job,
+        SubmitClassificationJobCommand(
+            images=images,
+            filenames=filenames,
+            created_by=user.id,
+            max_phrases=max_phrases,
+            top_k=top_k,
+        ),
+        uow,
+    )
+    logger.info(f"Queued classification job {job.id} with {len(images)} images")
+    
+    if settings.classification_persist_uploads:
+        for data, filename in zip(images, filenames):
+            background_tasks.add_task(persist_upload, data, filename)
+    
+    return ClassificationJobOut.from_entity(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ClassificationJobOut)
+def get_classification_job_endpoint(
+    job_id: str,
+    uow: IUnitOfWork = Depends(get_uow),
+    user=Depends(require_role("doctor")),
+):
+    """
+    Status of a classification job submitted by the current user, with its
+    per-image results once it is done (or the error if it failed).
+    """
+    try:
+        job = get_classification_job(GetClassificationJobQuery(job_id=job_id, requested_by=user.id), uow=uow)
+    except ClassificationJobNotFoundError:
+        raise HTTPException(status_code=404, detail="Classification job not found")
+    return ClassificationJobOut.from_entity(job)
+
+
+@router.get("/metrics", response_model=ClassificationMetricsOut)
+def classification_metrics(
+    uow: IUnitOfWork = Depends(get_uow),
+    _=Depends(require_role("admin")),
+):
+    """
+    Runtime counters of the classification engine (e.g. embedding cache
+    hit/miss counts), used to size caches and batch settings.
+    """
+    return ClassificationMetricsOut(
+        **get_classification_metrics(GetClassificationMetricsQuery(), uow=uow),
+        inference_queue=inference_queue_stats(),
+        request_coalescing=classification_flights.stats(),
+    )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Response, status
+
+from domain.interfaces.unit_of_work import IUnitOfWork
+from presentation.di import get_uow
+from presentation.schemas.health import LivenessOut, ReadinessOut
+
+from application.usecases.queries.classification.get_model_status import (
+    GetModelStatusQuery,
+    get_model_status,
+)
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live", response_model=LivenessOut)
+def liveness():
+    """
+    The process is up and serving requests, whether or not the model has
+    finished loading. Never touches the database or the model.
+    """
+    return LivenessOut(status="ok")
+
+
+@router.get("/ready", response_model=ReadinessOut)
+def readiness(response: Response, uow: IUnitOfWork = Depends(get_uow)):
+    """
+    The classification model and phrase index are loaded: 200 when ready,
+    503 while loading (or after a failed attempt, see `error`).
+    """
+    model = get_model_status(GetModelStatusQuery(), uow=uow)
+    ready = model["state"] == "ready"
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessOut(ready=ready, **model)
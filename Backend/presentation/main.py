@@ -3,7 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from fastapi.security import HTTPBearer
 
-from presentation.api.v1 import users, patients, diseases, patient_diseases, classification
+from presentation.api.v1 import users, patients, diseases, patient_diseases, classification, health
+from presentation.model_loader import model_loader
 
 
 # ─────────────────────────────  Auth scheme in OpenAPI  ───────────────────
@@ -62,21 +63,17 @@ app.add_middleware(
 
 # ─────────────────────────────  Startup Events  ────────────────────────────
 @app.on_event("startup")
-def initialize_models():
-    """Initialize ML models on application startup"""
-    import logging
-    from presentation.di import get_uow
-    
-    logger = logging.getLogger("app.startup")
-    logger.info("Initializing ML models...")
-    
-    # Get unit of work to access repositories
-    uow = get_uow()
-    
-    # Initialize classification repository model
-    uow.classification.initialize_model()
-    
-    logger.info("ML models initialization complete")
+def start_model_loading():
+    """Load the ML model and phrase index in the background; the API serves meanwhile"""
+    model_loader.start()
+
+
+@app.on_event("shutdown")
+def shutdown_inference():
+    """Let running inferences finish and release the inference pool"""
+    from infrastructure.ai.inference_executor import shutdown_inference_executor
+
+    shutdown_inference_executor()
 
 # ─────────────────────────────  Routers  ──────────────────────────────────
 api_prefix = "/api/v1"
@@ -85,3 +82,5 @@ app.include_router(patients.router, prefix=api_prefix)
 app.include_router(diseases.router, prefix=api_prefix)
 app.include_router(patient_diseases.router, prefix=api_prefix)
 app.include_router(classification.router, prefix=api_prefix)
+# Probes stay unversioned: load balancers and orchestrators hard-code them
+app.include_router(health.router)
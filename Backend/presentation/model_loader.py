@@ -0,0 +1,78 @@
+"""
+Background loading of the classification model.
+
+The tokenizer, towers, weights and phrase index take a while to load; doing
+it in the startup hook would keep the CRUD endpoints down for the whole
+warm-up. The load runs on a daemon thread instead, retried until it
+succeeds; classification endpoints answer 503 until the model is ready.
+"""
+import logging
+import threading
+import time
+
+from core.settings import settings
+
+logger = logging.getLogger("app.startup")
+
+
+def initialize_models() -> None:
+    """Load the ML model and the phrase index (blocking)"""
+    from infrastructure.db.session import SessionLocal
+    from presentation.di import get_uow
+    from application.usecases.commands.classification.rebuild_phrase_index import (
+        RebuildPhraseIndexCommand,
+        rebuild_phrase_index,
+    )
+    from application.usecases.commands.classification.refresh_phrase_index import refresh_phrase_index
+    
+    logger.info("Initializing ML models...")
+    
+    db = SessionLocal()
+    try:
+        # Get unit of work to access repositories
+        uow = get_uow(db)
+        
+        # Initialize classification repository model
+        uow.classification.initialize_model()
+        
+        # Encode diseases that predate the phrase index, then load it once
+        rebuild_phrase_index(RebuildPhraseIndexCommand(), uow)
+        refresh_phrase_index(uow)
+    finally:
+        db.close()
+    
+    logger.info("ML models initialization complete")
+
+
+class ModelLoader:
+    """Runs initialize_models once on a background thread, retrying on failure"""
+
+    def __init__(self):
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start loading; no-op if a load is already running or done"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="model-loader", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            try:
+                initialize_models()
+            except Exception as e:
+                logger.error(
+                    f"Model loading failed, retrying in {settings.model_load_retry_seconds:.0f} s: {e}",
+                    exc_info=True,
+                )
+                time.sleep(settings.model_load_retry_seconds)
+                continue
+            logger.info(f"Model ready after {time.perf_counter() - started:.1f} s")
+            return
+
+
+model_loader = ModelLoader()
@@ -1,12 +1,108 @@
-from pydantic import BaseModel
-from typing import List
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 
 
 class ClassificationResultOut(BaseModel):
     disease_name: str
-    score: float
+    score: float = Field(description=(
+        "Mean similarity of the disease's phrases to the image, min-max normalised over the "
+        "phrases of every requested disease. Above phrase_ann_min_phrases indexed phrases the "
+        "minimum and maximum are estimated from the ANN index, so a score can differ slightly "
+        "from the exact one when the least or most similar phrase is missed."
+    ))
     best_phrase: str
 
 
 class ClassificationResponseOut(BaseModel):
-    results: List[ClassificationResultOut] 
\ No newline at end of file
+    results: List[ClassificationResultOut] 
+
+
+class BatchClassificationItemOut(BaseModel):
+    """One NDJSON line of /classification/classify-batch"""
+    index: int
+    filename: str
+    results: List[ClassificationResultOut] = []
+    error: Optional[str] = None
+
+
+class ClassificationJobOut(BaseModel):
+    """An asynchronous classification job; results once status is 'done'"""
+    id: str
+    status: str              # queued | running | done | failed
+    image_count: int
+    max_phrases: int
+    top_k: int
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    attempts: int = 0
+    error: Optional[str] = None
+    results: Optional[List[BatchClassificationItemOut]] = None
+
+    @classmethod
+    def from_entity(cls, job) -> "ClassificationJobOut":
+        return cls(
+            id=job.id,
+            status=job.status,
+            image_count=job.image_count,
+            max_phrases=job.max_phrases,
+            top_k=job.top_k,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+            attempts=job.attempts,
+            error=job.error,
+            results=[BatchClassificationItemOut(**item) for item in job.results] if job.results is not None else None,
+        )
+
+
+class CacheStatsOut(BaseModel):
+    hits: int
+    disk_hits: int = 0
+    misses: int
+    hit_rate: float
+    entries: int
+    bytes: int
+    max_bytes: int
+
+
+class InferenceQueueStatsOut(BaseModel):
+    depth: int          # configured limit, 0 = unbounded
+    in_flight: int      # running or waiting right now
+    admitted: int
+    rejected: int       # queue full
+    expired: int        # dropped after waiting past the deadline
+    cancelled: int      # client disconnected while waiting
+    wait_p50_ms: Optional[float] = None   # admission -> inference thread
+    wait_p99_ms: Optional[float] = None
+
+
+class LaneStatsOut(BaseModel):
+    queued: int          # images waiting for a vision batch
+    processed: int
+    wait_p50_ms: Optional[float] = None     # submit -> batch start
+    wait_p99_ms: Optional[float] = None
+    latency_p50_ms: Optional[float] = None  # submit -> embedding ready
+    latency_p99_ms: Optional[float] = None
+
+
+class VisionLanesOut(BaseModel):
+    lanes: Dict[str, LaneStatsOut]
+    background_batch_limit: int       # batch-lane images allowed per vision batch
+    latency_budget_ms: Optional[float] = None
+
+
+class CoalescingStatsOut(BaseModel):
+    in_flight: int
+    executed: int        # computations actually run
+    coalesced: int       # requests that joined an identical in-flight one
+    coalesced_rate: float
+
+
+class ClassificationMetricsOut(BaseModel):
+    image_embedding_cache: Optional[CacheStatsOut] = None
+    text_embedding_cache: Optional[CacheStatsOut] = None
+    vision_lanes: Optional[VisionLanesOut] = None
+    inference_queue: Optional[Dict[str, InferenceQueueStatsOut]] = None
+    request_coalescing: Optional[CoalescingStatsOut] = None
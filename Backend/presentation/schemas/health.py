@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class LivenessOut(BaseModel):
+    status: str
+
+
+class ReadinessOut(BaseModel):
+    """Load state of the classification model (see ModelLoader)"""
+    ready: bool
+    state: str          # not_loaded | loading | loading_index | ready | failed
+    backend: str
+    model_version: Optional[str] = None
+    phrases: Optional[int] = None
+    error: Optional[str] = None
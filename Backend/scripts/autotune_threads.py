@@ -0,0 +1,119 @@
+"""
+Find the best worker count / intra-op thread split for this machine.
+
+    python -m scripts.autotune_threads
+    python -m scripts.autotune_threads --workers 1 2 4 --threads 1 2 4 --duration 20
+    python -m scripts.autotune_threads --random-weights --pin
+
+Loads the vision tower once, then for every (workers, threads) pair forks
+that many processes (as gunicorn.conf.py does), applies the thread budget
+in each and has them all encode image batches for --duration seconds at
+the same time. Reports aggregate images/s and per-batch latency, and the
+settings of the best configuration. Pairs using more threads than cores
+are skipped unless --oversubscribe.
+"""
+import argparse
+import multiprocessing as mp
+import statistics
+import time
+
+import torch
+
+from core.settings import settings
+from infrastructure.ai.inference_backends import VisionTower
+from infrastructure.ai.thread_budget import ThreadBudget, apply_thread_budget, available_cpus, plan_thread_budget
+
+
+def powers_of_two(limit: int):
+    n = 1
+    while n <= limit:
+        yield n
+        n *= 2
+
+
+def run_worker(tower, budget, batch_size, duration, start, results):
+    apply_thread_budget(budget)
+    pixels = torch.randn(batch_size, 3, 224, 224)
+    with torch.no_grad():
+        tower(pixels)   # warm-up, outside the measured window
+        start.wait()
+        latencies = []
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            t = time.perf_counter()
+            tower(pixels)
+            latencies.append(time.perf_counter() - t)
+    results.put(latencies)
+
+
+def measure(tower, workers, threads, batch_size, duration, pin):
+    """Aggregate images/s and median / p95 batch latency (ms) of one configuration"""
+    ctx = mp.get_context("fork")
+    start = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = []
+    for slot in range(workers):
+        budget = plan_thread_budget(workers, slot, intra_op=threads, inter_op=1, pin=pin)
+        proc = ctx.Process(target=run_worker, args=(tower, budget, batch_size, duration, start, results))
+        proc.start()
+        procs.append(proc)
+
+    latencies = [lat for _ in procs for lat in results.get()]
+    for proc in procs:
+        proc.join()
+
+    latencies.sort()
+    throughput = len(latencies) * batch_size / duration
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return throughput, statistics.median(latencies) * 1000, p95 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="default: powers of two up to the cores")
+    parser.add_argument("--threads", type=int, nargs="+", default=None, help="default: powers of two up to the cores")
+    parser.add_argument("--batch-size", type=int, default=settings.classification_max_batch_size)
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per configuration")
+    parser.add_argument("--pin", action="store_true", help="pin every worker to its own cores")
+    parser.add_argument("--oversubscribe", action="store_true", help="also run workers x threads > cores")
+    parser.add_argument("--random-weights", action="store_true", help="no checkpoint needed; same cost per image")
+    args = parser.parse_args()
+
+    cores = len(available_cpus())
+    worker_counts = args.workers or list(powers_of_two(cores))
+    thread_counts = args.threads or list(powers_of_two(cores))
+
+    # Single-threaded parent: libgomp's thread pool does not survive fork
+    apply_thread_budget(ThreadBudget(intra_op=1, inter_op=1))
+    if args.random_weights:
+        from infrastructure.ai.clipCustopm import MedCLIPVision
+        model = MedCLIPVision(proj_dim=256, pretrained=False).eval()
+    else:
+        from infrastructure.ai.medclip_classifier import load_medclip_model
+        model = load_medclip_model(torch.device("cpu"), precision=settings.inference_precision, vision_only=True)
+    tower = VisionTower(model).eval()
+
+    print(f" {cores} cores, batch size {args.batch_size}, {args.duration:.0f} s per configuration")
+    print(f" {'workers':>8}{'threads':>9}{'images/s':>11}{'p50 ms':>10}{'p95 ms':>10}")
+    rows = []
+    for workers in worker_counts:
+        for threads in thread_counts:
+            if workers * threads > cores and not args.oversubscribe:
+                continue
+            throughput, p50, p95 = measure(tower, workers, threads, args.batch_size, args.duration, args.pin)
+            rows.append((throughput, workers, threads, p50))
+            print(f" {workers:>8}{threads:>9}{throughput:>11.1f}{p50:>10.1f}{p95:>10.1f}")
+
+    if not rows:
+        raise SystemExit("No configuration fits the cores; pass --oversubscribe or smaller counts")
+    throughput, workers, threads, p50 = max(rows)
+    print()
+    print(f" Best: {workers} workers x {threads} threads, {throughput:.1f} images/s (p50 {p50:.1f} ms)")
+    print(f"   WEB_CONCURRENCY={workers}")
+    print(f"   INFERENCE_INTRA_OP_THREADS={threads}")
+    if args.pin:
+        print("   INFERENCE_CPU_AFFINITY=true")
+
+
+if __name__ == "__main__":
+    main()
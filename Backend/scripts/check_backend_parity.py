@@ -0,0 +1,67 @@
+"""
+Check that the torchscript / onnx backends reproduce the eager embeddings.
+
+    python -m scripts.check_backend_parity
+    python -m scripts.check_backend_parity --backends onnx --atol 1e-3
+
+Encodes the same random images and sample phrases with every backend and
+compares against eager PyTorch in fp32, whatever inference_precision is
+(an int8 backend is measured against the full-precision model). Exits
+non-zero when any embedding differs by more than --atol (max absolute
+difference) so it can gate a deployment.
+Run scripts.export_model first for the onnx backend.
+"""
+import argparse
+import sys
+
+import torch
+
+from infrastructure.ai.inference_backends import create_backend, example_inputs
+from infrastructure.ai.medclip_classifier import load_tokenizer
+
+SAMPLE_PHRASES = [
+    "An MRI image showing a hyperintense lesion in the left temporal lobe.",
+    "Coronal views confirm cortical thickening with blurring of the grey-white junction.",
+    "Axial T1-weighted sequences reveal a well-circumscribed cystic mass.",
+    "No abnormal enhancement.",
+]
+
+
+def compare(name: str, reference: torch.Tensor, candidate: torch.Tensor, atol: float) -> bool:
+    max_abs = (reference - candidate).abs().max().item()
+    min_cos = torch.nn.functional.cosine_similarity(reference, candidate, dim=-1).min().item()
+    ok = max_abs <= atol
+    print(f"  {name:<8} max|diff|={max_abs:.2e}  min cos={min_cos:.6f}  {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=["torchscript", "onnx"], default=["torchscript", "onnx"])
+    parser.add_argument("--batch", type=int, default=4)
+    parser.add_argument("--atol", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    device = torch.device("cpu")
+    torch.manual_seed(0)
+    pixel_values, _, _ = example_inputs(device, batch=args.batch)
+    tok = load_tokenizer()(
+        SAMPLE_PHRASES, padding=True, truncation=True, max_length=128, return_tensors="pt"
+    )
+
+    eager = create_backend("eager", device, precision="fp32")
+    ref_img = eager.encode_images(pixel_values)
+    ref_txt = eager.encode_text(tok.input_ids, tok.attention_mask)
+
+    ok = True
+    for name in args.backends:
+        backend = create_backend(name, device)
+        print(f"{name}:")
+        ok &= compare("image", ref_img, backend.encode_images(pixel_values), args.atol)
+        ok &= compare("text", ref_txt, backend.encode_text(tok.input_ids, tok.attention_mask), args.atol)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
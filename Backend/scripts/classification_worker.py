@@ -0,0 +1,97 @@
+"""
+Classification job worker: processes the jobs queued by POST /classification/jobs.
+
+    python -m scripts.classification_worker          # run until SIGINT / SIGTERM
+    python -m scripts.classification_worker --once   # drain the queue, then exit
+
+The queue is the classification_jobs table, so no broker is needed: start
+as many workers as the hardware allows, on any host that reaches the
+database; each job is claimed by exactly one of them. A job whose worker
+dies is requeued after classification_job_timeout_s. SIGTERM lets the
+current job finish. Jobs run in the batch inference lane. While idle, a
+worker with a text tower encodes diseases that have no phrase embeddings
+of its model yet.
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+
+from core.settings import settings
+from infrastructure.ai.lanes import BATCH, inference_lane
+from infrastructure.db.session import SessionLocal
+from infrastructure.db.unit_of_work.sqlalchemy_uow import SqlAlchemyUnitOfWork
+from application.usecases.commands.classification.process_classification_job import (
+    ProcessNextClassificationJobCommand,
+    RequeueStaleClassificationJobsCommand,
+    process_next_classification_job,
+    requeue_stale_classification_jobs,
+)
+from application.usecases.commands.classification.rebuild_phrase_index import (
+    RebuildPhraseIndexCommand,
+    rebuild_phrase_index,
+)
+from application.usecases.commands.classification.refresh_phrase_index import refresh_phrase_index
+
+logger = logging.getLogger("ClassificationWorker")
+
+
+def load_model() -> None:
+    db = SessionLocal()
+    try:
+        uow = SqlAlchemyUnitOfWork(db)
+        uow.classification.initialize_model()
+        rebuild_phrase_index(RebuildPhraseIndexCommand(), uow)
+        refresh_phrase_index(uow)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    args = parser.parse_args()
+
+    stopping = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stopping.set())
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    load_model()
+    logger.info(f"Worker {worker_id} ready")
+
+    processed = 0
+    while not stopping.is_set():
+        db = SessionLocal()
+        try:
+            uow = SqlAlchemyUnitOfWork(db)
+            requeue_stale_classification_jobs(
+                RequeueStaleClassificationJobsCommand(
+                    timeout_s=settings.classification_job_timeout_s,
+                    max_attempts=settings.classification_job_max_attempts,
+                ),
+                uow,
+            )
+            with inference_lane(BATCH):
+                job = process_next_classification_job(ProcessNextClassificationJobCommand(worker_id=worker_id), uow)
+            if job is None and uow.classification.can_encode_text:
+                # Idle: encode diseases added or edited while the API could not
+                rebuild_phrase_index(RebuildPhraseIndexCommand(), uow)
+        finally:
+            db.close()
+
+        if job is not None:
+            processed += 1
+            logger.info(f"Job {job.id} {job.status}")
+            continue
+        if args.once:
+            break
+        stopping.wait(settings.classification_job_poll_seconds)
+
+    print(f" Worker {worker_id} processed {processed} jobs.")
+
+
+if __name__ == "__main__":
+    main()
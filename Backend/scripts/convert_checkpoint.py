@@ -0,0 +1,36 @@
+"""
+Convert the MedCLIP checkpoint to safetensors for memory-mapped loading.
+
+    python -m scripts.convert_checkpoint
+    python -m scripts.convert_checkpoint --src path/to/best_model.pth --out path/to/best_model.safetensors
+
+The output lands next to best_model.pth by default, where get_model_path
+picks it up instead of the .pth. Its pages are mapped straight into the
+model parameters and shared by every worker process on the host.
+"""
+import argparse
+from pathlib import Path
+
+import torch
+from safetensors.torch import save_file
+
+from core.settings import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--src", type=Path, default=settings.medclip_model_path)
+    parser.add_argument("--out", type=Path, default=None, help="defaults to --src with a .safetensors suffix")
+    args = parser.parse_args()
+    out = args.out or args.src.with_suffix(".safetensors")
+
+    state_dict = torch.load(args.src, map_location="cpu", weights_only=True)
+    # safetensors stores plain, non-aliased, contiguous tensors
+    save_file({k: v.contiguous().clone() for k, v in state_dict.items()}, str(out),
+              metadata={"source": args.src.name})
+
+    print(f" {len(state_dict)} tensors: {args.src} -> {out} ({out.stat().st_size / 2**20:.0f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Export the MedCLIP towers for the torchscript / onnx inference backends.
+
+    python -m scripts.export_model                       # both formats
+    python -m scripts.export_model --formats onnx --out /srv/medclip/exported
+
+Writes vision/text graphs with dynamic batch (and sequence) axes plus the
+medclip.json metadata (checkpoint fingerprint, similarity scale, embedding
+size) into settings.inference_artifacts_dir, or --out.
+"""
+import argparse
+from pathlib import Path
+
+import torch
+
+from core.settings import settings
+from infrastructure.ai.inference_backends import (
+    TEXT_ONNX,
+    TEXT_TS,
+    VISION_ONNX,
+    VISION_TS,
+    TextTower,
+    TorchScriptBackend,
+    VisionTower,
+    example_inputs,
+    model_metadata,
+    write_metadata,
+)
+from infrastructure.ai.medclip_classifier import checkpoint_fingerprint, get_model_path, load_medclip_model
+
+
+def export_onnx(model, out_dir: Path, opset: int) -> None:
+    pixel_values, input_ids, attention_mask = example_inputs(torch.device("cpu"))
+    with torch.no_grad():
+        torch.onnx.export(
+            VisionTower(model).eval(), (pixel_values,), str(out_dir / VISION_ONNX),
+            input_names=["pixel_values"], output_names=["image_embeds"],
+            dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+            opset_version=opset,
+        )
+        torch.onnx.export(
+            TextTower(model).eval(), (input_ids, attention_mask), str(out_dir / TEXT_ONNX),
+            input_names=["input_ids", "attention_mask"], output_names=["text_embeds"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "text_embeds": {0: "batch"},
+            },
+            opset_version=opset,
+        )
+    print(f" ONNX graphs written: {VISION_ONNX}, {TEXT_ONNX}")
+
+
+def export_torchscript(model, model_version: str, out_dir: Path) -> None:
+    backend = TorchScriptBackend.trace(model, model_version, torch.device("cpu"))
+    torch.jit.save(backend.vision, str(out_dir / VISION_TS))
+    torch.jit.save(backend.text, str(out_dir / TEXT_TS))
+    print(f" TorchScript towers written: {VISION_TS}, {TEXT_TS}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--formats", nargs="+", choices=["onnx", "torchscript"], default=["onnx", "torchscript"])
+    parser.add_argument("--out", type=Path, default=settings.inference_artifacts_dir)
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    model_path = Path(get_model_path())
+    model_version = checkpoint_fingerprint(model_path)
+    print(f" Exporting {model_path.name} ({model_version}) to {args.out}")
+
+    # Export on CPU: the graphs are device-independent
+    model = load_medclip_model(torch.device("cpu"), model_path)
+    args.out.mkdir(parents=True, exist_ok=True)
+
+    if "onnx" in args.formats:
+        export_onnx(model, args.out, args.opset)
+    if "torchscript" in args.formats:
+        export_torchscript(model, model_version, args.out)
+
+    write_metadata(args.out, model_metadata(model, model_version))
+    print(" Export complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Model server: loads MedCLIP once and serves classification over a Unix socket.
+
+    python -m scripts.model_server                         # at settings.model_server_socket
+    python -m scripts.model_server --socket /run/medclip.sock
+
+API and job workers started with MODEL_SERVER_SOCKET=<path> then load no
+model: they decode uploads, hand the pixels over through shared memory and
+get results back (RemoteClassificationRepository), so web workers scale
+with requests and model replicas with inference capacity. The server needs
+the database too, for the phrase index. SIGINT / SIGTERM stop accepting
+connections.
+"""
+import argparse
+import signal
+from pathlib import Path
+
+from core.settings import settings
+from infrastructure.ai.model_server import ModelServer
+from infrastructure.db.session import SessionLocal
+from infrastructure.db.unit_of_work.sqlalchemy_uow import SqlAlchemyUnitOfWork
+from application.usecases.commands.classification.refresh_phrase_index import refresh_phrase_index
+from presentation.model_loader import initialize_models
+
+
+def refresh_index() -> None:
+    db = SessionLocal()
+    try:
+        refresh_phrase_index(SqlAlchemyUnitOfWork(db))
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", type=Path, default=settings.model_server_socket,
+                        help="Unix socket path (default: settings.model_server_socket)")
+    args = parser.parse_args()
+    if args.socket is None:
+        parser.error("no socket: pass --socket or set MODEL_SERVER_SOCKET")
+
+    # This process is the model server: its unit of work must load the model itself
+    settings.model_server_socket = None
+    initialize_models()
+
+    from infrastructure.db.repositories.classification_repository import ClassificationRepository
+
+    server = ModelServer(ClassificationRepository(), args.socket, settings.secret_key.encode(), refresh_index)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: server.close())
+    server.serve_forever()
+    print(f" Model server on {args.socket} stopped.")
+
+
+if __name__ == "__main__":
+    main()
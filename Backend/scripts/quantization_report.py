@@ -0,0 +1,143 @@
+"""
+Accuracy drift of int8 dynamic quantization against the fp32 model.
+
+    python -m scripts.quantization_report
+    python -m scripts.quantization_report --images /data/scans --descriptions catalog.json
+
+Classifies every image of a local folder (default: resources/uploads) with
+both models against a disease catalog (default: the training
+description.json, {disease: [phrases]}) and reports embedding similarity,
+top-1 / top-k agreement, score drift, weight size and vision latency, so
+each deployment can decide whether int8 is acceptable.
+
+An int8 deployment encodes its phrase index with the quantized text tower
+too (int8 has its own model version), so "int8 images / int8 phrases" is
+what is served; "int8 images / fp32 phrases" pairs the quantized vision
+tower with the fp32 model's phrase embeddings, to tell the two towers'
+drift apart. Phrases are tokenized like the served model does
+(settings.text_tokenizer_dir, or the hub without a local copy).
+"""
+import argparse
+import io
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+from PIL import Image
+from torchvision import transforms
+
+from core.settings import BASE_DIR, settings
+from infrastructure.ai.inference_backends import TextTower, VisionTower
+from infrastructure.ai.medclip_classifier import load_medclip_model, load_tokenizer
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff"}
+
+img_transform = transforms.Compose([
+    transforms.Resize((224, 224)),
+    transforms.ToTensor(),
+    transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225]),
+])
+
+
+def disease_scores(img_emb: torch.Tensor, txt_emb: torch.Tensor, owners: np.ndarray, n_diseases: int) -> np.ndarray:
+    """Per-image, per-disease mean of min-max normalised phrase similarities (as served)"""
+    sims = img_emb @ txt_emb.T
+    lo, hi = sims.min(dim=1, keepdim=True).values, sims.max(dim=1, keepdim=True).values
+    sims = ((sims - lo) / (hi - lo + 1e-8)).numpy()
+    scores = np.zeros((sims.shape[0], n_diseases))
+    counts = np.bincount(owners, minlength=n_diseases)
+    for i, row in enumerate(sims):
+        scores[i] = np.bincount(owners, weights=row, minlength=n_diseases) / np.maximum(counts, 1)
+    return scores
+
+
+def weights_mib(model: torch.nn.Module) -> float:
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 2**20
+
+
+def encode(model, pixel_values, tok, batch_size: int):
+    vision, text = VisionTower(model).eval(), TextTower(model).eval()
+    with torch.no_grad():
+        img = torch.cat([vision(pixel_values[i:i + batch_size]) for i in range(0, len(pixel_values), batch_size)])
+        txt = torch.cat([
+            text(tok.input_ids[i:i + batch_size], tok.attention_mask[i:i + batch_size])
+            for i in range(0, len(tok.input_ids), batch_size)
+        ])
+        start = time.perf_counter()
+        for i in range(min(8, len(pixel_values))):
+            vision(pixel_values[i:i + 1])
+        latency = (time.perf_counter() - start) / min(8, len(pixel_values))
+    return img, txt, latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=Path, default=BASE_DIR / "resources" / "uploads")
+    parser.add_argument("--descriptions", type=Path, default=BASE_DIR.parent / "training code" / "description.json")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=None, help="max images to evaluate")
+    args = parser.parse_args()
+
+    paths = sorted(p for p in args.images.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)[:args.limit]
+    if not paths:
+        raise SystemExit(f"No images found in {args.images}")
+    pixel_values = torch.stack([img_transform(Image.open(p).convert("RGB")) for p in paths])
+
+    with open(args.descriptions, encoding="utf-8") as f:
+        catalog = json.load(f)
+    names = list(catalog)
+    phrases, owners = [], []
+    for i, name in enumerate(names):
+        for phrase in catalog[name]:
+            if phrase.strip():
+                phrases.append(phrase.strip())
+                owners.append(i)
+    owners = np.array(owners)
+    tok = load_tokenizer()(
+        phrases, padding=True, truncation=True, max_length=128, return_tensors="pt"
+    )
+
+    cpu = torch.device("cpu")
+    torch.set_grad_enabled(False)
+    fp32 = load_medclip_model(cpu, precision="fp32")
+    fp32_img, fp32_txt, fp32_latency = encode(fp32, pixel_values, tok, args.batch_size)
+    fp32_mib = weights_mib(fp32)
+    del fp32
+
+    settings.quantized_model_path = None  # measure quantization of this very checkpoint
+    int8 = load_medclip_model(cpu, precision="int8")
+    int8_img, int8_txt, int8_latency = encode(int8, pixel_values, tok, args.batch_size)
+    int8_mib = weights_mib(int8)
+
+    ref = disease_scores(fp32_img, fp32_txt, owners, len(names))
+    # As served: an int8 deployment builds its phrase index with the int8 text tower
+    full = disease_scores(int8_img, int8_txt, owners, len(names))
+    # The vision tower's share of the drift
+    mixed = disease_scores(int8_img, fp32_txt, owners, len(names))
+
+    img_cos = torch.nn.functional.cosine_similarity(fp32_img, int8_img, dim=-1)
+    txt_cos = torch.nn.functional.cosine_similarity(fp32_txt, int8_txt, dim=-1)
+    k = args.top_k
+    ref_top = np.argsort(-ref, axis=1)[:, :k]
+
+    print(f" {len(paths)} images, {len(names)} diseases, {len(phrases)} phrases")
+    print(f" image embedding cosine   mean={img_cos.mean():.4f}  min={img_cos.min():.4f}")
+    print(f" phrase embedding cosine  mean={txt_cos.mean():.4f}  min={txt_cos.min():.4f}")
+    for label, scores in (("int8 images / int8 phrases (served)", full), ("int8 images / fp32 phrases", mixed)):
+        top = np.argsort(-scores, axis=1)[:, :k]
+        top1 = np.mean(top[:, 0] == ref_top[:, 0])
+        overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(top, ref_top)])
+        drift = np.abs(scores - ref).max(axis=1)
+        print(f" {label}: top-1 agreement={top1:.1%}  top-{k} overlap={overlap:.1%}  "
+              f"max score drift mean={drift.mean():.4f} max={drift.max():.4f}")
+    print(f" weights      fp32={fp32_mib:.0f} MiB  int8={int8_mib:.0f} MiB")
+    print(f" vision batch-1 latency  fp32={fp32_latency * 1000:.0f} ms  int8={int8_latency * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Write a pre-quantized (dynamic int8) copy of the MedCLIP checkpoint.
+
+    python -m scripts.quantize_model
+    python -m scripts.quantize_model --out infrastructure/ai/weights/best_model.int8.pth
+
+Point settings.quantized_model_path at the output and set
+inference_precision=int8 to serve it without quantizing at every startup.
+"""
+import argparse
+import io
+from pathlib import Path
+
+import torch
+
+from core.settings import settings
+from infrastructure.ai.medclip_classifier import load_medclip_model
+
+
+def state_dict_bytes(model: torch.nn.Module) -> int:
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path,
+                        default=settings.medclip_model_path.with_name("best_model.int8.pth"))
+    args = parser.parse_args()
+
+    cpu = torch.device("cpu")
+    fp32 = load_medclip_model(cpu, precision="fp32")
+    fp32_bytes = state_dict_bytes(fp32)
+    del fp32
+
+    # Build from the fp32 checkpoint even if a quantized one is configured
+    settings.quantized_model_path = None
+    int8 = load_medclip_model(cpu, precision="int8")
+    torch.save(int8.state_dict(), args.out)
+
+    print(f" fp32 weights: {fp32_bytes / 2**20:.0f} MiB")
+    print(f" int8 weights: {args.out.stat().st_size / 2**20:.0f} MiB -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
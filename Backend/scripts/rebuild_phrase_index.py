@@ -0,0 +1,38 @@
+"""
+Rebuild the persisted phrase-embedding index.
+
+    python -m scripts.rebuild_phrase_index           # diseases without embeddings of the loaded model
+    python -m scripts.rebuild_phrase_index --force   # re-encode everything
+
+Always loads the text tower, so it is also how diseases added or edited
+through vision-only API workers (classification_vision_only) get encoded.
+"""
+import argparse
+
+from core.settings import settings
+from infrastructure.db.session import SessionLocal
+from infrastructure.db.unit_of_work.sqlalchemy_uow import SqlAlchemyUnitOfWork
+from application.usecases.commands.classification.rebuild_phrase_index import (
+    RebuildPhraseIndexCommand,
+    rebuild_phrase_index,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="re-encode every disease")
+    args = parser.parse_args()
+
+    # This is where phrases get encoded, even when API workers serve vision-only
+    settings.classification_vision_only = False
+
+    db = SessionLocal()
+    try:
+        count = rebuild_phrase_index(RebuildPhraseIndexCommand(force=args.force), SqlAlchemyUnitOfWork(db))
+    finally:
+        db.close()
+    print(f" Phrase index rebuilt for {count} diseases.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Save a local copy of the Bio_ClinicalBERT tokenizer, so API workers start
+without contacting the Hugging Face hub.
+
+    python -m scripts.save_tokenizer
+    python -m scripts.save_tokenizer --out infrastructure/ai/weights/tokenizer
+
+The model itself never needs the hub: both towers are built from config
+and filled from best_model.pth.
+"""
+import argparse
+from pathlib import Path
+
+from transformers import AutoTokenizer
+
+from core.settings import settings
+from infrastructure.ai.clipCustopm import BIO_CLINICALBERT
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, default=settings.text_tokenizer_dir)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(BIO_CLINICALBERT)
+    tokenizer.save_pretrained(str(args.out))
+    print(f" Tokenizer saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Per-process memory of a pre-forked gunicorn deployment (Linux only).
+
+    gunicorn -c gunicorn.conf.py presentation.main:app &
+    python -m scripts.worker_memory --pid <gunicorn master pid>
+
+Reads /proc/<pid>/smaps_rollup of the master and each of its workers and
+reports RSS, PSS (shared pages split between the processes mapping them)
+and USS (pages private to the process). With the model in shared memory
+a worker's USS is its real cost: what one more worker would add.
+"""
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+PROC = Path("/proc")
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def children(pid: int) -> List[int]:
+    """Direct children of pid"""
+    result = []
+    for stat in PROC.glob("[0-9]*/stat"):
+        try:
+            # comm (field 2) may contain spaces: the ppid follows the closing ')'
+            ppid = int(stat.read_text().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            result.append(int(stat.parent.name))
+    return sorted(result)
+
+
+def memory(pid: int) -> Dict[str, int]:
+    """smaps_rollup totals of pid, in kB"""
+    values = dict.fromkeys(FIELDS, 0)
+    for line in (PROC / str(pid) / "smaps_rollup").read_text().splitlines():
+        key, _, rest = line.partition(":")
+        if key in values:
+            values[key] = int(rest.split()[0])
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pid", type=int, required=True, help="gunicorn master pid")
+    args = parser.parse_args()
+
+    workers = children(args.pid)
+    if not workers:
+        raise SystemExit(f"Process {args.pid} has no children: is it the gunicorn master?")
+
+    print(f" {'process':<16}{'RSS MiB':>10}{'PSS MiB':>10}{'USS MiB':>10}{'shared MiB':>12}")
+    totals = {"rss": 0, "pss": 0, "uss": 0}
+    worker_uss = []
+    for role, pid in [("master", args.pid)] + [("worker", w) for w in workers]:
+        m = memory(pid)
+        uss = m["Private_Clean"] + m["Private_Dirty"]
+        shared = m["Shared_Clean"] + m["Shared_Dirty"]
+        totals["rss"] += m["Rss"]
+        totals["pss"] += m["Pss"]
+        totals["uss"] += uss
+        if role == "worker":
+            worker_uss.append(uss)
+        print(f" {f'{role} {pid}':<16}{m['Rss'] / 1024:>10.1f}{m['Pss'] / 1024:>10.1f}{uss / 1024:>10.1f}{shared / 1024:>12.1f}")
+
+    print(f" {'total':<16}{totals['rss'] / 1024:>10.1f}{totals['pss'] / 1024:>10.1f}{totals['uss'] / 1024:>10.1f}")
+    print()
+    print(f" Actual footprint (sum of PSS): {totals['pss'] / 1024:.1f} MiB for {len(workers)} workers")
+    print(f" Per-worker overhead (mean USS): {sum(worker_uss) / len(worker_uss) / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
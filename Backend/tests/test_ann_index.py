@@ -0,0 +1,138 @@
+import types
+
+import numpy as np
+import pytest
+import torch
+import torch.nn.functional as F
+
+from core.settings import settings
+from infrastructure.ai.ann_index import IVFIndex
+from infrastructure.ai.scoring import select_phrase_rows
+from infrastructure.db.repositories.classification_repository import ClassificationRepository, PhraseIndex
+
+DIM = 32
+
+
+def synthetic_catalog(diseases: int, per_disease: int, topics: int = 8, spread: float = 1.0, seed: int = 0):
+    """Phrases scattered around their disease centre, diseases around one of a few topics"""
+    g = torch.Generator().manual_seed(seed)
+
+    def noisy(x):
+        return F.normalize(x + spread * torch.randn(x.shape, generator=g) / DIM ** 0.5, dim=-1)
+
+    topic_centres = F.normalize(torch.randn(topics, DIM, generator=g), dim=-1)
+    centres = noisy(topic_centres[torch.randint(0, topics, (diseases,), generator=g)])
+    owner = torch.arange(diseases).repeat_interleave(per_disease)
+    return centres, noisy(centres[owner]), owner, noisy
+
+
+@pytest.fixture
+def repository():
+    """A ClassificationRepository with a fake backend: scoring only, no model"""
+    repo = object.__new__(ClassificationRepository)
+    repo.backend = types.SimpleNamespace(similarity_scale=20.0)
+    repo.device = torch.device("cpu")
+    return repo
+
+
+def phrase_index(embeddings, owner, diseases) -> PhraseIndex:
+    return PhraseIndex(
+        embeddings=embeddings,
+        phrases=[f"phrase {i}" for i in range(len(owner))],
+        owner=owner,
+        counts=torch.bincount(owner, minlength=diseases),
+        disease_ids=np.arange(1, diseases + 1),
+        version="test",
+        ann=IVFIndex.build(embeddings, owner, generator=torch.Generator().manual_seed(0)),
+    )
+
+
+@pytest.mark.parametrize("n_probe, tolerance", [(10_000, 1e-5), (8, 0.05)])
+def test_ann_scores_agree_with_exact_scores(repository, monkeypatch, n_probe, tolerance):
+    diseases = 300
+    centres, embeddings, owner, noisy = synthetic_catalog(diseases, per_disease=6)
+    index = phrase_index(embeddings, owner, diseases)
+    names = {int(i): f"disease {i}" for i in index.disease_ids}
+    allowed = torch.ones(diseases, dtype=torch.bool)
+    rows = select_phrase_rows(index.owner, index.counts, allowed, max_phrases=4,
+                              generator=torch.Generator().manual_seed(0))
+    monkeypatch.setattr(settings, "phrase_ann_probe", n_probe)
+    monkeypatch.setattr(settings, "phrase_ann_candidate_diseases", 16)
+
+    queries = noisy(centres[torch.arange(0, diseases, 15)])
+    exact = repository._score(index, queries, rows, names, top_k=5)
+    compared = 0
+    for query, exact_results in zip(queries, exact):
+        truth = {r["disease_name"]: r["score"] for r in exact_results}
+        for result in repository._score_candidates(index, query, allowed, rows, names, top_k=5):
+            if result["disease_name"] in truth:
+                compared += 1
+                assert result["score"] == pytest.approx(truth[result["disease_name"]], abs=tolerance)
+    assert compared >= 0.9 * 5 * len(queries)
+
+
+def test_candidates_recall_the_exact_top_diseases():
+    diseases = 500
+    centres, embeddings, owner, noisy = synthetic_catalog(diseases, per_disease=8)
+    index = IVFIndex.build(embeddings, owner, generator=torch.Generator().manual_seed(0))
+    allowed = torch.ones(diseases, dtype=torch.bool)
+
+    hits = 0
+    queries = noisy(centres[torch.arange(0, diseases, 10)])
+    for query in queries:
+        sims = embeddings @ query
+        best = torch.full((diseases,), float("-inf")).scatter_reduce(0, owner, sims, reduce="amax")
+        truth = set(best.topk(5).indices.tolist())
+        hits += len(truth & set(index.candidate_slots(query, allowed, n_probe=8, n_candidates=32).tolist()))
+    assert hits / (5 * len(queries)) >= 0.95
+
+
+def test_candidates_respect_allowed_and_limit():
+    diseases = 100
+    _, embeddings, owner, _ = synthetic_catalog(diseases, per_disease=4)
+    index = IVFIndex.build(embeddings, owner, generator=torch.Generator().manual_seed(0))
+    allowed = torch.arange(diseases) % 2 == 0
+
+    slots = index.candidate_slots(embeddings[0], allowed, n_probe=index.n_lists, n_candidates=7)
+    assert slots.numel() == 7
+    assert bool(allowed[slots].all())
+
+
+def test_every_phrase_lives_in_exactly_one_list():
+    _, embeddings, owner, _ = synthetic_catalog(50, per_disease=5)
+    index = IVFIndex.build(embeddings, owner, n_lists=7, generator=torch.Generator().manual_seed(0))
+    assert index.offsets[0] == 0 and index.offsets[-1] == owner.numel()
+    assert torch.equal(index.rows.sort().values, torch.arange(owner.numel()))
+    assert torch.equal(index.embeddings, embeddings[index.rows])
+    assert torch.equal(index.owner, owner[index.rows])
+
+
+def test_rebuild_reuses_centroids_of_a_comparable_catalog():
+    _, embeddings, owner, _ = synthetic_catalog(200, per_disease=5)
+    previous = IVFIndex.build(embeddings, owner, generator=torch.Generator().manual_seed(0))
+
+    # A few more diseases: lists are refilled, k-means is not re-run
+    _, more, more_owner, _ = synthetic_catalog(20, per_disease=5, seed=1)
+    grown = IVFIndex.build(torch.cat([embeddings, more]), torch.cat([owner, more_owner + 200]), previous=previous)
+    assert grown.centroids is previous.centroids
+    assert grown.trained_size == previous.trained_size
+    assert grown.offsets[-1] == owner.numel() + more_owner.numel()
+
+    # Far larger than the centroids were trained for: retrained
+    _, large, large_owner, _ = synthetic_catalog(1000, per_disease=5, seed=2)
+    retrained = IVFIndex.build(large, large_owner, previous=previous)
+    assert retrained.centroids is not previous.centroids
+    assert retrained.trained_size == large_owner.numel()
+
+
+def test_similarity_bounds_are_exact_when_every_list_is_probed():
+    _, embeddings, owner, _ = synthetic_catalog(100, per_disease=5)
+    index = IVFIndex.build(embeddings, owner, generator=torch.Generator().manual_seed(0))
+    selected = torch.rand(owner.numel(), generator=torch.Generator().manual_seed(1)) > 0.5
+    query = embeddings[3]
+
+    lo, hi = index.similarity_bounds(query, selected, n_probe=index.n_lists)
+    sims = embeddings[selected] @ query
+    assert lo == pytest.approx(float(sims.min()), abs=1e-6)
+    assert hi == pytest.approx(float(sims.max()), abs=1e-6)
+    assert index.similarity_bounds(query, torch.zeros_like(selected), n_probe=2) is None
@@ -0,0 +1,71 @@
+import numpy as np
+
+from infrastructure.ai.embedding_cache import EmbeddingCache
+
+DIM = 4
+KEY_SIZE = 1
+ENTRY = DIM * 4 + KEY_SIZE   # float32 embedding + one-character key
+
+
+def emb(value: float) -> np.ndarray:
+    return np.full(DIM, value, dtype=np.float32)
+
+
+def test_evicts_least_recently_used_beyond_the_byte_budget():
+    cache = EmbeddingCache(max_bytes=2 * ENTRY)
+    cache.put("a", emb(1))
+    cache.put("b", emb(2))
+    assert cache.get("a") is not None   # "b" is now the least recently used
+    cache.put("c", emb(3))
+
+    assert cache.get("b") is None
+    np.testing.assert_array_equal(cache.get("a"), emb(1))
+    np.testing.assert_array_equal(cache.get("c"), emb(3))
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == (2, 2 * ENTRY)
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+
+
+def test_replacing_a_key_does_not_count_it_twice():
+    cache = EmbeddingCache(max_bytes=2 * ENTRY)
+    cache.put("a", emb(1))
+    cache.put("a", emb(2))
+    assert cache.stats()["bytes"] == ENTRY
+    np.testing.assert_array_equal(cache.get("a"), emb(2))
+
+
+def test_an_entry_larger_than_the_budget_is_not_kept_in_memory():
+    cache = EmbeddingCache(max_bytes=ENTRY - 1)
+    cache.put("a", emb(1))
+    assert cache.get("a") is None
+
+
+def test_cached_embeddings_are_read_only_float32():
+    cache = EmbeddingCache(max_bytes=10 * ENTRY)
+    cache.put("a", np.ones(DIM, dtype=np.float64))
+    cached = cache.get("a")
+    assert cached.dtype == np.float32
+    assert not cached.flags.writeable
+
+
+def test_disk_tier_survives_eviction_and_restarts(tmp_path):
+    cache = EmbeddingCache(max_bytes=ENTRY, disk_dir=tmp_path)
+    cache.put("a", emb(1))
+    cache.put("b", emb(2))   # evicts "a" from memory
+    np.testing.assert_array_equal(cache.get("a"), emb(1))
+    assert cache.stats()["disk_hits"] == 1
+
+    restarted = EmbeddingCache(max_bytes=ENTRY, disk_dir=tmp_path)
+    np.testing.assert_array_equal(restarted.get("b"), emb(2))
+    assert restarted.stats()["disk_hits"] == 1
+    assert restarted.get("b") is not None   # promoted to memory
+    assert restarted.stats()["hits"] == 1
+
+
+def test_unreadable_disk_entries_are_misses(tmp_path):
+    cache = EmbeddingCache(max_bytes=ENTRY, disk_dir=tmp_path)
+    cache.put("ab", emb(1))
+    next(tmp_path.rglob("*.npy")).write_bytes(b"not an array")
+
+    assert EmbeddingCache(max_bytes=ENTRY, disk_dir=tmp_path).get("ab") is None
+    assert not list(tmp_path.rglob("*.tmp"))
@@ -0,0 +1,86 @@
+import pytest
+import torch
+import torch.nn as nn
+
+from infrastructure.ai.inference_backends import (
+    EagerBackend,
+    OnnxRuntimeBackend,
+    TorchScriptBackend,
+    example_inputs,
+    model_metadata,
+    write_metadata,
+)
+
+ATOL = 1e-4
+
+
+class TinyVisionEncoder(nn.Module):
+    def __init__(self, dim: int):
+        super().__init__()
+        self.conv = nn.Conv2d(3, 8, kernel_size=16, stride=16)
+        self.proj = nn.Linear(8, dim)
+
+    def forward(self, pixel_values):
+        return self.proj(torch.relu(self.conv(pixel_values)).mean(dim=(2, 3)))
+
+
+class TinyTextEncoder(nn.Module):
+    def __init__(self, dim: int, vocab: int = 2048):
+        super().__init__()
+        self.embed = nn.Embedding(vocab, 16)
+        self.proj = nn.Linear(16, dim)
+
+    def forward(self, input_ids, attention_mask):
+        mask = attention_mask.unsqueeze(-1).to(torch.float32)
+        pooled = (self.embed(input_ids) * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1.0)
+        return self.proj(pooled)
+
+
+class TinyMedCLIP(nn.Module):
+    """Randomly initialised stand-in with the towers and logit scale of MedCLIPCustom"""
+
+    def __init__(self, dim: int = 32):
+        super().__init__()
+        self.vision_encoder = TinyVisionEncoder(dim)
+        self.text_encoder = TinyTextEncoder(dim)
+        self.logit_scale = nn.Parameter(torch.tensor(2.0))
+
+
+@pytest.fixture(scope="module")
+def model():
+    torch.manual_seed(0)
+    return TinyMedCLIP().eval()
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    torch.manual_seed(1)
+    # Another batch size and sequence length than the ones traced with
+    pixel_values, input_ids, attention_mask = example_inputs(torch.device("cpu"), batch=3, seq_len=9)
+    attention_mask[0, 5:] = 0
+    return pixel_values, input_ids, attention_mask
+
+
+def assert_same_embeddings(eager, other, inputs):
+    pixel_values, input_ids, attention_mask = inputs
+    torch.testing.assert_close(other.encode_images(pixel_values), eager.encode_images(pixel_values),
+                               atol=ATOL, rtol=0)
+    torch.testing.assert_close(other.encode_text(input_ids, attention_mask),
+                               eager.encode_text(input_ids, attention_mask), atol=ATOL, rtol=0)
+    assert other.similarity_scale == pytest.approx(eager.similarity_scale)
+    assert other.embed_dim == eager.embed_dim
+
+
+def test_torchscript_matches_eager(model, inputs):
+    eager = EagerBackend(model, "test")
+    assert_same_embeddings(eager, TorchScriptBackend.trace(model, "test", torch.device("cpu")), inputs)
+
+
+def test_onnx_matches_eager(model, inputs, tmp_path):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    from scripts.export_model import export_onnx
+
+    export_onnx(model, tmp_path, opset=17)
+    write_metadata(tmp_path, model_metadata(model, "test"))
+    assert_same_embeddings(EagerBackend(model, "test"), OnnxRuntimeBackend(tmp_path, torch.device("cpu")), inputs)
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+
+import pytest
+
+from core.settings import settings
+from infrastructure.ai import inference_executor
+from infrastructure.ai.inference_executor import (
+    InferenceCancelledError,
+    InferenceDeadlineError,
+    InferenceQueueFullError,
+    _Admission,
+    inference_queue_stats,
+    reserve_inference_slot,
+    submit_inference,
+)
+from infrastructure.ai.lanes import BATCH, INTERACTIVE, LANES, current_lane
+from presentation.api.v1.classification import service_unavailable
+
+
+@pytest.fixture(autouse=True)
+def executor(monkeypatch):
+    """One interactive thread, a queue of two, fresh pools and counters"""
+    monkeypatch.setattr(settings, "classification_max_concurrency", 1)
+    monkeypatch.setattr(settings, "classification_queue_depth", 2)
+    monkeypatch.setattr(settings, "classification_request_deadline_s", 0)
+    monkeypatch.setattr(inference_executor, "_executors", {})
+    monkeypatch.setattr(inference_executor, "_admissions", {lane: _Admission() for lane in LANES})
+    monkeypatch.setattr(inference_executor, "_POLL_INTERVAL_S", 0.01)
+    yield
+    inference_executor.shutdown_inference_executor()
+
+
+def blocking_call():
+    """A callable that holds its inference thread until released"""
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        return "done"
+    return fn, started, release
+
+
+def test_runs_in_the_requested_lane():
+    async def main():
+        return await submit_inference(current_lane), await submit_inference(current_lane, lane=BATCH)
+
+    assert asyncio.run(main()) == (INTERACTIVE, BATCH)
+
+
+def test_a_full_queue_is_rejected_with_503():
+    fn, started, release = blocking_call()
+
+    async def main():
+        running = asyncio.ensure_future(submit_inference(fn))
+        waiting = asyncio.ensure_future(submit_inference(fn))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        with pytest.raises(InferenceQueueFullError) as rejected:
+            await submit_inference(fn)
+        release.set()
+        return rejected.value, await running, await waiting
+
+    error, *results = asyncio.run(main())
+    assert results == ["done", "done"]
+    http = service_unavailable(error)
+    assert http.status_code == 503
+    assert http.headers["Retry-After"] == str(settings.classification_retry_after_seconds)
+    stats = inference_queue_stats()[INTERACTIVE]
+    assert (stats["admitted"], stats["rejected"], stats["in_flight"]) == (2, 1, 0)
+
+
+def test_a_waiter_whose_client_disconnects_is_cancelled():
+    fn, started, release = blocking_call()
+    ran = []
+
+    async def disconnected():
+        return True
+
+    async def main():
+        running = asyncio.ensure_future(submit_inference(fn))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        with pytest.raises(InferenceCancelledError):
+            await submit_inference(lambda: ran.append(1), is_disconnected=disconnected)
+        release.set()
+        return await running
+
+    assert asyncio.run(main()) == "done"
+    assert ran == []
+    stats = inference_queue_stats()[INTERACTIVE]
+    assert (stats["cancelled"], stats["in_flight"]) == (1, 0)
+
+
+def test_a_waiter_past_its_deadline_is_dropped(monkeypatch):
+    monkeypatch.setattr(settings, "classification_request_deadline_s", 0.05)
+    fn, started, release = blocking_call()
+    ran = []
+
+    async def main():
+        running = asyncio.ensure_future(submit_inference(fn))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        with pytest.raises(InferenceDeadlineError):
+            await submit_inference(lambda: ran.append(1))
+        release.set()
+        return await running
+
+    assert asyncio.run(main()) == "done"
+    assert ran == []
+    assert inference_queue_stats()[INTERACTIVE]["expired"] == 1
+
+
+def test_lanes_have_separate_queues(monkeypatch):
+    monkeypatch.setattr(settings, "classification_batch_queue_depth", 1)
+    fn, started, release = blocking_call()
+
+    async def main():
+        batch = asyncio.ensure_future(submit_inference(fn, lane=BATCH))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        with pytest.raises(InferenceQueueFullError):
+            await submit_inference(fn, lane=BATCH)
+        # The batch lane being full does not hold up interactive requests
+        interactive = await submit_inference(lambda: "interactive")
+        release.set()
+        return interactive, await batch
+
+    assert asyncio.run(main()) == ("interactive", "done")
+
+
+def test_a_reserved_slot_covers_every_step_of_a_request():
+    async def main():
+        slot = reserve_inference_slot()
+        steps = [await submit_inference(lambda i=i: i, slot=slot) for i in range(5)]
+        in_flight = inference_queue_stats()[INTERACTIVE]["in_flight"]
+        other = reserve_inference_slot()
+        with pytest.raises(InferenceQueueFullError):
+            await submit_inference(lambda: None)
+        other.release()
+        slot.release()
+        slot.release()
+        return steps, in_flight
+
+    steps, in_flight = asyncio.run(main())
+    assert steps == [0, 1, 2, 3, 4]
+    assert in_flight == 1
+    stats = inference_queue_stats()[INTERACTIVE]
+    assert (stats["admitted"], stats["rejected"], stats["in_flight"]) == (2, 1, 0)
+
+
+def test_steps_of_a_reserved_slot_still_honour_disconnects():
+    fn, started, release = blocking_call()
+
+    async def disconnected():
+        return True
+
+    async def main():
+        running = asyncio.ensure_future(submit_inference(fn))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        slot = reserve_inference_slot()
+        with pytest.raises(InferenceCancelledError):
+            await submit_inference(lambda: None, slot=slot, is_disconnected=disconnected)
+        slot.release()
+        release.set()
+        return await running
+
+    assert asyncio.run(main()) == "done"
+    assert inference_queue_stats()[INTERACTIVE]["in_flight"] == 0
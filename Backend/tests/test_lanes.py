@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from infrastructure.ai.lanes import BATCH, INTERACTIVE, LANES, LatencyWindow, current_lane, inference_lane
+from infrastructure.ai.micro_batcher import MicroBatcher
+
+
+def test_inference_lane_sets_and_restores_the_current_lane():
+    assert current_lane() == INTERACTIVE
+    with inference_lane(BATCH):
+        assert current_lane() == BATCH
+        with inference_lane(INTERACTIVE):
+            assert current_lane() == INTERACTIVE
+        assert current_lane() == BATCH
+    assert current_lane() == INTERACTIVE
+
+
+def test_unknown_lane_is_rejected():
+    with pytest.raises(ValueError, match="Unknown inference lane"):
+        with inference_lane("urgent"):
+            pass
+
+
+def test_latency_window_percentiles_over_recent_samples():
+    window = LatencyWindow(size=100)
+    assert window.percentile(0.99) == 0.0
+    for ms in range(1000):
+        window.add(float(ms))
+    assert len(window) == 100
+    assert window.percentile(0.50) == 950.0
+    assert window.percentile(0.99) == 999.0
+
+
+class BlockedBatcher:
+    """MicroBatcher whose first batch blocks until released, so later items queue up"""
+
+    def __init__(self, **kwargs):
+        self.batches = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+        def run_batch(items):
+            self.batches.append(list(items))
+            self.started.set()
+            self.release.wait(5)
+            return items
+
+        self.batcher = MicroBatcher(run_batch, window_ms=0, lanes=LANES, **kwargs)
+
+    def block(self):
+        future = self.batcher.submit("blocker", BATCH)
+        assert self.started.wait(5)
+        return future
+
+
+def test_interactive_items_overtake_queued_batch_items():
+    blocked = BlockedBatcher(max_batch_size=3)
+    try:
+        blocked.block()
+        futures = [blocked.batcher.submit(f"batch-{i}", BATCH) for i in range(4)]
+        futures += [blocked.batcher.submit(f"interactive-{i}", INTERACTIVE) for i in range(2)]
+        blocked.release.set()
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        blocked.release.set()
+        blocked.batcher.stop()
+
+    assert blocked.batches[1] == ["interactive-0", "interactive-1", "batch-0"]
+    assert blocked.batches[2:] == [["batch-1", "batch-2", "batch-3"]]
+
+
+def test_background_items_per_batch_are_capped_under_budget_pressure():
+    blocked = BlockedBatcher(max_batch_size=4, latency_budget_ms=1.0)
+    try:
+        blocked.block()
+        # As left by an exceeded budget, with interactive traffic going on
+        blocked.batcher._background_limit = 1
+        blocked.batcher._urgent_last_seen = time.perf_counter()
+        futures = [blocked.batcher.submit(f"batch-{i}", BATCH) for i in range(2)]
+        futures.append(blocked.batcher.submit("interactive", INTERACTIVE))
+        blocked.release.set()
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        blocked.release.set()
+        blocked.batcher.stop()
+
+    assert blocked.batches[1] == ["interactive", "batch-0"]
+    assert blocked.batches[2] == ["batch-1"]
+    stats = blocked.batcher.stats()["lanes"]
+    assert stats[INTERACTIVE]["processed"] == 1
+    assert stats[BATCH]["processed"] == 3
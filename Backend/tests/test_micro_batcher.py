@@ -0,0 +1,75 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from infrastructure.ai.micro_batcher import MicroBatcher
+
+
+@pytest.fixture
+def batches():
+    """Batches run_batch was called with"""
+    return []
+
+
+def make_batcher(batches, run=None, **kwargs):
+    def run_batch(items):
+        batches.append(list(items))
+        return run(items) if run is not None else [item * 10 for item in items]
+    kwargs.setdefault("max_batch_size", 8)
+    kwargs.setdefault("window_ms", 50)
+    return MicroBatcher(run_batch, **kwargs)
+
+
+def test_concurrent_callers_share_a_batch_and_get_their_own_result(batches):
+    batcher = make_batcher(batches, window_ms=200)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda i: batcher.run(i, timeout=5), range(8)))
+    finally:
+        batcher.stop()
+    assert results == [i * 10 for i in range(8)]
+    assert len(batches) < 8
+    assert all(len(batch) <= 8 for batch in batches)
+
+
+def test_a_failing_batch_fails_every_caller_in_it(batches):
+    release = threading.Event()
+
+    def run(items):
+        release.wait(5)
+        raise ValueError("encoder exploded")
+
+    batcher = make_batcher(batches, run=run, window_ms=0)
+    try:
+        futures = [batcher.submit(i) for i in range(4)]
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError, match="encoder exploded"):
+                future.result(timeout=5)
+    finally:
+        batcher.stop()
+    assert sorted(i for batch in batches for i in batch) == [0, 1, 2, 3]
+
+
+def test_a_wrong_number_of_results_fails_the_batch(batches):
+    batcher = make_batcher(batches, run=lambda items: [], window_ms=0)
+    try:
+        with pytest.raises(RuntimeError, match="0 results"):
+            batcher.run(1, timeout=5)
+    finally:
+        batcher.stop()
+
+
+def test_stop_finishes_queued_work(batches):
+    release = threading.Event()
+
+    def run(items):
+        release.wait(5)
+        return items
+
+    batcher = make_batcher(batches, run=run, max_batch_size=1, window_ms=0)
+    futures = [batcher.submit(i) for i in range(3)]
+    release.set()
+    batcher.stop()
+    assert [future.result(timeout=0) for future in futures] == [0, 1, 2]
@@ -0,0 +1,90 @@
+from collections import defaultdict
+
+import pytest
+import torch
+
+from infrastructure.ai.scoring import score_diseases, select_phrase_rows
+
+
+def per_disease_loop(sims: torch.Tensor, owner: torch.Tensor, top_k: int):
+    """The per-disease Python loop score_diseases replaced, for one image"""
+    norm = (sims - sims.min()) / (sims.max() - sims.min() + 1e-8)
+    scores, best = defaultdict(list), {}
+    for row, (value, slot) in enumerate(zip(norm.tolist(), owner.tolist())):
+        scores[slot].append(value)
+        if slot not in best or value > norm[best[slot]]:
+            best[slot] = row
+    means = sorted(((sum(v) / len(v), slot) for slot, v in scores.items()), reverse=True)[:top_k]
+    return [(slot, mean, best[slot]) for mean, slot in means]
+
+
+def random_catalog(generator, max_diseases=30, max_phrases=6):
+    diseases = int(torch.randint(1, max_diseases, (1,), generator=generator))
+    counts = torch.randint(1, max_phrases, (diseases,), generator=generator)
+    return torch.repeat_interleave(torch.arange(diseases), counts), counts
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_per_disease_loop(seed):
+    g = torch.Generator().manual_seed(seed)
+    owner, counts = random_catalog(g)
+    sims = torch.randn(3, owner.numel(), generator=g, dtype=torch.float64)
+    top_k = int(torch.randint(1, 10, (1,), generator=g))
+
+    ranked = score_diseases(sims, owner, counts.numel(), top_k, counts=counts)
+    for b in range(sims.shape[0]):
+        expected = per_disease_loop(sims[b], owner, top_k)
+        assert ranked.slots[b].tolist() == [slot for slot, _, _ in expected]
+        assert ranked.scores[b].tolist() == pytest.approx([mean for _, mean, _ in expected])
+        assert ranked.best_rows[b].tolist() == [row for _, _, row in expected]
+
+
+def test_counts_are_optional():
+    g = torch.Generator().manual_seed(0)
+    owner, counts = random_catalog(g)
+    sims = torch.randn(2, owner.numel(), generator=g)
+    with_counts = score_diseases(sims, owner, counts.numel(), 5, counts=counts)
+    without = score_diseases(sims, owner, counts.numel(), 5)
+    assert torch.equal(with_counts.slots, without.slots)
+    assert torch.equal(with_counts.best_rows, without.best_rows)
+
+
+def test_top_k_is_capped_by_the_diseases_present():
+    owner = torch.tensor([0, 0, 2])
+    ranked = score_diseases(torch.randn(1, 3), owner, num_slots=4, top_k=10)
+    assert sorted(ranked.slots[0].tolist()) == [0, 2]
+
+
+@pytest.mark.parametrize("columns, top_k", [(0, 5), (3, 0), (3, -1)])
+def test_no_rows_or_no_top_k_gives_empty_results(columns, top_k):
+    owner = torch.tensor([0, 0, 1])[:columns]
+    ranked = score_diseases(torch.randn(2, columns), owner, num_slots=2, top_k=top_k)
+    for t in (ranked.scores, ranked.slots, ranked.best_rows):
+        assert t.shape == (2, 0)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_select_caps_phrases_per_disease(seed):
+    g = torch.Generator().manual_seed(seed)
+    owner, counts = random_catalog(g, max_phrases=20)
+    allowed = torch.rand(counts.numel(), generator=g) > 0.3
+    max_phrases = int(torch.randint(1, 10, (1,), generator=g))
+
+    rows = select_phrase_rows(owner, counts, allowed, max_phrases, generator=g)
+    selected = owner[rows]
+    assert torch.all(selected[1:] >= selected[:-1]), "rows must stay grouped by slot"
+    assert rows.unique().numel() == rows.numel()
+    expected = torch.where(allowed, counts.clamp(max=max_phrases), torch.zeros_like(counts))
+    assert torch.equal(torch.bincount(selected, minlength=counts.numel()), expected)
+
+
+def test_select_keeps_every_row_below_the_cap():
+    owner = torch.tensor([0, 0, 1, 2, 2, 2])
+    counts = torch.tensor([2, 1, 3])
+    allowed = torch.tensor([True, False, True])
+    assert select_phrase_rows(owner, counts, allowed, max_phrases=3).tolist() == [0, 1, 3, 4, 5]
+
+
+def test_select_from_an_empty_index():
+    empty = torch.zeros(0, dtype=torch.long)
+    assert select_phrase_rows(empty, empty, torch.zeros(0, dtype=torch.bool), 5).numel() == 0
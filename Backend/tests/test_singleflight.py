@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from infrastructure.ai.singleflight import Singleflight
+
+
+def test_concurrent_callers_share_one_execution():
+    calls = []
+
+    async def compute(is_disconnected):
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        flight = Singleflight()
+        results = await asyncio.gather(*(flight.do("key", compute) for _ in range(10)))
+        return flight, results
+
+    flight, results = asyncio.run(main())
+    assert results == ["result"] * 10
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "executed": 1, "coalesced": 9, "coalesced_rate": 0.9}
+
+
+def test_different_keys_and_later_calls_execute_again():
+    calls = []
+
+    async def compute(is_disconnected):
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def main():
+        flight = Singleflight()
+        await asyncio.gather(flight.do("a", compute), flight.do("b", compute))
+        await flight.do("a", compute)
+
+    asyncio.run(main())
+    assert len(calls) == 3
+
+
+def test_an_exception_reaches_every_caller():
+    async def compute(is_disconnected):
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        flight = Singleflight()
+        return await asyncio.gather(*(flight.do("key", compute) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [type(r) for r in results] == [ValueError] * 3
+
+
+def test_one_caller_leaving_does_not_cancel_the_others():
+    checks = []
+
+    async def compute(is_disconnected):
+        await asyncio.sleep(0.05)
+        checks.append(await is_disconnected())
+        return "result"
+
+    async def gone():
+        return True
+
+    async def connected():
+        return False
+
+    async def main():
+        flight = Singleflight()
+        leaver = asyncio.ensure_future(flight.do("key", compute, gone))
+        stayer = asyncio.ensure_future(flight.do("key", compute, connected))
+        await asyncio.sleep(0.01)
+        leaver.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaver
+        return await stayer
+
+    assert asyncio.run(main()) == "result"
+    # The remaining caller is still connected
+    assert checks == [False]
+
+
+def test_combined_check_is_true_once_every_caller_is_gone():
+    checks = []
+
+    async def compute(is_disconnected):
+        await asyncio.sleep(0.02)
+        checks.append(await is_disconnected())
+        return "result"
+
+    async def gone():
+        return True
+
+    async def main():
+        flight = Singleflight()
+        return await asyncio.gather(flight.do("key", compute, gone), flight.do("key", compute, gone))
+
+    asyncio.run(main())
+    assert checks == [True]
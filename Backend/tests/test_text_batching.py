@@ -0,0 +1,62 @@
+import random
+import threading
+import types
+
+import pytest
+import torch
+
+from core.settings import settings
+from infrastructure.ai.text_batching import length_bucket, length_bucketed_batches, pad_batch
+from infrastructure.db.repositories.classification_repository import ClassificationRepository
+
+
+def test_length_bucket_is_the_next_power_of_two():
+    assert [length_bucket(n) for n in (0, 1, 8, 9, 16, 17, 100)] == [8, 8, 8, 16, 16, 32, 128]
+
+
+def test_batches_cover_every_position_once_within_limits():
+    rng = random.Random(0)
+    lengths = [rng.randint(1, 120) for _ in range(500)]
+
+    batches = list(length_bucketed_batches(lengths, max_batch_size=16, max_batch_tokens=512))
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    for batch in batches:
+        assert len({length_bucket(lengths[i]) for i in batch}) == 1
+        assert len(batch) <= 16
+        assert len(batch) == 1 or len(batch) * max(lengths[i] for i in batch) <= 512
+
+
+def test_a_sequence_longer_than_the_token_cap_gets_its_own_batch():
+    assert list(length_bucketed_batches([5, 300, 6], max_batch_size=8, max_batch_tokens=64)) == [[0, 2], [1]]
+
+
+def test_pad_batch():
+    input_ids, attention_mask = pad_batch([[5, 6, 7], [8]], pad_id=0)
+    assert input_ids.tolist() == [[5, 6, 7], [8, 0, 0]]
+    assert attention_mask.tolist() == [[1, 1, 1], [1, 0, 0]]
+
+
+@pytest.fixture
+def repository():
+    """A ClassificationRepository whose "text tower" returns (length, sum of token ids) per phrase"""
+    def encode_text(input_ids, attention_mask):
+        return torch.stack([attention_mask.sum(dim=1), (input_ids * attention_mask).sum(dim=1)], dim=1).float()
+
+    repo = object.__new__(ClassificationRepository)
+    repo.tokenizer = lambda texts, **kwargs: {"input_ids": [[ord(c) for c in t] for t in texts]}
+    repo.tokenizer.pad_token_id = 0
+    repo.backend = types.SimpleNamespace(embed_dim=2, encode_text=encode_text)
+    repo.device = torch.device("cpu")
+    repo._tokenizer_lock = threading.Lock()
+    return repo
+
+
+def test_encoded_phrases_come_back_in_input_order(repository, monkeypatch):
+    monkeypatch.setattr(settings, "text_encoder_max_batch_size", 4)
+    monkeypatch.setattr(settings, "text_encoder_max_batch_tokens", 64)
+    rng = random.Random(1)
+    texts = ["x" * rng.randint(1, 40) + str(i) for i in range(60)]
+
+    emb = repository._encode_texts(texts)
+    expected = [[len(t), sum(map(ord, t))] for t in texts]
+    assert emb.tolist() == expected